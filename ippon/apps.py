@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class IpponConfig(AppConfig):
     name = 'ippon'
+
+    def ready(self):
+        # Signal receivers outside of the models package are registered when their modules are imported.
+        import ippon.tournament.live
+        import ippon.tournament.scheduling
+        import ippon.utils.cache
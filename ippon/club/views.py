@@ -1,7 +1,6 @@
 from django.contrib.auth.models import User
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import action, api_view
-from rest_framework.response import Response
 
 import ippon.club.authorizations as ca
 import ippon.club.permissisons as clp
@@ -10,6 +9,8 @@ import ippon.models.club as cl
 import ippon.models.player as plm
 import ippon.player.serializers as pls
 import ippon.user.serailzers as us
+import ippon.utils.pagination as iupg
+import ippon.utils.search as ius
 
 
 class ClubViewSet(viewsets.ModelViewSet):
@@ -25,22 +26,20 @@ class ClubViewSet(viewsets.ModelViewSet):
 
     @action(methods=['get'], detail=True)
     def players(self, request, pk=None):
-        serializer = pls.PlayerSerializer(plm.Player.objects.filter(club_id=pk), many=True)
-        return Response(serializer.data)
+        return iupg.paginated_response(self, plm.Player.objects.filter(club_id=pk), pls.PlayerSerializer)
 
     @action(methods=['get'],
             detail=True,
             permission_classes=(permissions.IsAuthenticated, clp.IsClubOwner))
     def admins(self, request, pk=None):
-        serializer = cls.ClubAdminSerializer(cl.ClubAdmin.objects.filter(club=pk), many=True)
-        return Response(serializer.data)
+        return iupg.paginated_response(self, cl.ClubAdmin.objects.filter(club=pk), cls.ClubAdminSerializer)
 
     @action(methods=['get'],
             detail=True,
             permission_classes=(permissions.IsAuthenticated, clp.IsClubOwner))
     def non_admins(self, request, pk=None):
-        serializer = us.MinimalUserSerializer(User.objects.exclude(clubs__club=pk), many=True)
-        return Response(serializer.data)
+        return ius.picker_response(self, User.objects.exclude(clubs__club=pk), us.MinimalUserSerializer,
+                                   ['username'])
 
 
 class ClubAdminViewSet(viewsets.ModelViewSet):
@@ -58,13 +58,13 @@ class CupFightViewTest(APITestCase):
         self.cf3 = self.phase.cup_fights.create(previous_aka_fight=self.cf2)
 
         self.cf1_json = {'id': self.cf1.id, 'team_fight': self.tf1.id, 'cup_phase': self.phase.id,
-                         "previous_aka_fight": None, "previous_shiro_fight": None}
+                         "previous_aka_fight": None, "previous_shiro_fight": None, "bye_team": None}
         self.cf2_json = {'id': self.cf2.id, 'team_fight': self.tf2.id, 'cup_phase': self.phase.id,
-                         "previous_aka_fight": self.cf1.id, "previous_shiro_fight": None}
+                         "previous_aka_fight": self.cf1.id, "previous_shiro_fight": None, "bye_team": None}
         self.cf3_json = {'id': self.cf3.id, 'team_fight': None, 'cup_phase': self.phase.id,
-                         "previous_aka_fight": self.cf2.id, "previous_shiro_fight": None}
+                         "previous_aka_fight": self.cf2.id, "previous_shiro_fight": None, "bye_team": None}
         self.valid_payload = {'id': self.cf1.id, 'team_fight': self.tf2.id, 'cup_phase': self.phase.id,
-                              "previous_aka_fight": None, "previous_shiro_fight": None}
+                              "previous_aka_fight": None, "previous_shiro_fight": None, "bye_team": None}
         self.invalid_payload = {'id': self.cf1.id, 'group': iuv.BAD_PK}
 
 
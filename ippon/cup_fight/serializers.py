@@ -11,5 +11,6 @@ class CupFightSerializer(serializers.ModelSerializer):
             'team_fight',
             'cup_phase',
             'previous_shiro_fight',
-            'previous_aka_fight'
+            'previous_aka_fight',
+            'bye_team'
         )
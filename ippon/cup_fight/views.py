@@ -3,10 +3,12 @@ from rest_framework import viewsets, permissions
 import ippon.cup_fight.permissions as cfp
 import ippon.cup_fight.serializers as cfs
 import ippon.models.cup_fight as cfm
+import ippon.utils.etag as iue
 
 
-class CupFightViewSet(viewsets.ModelViewSet):
-    queryset = cfm.CupFight.objects.all()
+class CupFightViewSet(iue.TournamentVersionETagMixin, viewsets.ModelViewSet):
+    queryset = cfm.CupFight.objects.order_by('pk')
     serializer_class = cfs.CupFightSerializer
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,
                           cfp.IsCupFightOwnerOrReadOnly)
+    tournament_lookup = 'cup_phases__cup_fights'
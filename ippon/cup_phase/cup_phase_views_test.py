@@ -1,4 +1,5 @@
 import datetime
+import itertools
 import json
 
 from django.contrib.auth.models import User
@@ -6,7 +7,11 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
 
+import ippon.cup_phase.generation as cpg
+import ippon.models.club as cl
+import ippon.models.player as plm
 import ippon.models.tournament as tm
+import ippon.utils.cache as iuc
 import ippon.utils.values as iuv
 
 
@@ -62,6 +67,81 @@ class CupPhasesViewSetAuthorizedTests(CupPhasesViewTest):
         tm.TournamentAdmin.objects.create(user=self.user, tournament=self.to, is_master=False)
         self.client.force_authenticate(user=self.user)
 
+    def test_post_generate_with_teams_creates_bracket(self):
+        teams = [self.to.teams.create(name='t{}'.format(i)).id for i in range(4)]
+        response = self.client.post(reverse('cupphase-generate', kwargs={'pk': self.cp1.pk}), {'teams': teams},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(3, len(response.data))
+        self.assertEqual(3, self.cp1.cup_fights.count())
+
+    def test_post_generate_fights_creates_fights_of_cup_team_fights(self):
+        club = cl.Club.objects.create(name='cn1', webpage='http://cw1.co', description='cd1', city='cc1')
+        teams = []
+        for i in range(4):
+            team = self.to.teams.create(name='t{}'.format(i))
+            team.team_members.create(player=plm.Player.objects.create(
+                name='pn', surname='ps', rank=1, birthday=datetime.date(year=2001, month=1, day=1), sex=1,
+                club_id=club))
+            teams.append(team.id)
+        cpg.generate(self.cp1, cpg.seeded_slots(teams))
+        response = self.client.post(reverse('cupphase-generate_fights', kwargs={'pk': self.cp1.pk}))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(2, len(response.data))
+
+    def test_post_generate_fights_for_not_existing_cup_phase_returns_not_found(self):
+        response = self.client.post(reverse('cupphase-generate_fights', kwargs={'pk': iuv.BAD_PK}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_post_promote_creates_bracket_of_top_teams_of_groups(self):
+        group_phase = self.to.group_phases.create(fight_length=3, name='gp')
+        teams = [self.to.teams.create(name='t{}'.format(i)) for i in range(6)]
+        for number, group_teams in enumerate([teams[:3], teams[3:]]):
+            group = group_phase.groups.create(name='g{}'.format(number))
+            for team in group_teams:
+                group.group_members.create(team=team)
+            for aka, shiro in itertools.combinations(group_teams, 2):
+                group.group_fights.create(team_fight=self.to.team_fights.create(
+                    aka_team=aka, shiro_team=shiro, winner=1, status=2))
+        response = self.client.post(reverse('cupphase-promote', kwargs={'pk': self.cp1.pk}),
+                                    {'group_phase': group_phase.id, 'top': 2}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        first_round = self.cp1.cup_fights.filter(team_fight__isnull=False).order_by('pk')
+        self.assertEqual({teams[0].id, teams[1].id, teams[3].id, teams[4].id},
+                         {team_id for cf in first_round
+                          for team_id in (cf.team_fight.aka_team_id, cf.team_fight.shiro_team_id)})
+
+    def test_post_promote_from_group_phase_without_fights_returns_bad_request(self):
+        group_phase = self.to.group_phases.create(fight_length=3, name='gp')
+        group = group_phase.groups.create(name='g')
+        for i in range(4):
+            group.group_members.create(team=self.to.teams.create(name='t{}'.format(i)))
+        response = self.client.post(reverse('cupphase-promote', kwargs={'pk': self.cp1.pk}),
+                                    {'group_phase': group_phase.id, 'top': 2}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(self.cp1.cup_fights.exists())
+
+    def test_post_promote_from_group_phase_of_other_tournament_returns_not_found(self):
+        other = tm.Tournament.objects.create(name='T2', webpage='http://w1.co', description='d1', city='c1',
+                                             date=datetime.date(year=2021, month=1, day=1), address='a1',
+                                             team_size=1, group_match_length=3, ko_match_length=3,
+                                             final_match_length=3, finals_depth=0, age_constraint=5,
+                                             age_constraint_value=20, rank_constraint=5, rank_constraint_value=7,
+                                             sex_constraint=1)
+        group_phase = other.group_phases.create(fight_length=3, name='gp')
+        response = self.client.post(reverse('cupphase-promote', kwargs={'pk': self.cp1.pk}),
+                                    {'group_phase': group_phase.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_post_promote_without_group_phase_returns_bad_request(self):
+        response = self.client.post(reverse('cupphase-promote', kwargs={'pk': self.cp1.pk}), {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_post_generate_with_too_few_teams_returns_bad_request(self):
+        response = self.client.post(reverse('cupphase-generate', kwargs={'pk': self.cp1.pk}),
+                                    {'teams': [self.to.teams.create(name='t1').id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_post_valid_payload_creates_specified_cup_phase(self):
         response = self.client.post(
             reverse('cupphase-list'),
@@ -111,6 +191,18 @@ class CupPhaseViewSetUnauthorizedTests(CupPhasesViewTest):
         super(CupPhaseViewSetUnauthorizedTests, self).setUp()
         self.client.force_authenticate(user=self.user)
 
+    def test_post_generate_gets_forbidden(self):
+        teams = [self.to.teams.create(name='t{}'.format(i)).id for i in range(2)]
+        response = self.client.post(reverse('cupphase-generate', kwargs={'pk': self.cp1.pk}), {'teams': teams},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_post_promote_gets_forbidden(self):
+        group_phase = self.to.group_phases.create(fight_length=3, name='gp')
+        response = self.client.post(reverse('cupphase-promote', kwargs={'pk': self.cp1.pk}),
+                                    {'group_phase': group_phase.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
     def test_unauthorized_put_gets_forbidden(self):
         response = self.client.put(
             reverse('cupphase-detail', kwargs={"pk": self.cp1.pk}),
@@ -163,6 +255,42 @@ class CupPhaseViewSetUnauthenticatedTests(CupPhasesViewTest):
         response = self.client.delete(reverse('cupphase-detail', kwargs={'pk': self.cp1.id}))
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
+    def test_get_bracket_returns_nested_tree_with_teams_and_scores(self):
+        team1 = self.to.teams.create(name='t1')
+        team2 = self.to.teams.create(name='t2')
+        team3 = self.to.teams.create(name='t3')
+        tf1 = self.to.team_fights.create(aka_team=team2, shiro_team=team3, status=2, aka_wins=1)
+        cf1 = self.cp1.cup_fights.create(team_fight=tf1)
+        cf2 = self.cp1.cup_fights.create(previous_shiro_fight=cf1, bye_team=team1)
+
+        response = self.client.get(reverse('cupphase-bracket', kwargs={'pk': self.cp1.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([{
+            'id': cf2.id, 'team_fight': None, 'bye_team': {'id': team1.id, 'name': 't1'},
+            'previous_aka_fight': None,
+            'previous_shiro_fight': {
+                'id': cf1.id, 'bye_team': None, 'previous_aka_fight': None, 'previous_shiro_fight': None,
+                'team_fight': {'id': tf1.id, 'aka_team': {'id': team2.id, 'name': 't2'},
+                               'shiro_team': {'id': team3.id, 'name': 't3'}, 'winner': 0, 'status': 2,
+                               'aka_score': 1, 'shiro_score': 0, 'aka_points': 0, 'shiro_points': 0}}
+        }], response.data)
+
+    def test_get_bracket_takes_same_number_of_queries_for_any_bracket_size(self):
+        teams = [self.to.teams.create(name='t{}'.format(i)).id for i in range(256)]
+        cpg.generate(self.cp1, cpg.seeded_slots(teams[:128]))
+        cpg.generate(self.cp2, cpg.seeded_slots(teams))
+        iuc.get_cache().clear()
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('cupphase-bracket', kwargs={'pk': self.cp1.pk}))
+        self.assertEqual(1, len(response.data))
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('cupphase-bracket', kwargs={'pk': self.cp2.pk}))
+        self.assertEqual(1, len(response.data))
+
+    def test_get_bracket_for_invalid_cup_phase_returns_not_found(self):
+        response = self.client.get(reverse('cupphase-bracket', kwargs={'pk': iuv.BAD_PK}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_get_fights_for_valid_cup_phase_returns_list_of_cup_fights(self):
         team1 = self.to.teams.create(name='t1')
         team2 = self.to.teams.create(name='t2')
@@ -175,11 +303,11 @@ class CupPhaseViewSetUnauthenticatedTests(CupPhasesViewTest):
         cf3 = self.cp1.cup_fights.create(previous_shiro_fight=cf1, previous_aka_fight=cf2)
 
         cf1_json = {'id': cf1.id, "cup_phase": self.cp1.id, "team_fight": tf1.id, 'previous_shiro_fight': None,
-                    'previous_aka_fight': None}
+                    'previous_aka_fight': None, 'bye_team': None}
         cf2_json = {'id': cf2.id, "cup_phase": self.cp1.id, "team_fight": tf2.id, 'previous_shiro_fight': None,
-                    'previous_aka_fight': None}
+                    'previous_aka_fight': None, 'bye_team': None}
         cf3_json = {'id': cf3.id, "cup_phase": self.cp1.id, "team_fight": None, 'previous_shiro_fight': cf1.id,
-                    'previous_aka_fight': cf2.id}
+                    'previous_aka_fight': cf2.id, 'bye_team': None}
 
         expected = [cf1_json, cf2_json, cf3_json]
         response = self.client.get(reverse('cupphase-cup_fights', kwargs={'pk': self.cp1.pk}))
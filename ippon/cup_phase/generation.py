@@ -0,0 +1,168 @@
+import itertools
+
+from django.db import transaction
+
+import ippon.group.standings as gst
+import ippon.models.cup_fight as cfm
+import ippon.models.group as gm
+import ippon.models.group_fight as gfm
+import ippon.models.team as tem
+import ippon.models.team_fight as tfm
+import ippon.models.tournament_changes as tcm
+
+
+def seed_order(size):
+    """
+    Seed numbers (counted from 1) of the slots of a bracket of the given power of two size, ordered so that
+    in every round the best remaining seed meets the worst one and seeds 1 and 2 can only meet in the final.
+    """
+    order = [1]
+    while len(order) < size:
+        total = len(order) * 2 + 1
+        order = [seed for slot in order for seed in (slot, total - slot)]
+    return order
+
+
+def bracket_size(team_count):
+    size = 1
+    while size < team_count:
+        size *= 2
+    return size
+
+
+def seeded_slots(team_ids):
+    """
+    Bracket slots of the teams ordered by seed. Slots of seeds exceeding the number of teams are byes (None).
+    """
+    team_ids = [int(team_id) for team_id in team_ids]
+    return [team_ids[seed - 1] if seed <= len(team_ids) else None
+            for seed in seed_order(bracket_size(len(team_ids)))]
+
+
+def promotion_slots(groups, top):
+    """
+    Bracket slots of the top teams of groups, given as lists of team ids ordered by rank. Teams are seeded
+    place by place, and every seed of a place goes to the group whose already placed teams it would meet
+    latest, so the first round pairs teams of different groups (A1 vs B2) and teams of one group are kept
+    in different halves as long as possible.
+    """
+    promoted = [rows[:top] for rows in groups]
+    size = bracket_size(sum(len(rows) for rows in promoted))
+    order = seed_order(size)
+    positions = {seed: position for position, seed in enumerate(order)}
+    slots = [None] * size
+    placed = {}
+    seed = 1
+    for place in range(top):
+        remaining = [index for index, rows in enumerate(promoted) if place < len(rows)]
+        while remaining:
+            position = positions[seed]
+            index = max(remaining, key=lambda index: (
+                min([(position ^ other).bit_length() for other in placed.get(index, [])] or [size]),
+                -remaining.index(index)))
+            remaining.remove(index)
+            slots[position] = promoted[index][place]
+            placed.setdefault(index, []).append(position)
+            seed += 1
+    return slots
+
+
+def plan(slots):
+    """
+    Builds the single-elimination tree of the bracket slots, without saving it. A team whose opponent slot
+    is a bye has no first round fight and becomes the bye team of the following one. Returns (cup fights
+    from the first round to the final, links of the cup fights to their previous fights as
+    (cup fight, field, previous cup fight)).
+    """
+    level = list(slots)
+    cup_fights = []
+    links = []
+    while len(level) > 1:
+        next_level = []
+        for aka, shiro in zip(level[::2], level[1::2]):
+            if aka is None or shiro is None:
+                next_level.append(shiro if aka is None else aka)
+                continue
+            cup_fight = cfm.CupFight()
+            sides = [('previous_aka_fight', aka), ('previous_shiro_fight', shiro)]
+            teams = [team for _, team in sides if not isinstance(team, cfm.CupFight)]
+            if len(teams) == 2:
+                cup_fight.team_fight = tfm.TeamFight(aka_team_id=aka, shiro_team_id=shiro, in_cup=True)
+            else:
+                cup_fight.bye_team_id = teams[0] if teams else None
+                links.extend((cup_fight, field, previous) for field, previous in sides
+                             if isinstance(previous, cfm.CupFight))
+            cup_fights.append(cup_fight)
+            next_level.append(cup_fight)
+        level = next_level
+    return cup_fights, links
+
+
+def generate(cup_phase, slots):
+    """
+    Creates the whole bracket of an empty cup phase from its slots in a constant number of queries: one insert
+    of the first round team fights, one of all cup fights and one update linking them in both directions.
+    """
+    team_ids = [team_id for team_id in slots if team_id is not None]
+    if len(team_ids) < 2:
+        raise ValueError('at least two teams are needed')
+    if len(set(team_ids)) != len(team_ids):
+        raise ValueError('teams are not unique')
+    with transaction.atomic():
+        if cup_phase.cup_fights.exists():
+            raise ValueError('cup phase already has fights')
+        if tem.Team.objects.filter(tournament=cup_phase.tournament_id, pk__in=team_ids).count() != len(team_ids):
+            raise ValueError('teams do not belong to the tournament')
+
+        cup_fights, links = plan(slots)
+        fought = [cup_fight for cup_fight in cup_fights if cup_fight.team_fight is not None]
+        for cup_fight in fought:
+            cup_fight.team_fight.tournament_id = cup_phase.tournament_id
+        team_fights = tfm.TeamFight.objects.bulk_create([cup_fight.team_fight for cup_fight in fought])
+        for cup_fight, team_fight in zip(fought, team_fights):
+            cup_fight.team_fight = team_fight
+        for cup_fight in cup_fights:
+            cup_fight.cup_phase = cup_phase
+        cup_fights = cfm.CupFight.objects.bulk_create(cup_fights)
+        for cup_fight, field, previous in links:
+            setattr(cup_fight, field, previous)
+            previous.next_fight = cup_fight
+            previous.next_fight_side = cfm.AKA if field == 'previous_aka_fight' else cfm.SHIRO
+        cfm.CupFight.objects.bulk_update(
+            cup_fights, ['previous_aka_fight', 'previous_shiro_fight', 'next_fight', 'next_fight_side'])
+
+        tcm.notify_changed(cup_phase.tournament_id, tfm.TeamFight, team_fights, tcm.CREATED)
+        tcm.notify_changed(cup_phase.tournament_id, cfm.CupFight, cup_fights, tcm.CREATED)
+    return cup_fights
+
+
+def is_finished(group_phase):
+    """
+    Whether every pair of members of every group of the group phase has fought and no team fight of the
+    groups is still unfinished.
+    """
+    members = {}
+    for group_id, team_id in gm.GroupMember.objects.filter(group__group_phase=group_phase) \
+            .values_list('group_id', 'team_id'):
+        members.setdefault(group_id, []).append(team_id)
+    fought = {}
+    for group_id, aka, shiro, fight_status in gfm.GroupFight.objects.filter(group__group_phase=group_phase) \
+            .values_list('group_id', 'team_fight__aka_team', 'team_fight__shiro_team', 'team_fight__status'):
+        if fight_status != gst.FINISHED:
+            return False
+        fought.setdefault(group_id, set()).add(frozenset((aka, shiro)))
+    return all(frozenset(pair) in fought.get(group_id, ())
+               for group_id, team_ids in members.items() for pair in itertools.combinations(team_ids, 2))
+
+
+def promote(group_phase, cup_phase, top):
+    """
+    Creates the bracket of the cup phase from the top teams of every group of the finished group phase,
+    ranked by the group standings.
+    """
+    if not is_finished(group_phase):
+        raise ValueError('group phase is not finished')
+    standings = gst.group_phase_standings(group_phase.id)
+    groups = [[row['id'] for row in standings.get(group_id, [])] for group_id in
+              gm.Group.objects.filter(group_phase=group_phase).order_by('pk').values_list('pk', flat=True)]
+    return generate(cup_phase, promotion_slots(groups, top))
@@ -0,0 +1,174 @@
+import datetime
+
+from django.test import SimpleTestCase, TestCase
+
+import ippon.cup_phase.generation as cpg
+import ippon.models.cup_fight as cfm
+import ippon.models.tournament as tm
+
+
+class SeedOrderTests(SimpleTestCase):
+    def test_top_seeds_meet_in_the_final(self):
+        self.assertEqual([1, 8, 4, 5, 2, 7, 3, 6], cpg.seed_order(8))
+
+    def test_every_first_round_pair_sums_to_size_plus_one(self):
+        order = cpg.seed_order(32)
+        self.assertEqual({33}, {aka + shiro for aka, shiro in zip(order[::2], order[1::2])})
+
+
+class PromotionSlotsTests(SimpleTestCase):
+    def pairs(self, slots):
+        return list(zip(slots[::2], slots[1::2]))
+
+    def test_winners_meet_runners_up_of_other_groups(self):
+        slots = cpg.promotion_slots([['A1', 'A2'], ['B1', 'B2']], 2)
+        self.assertEqual([('A1', 'B2'), ('B1', 'A2')], self.pairs(slots))
+
+    def test_teams_of_one_group_are_in_different_halves(self):
+        groups = [[group + str(place) for place in (1, 2)] for group in 'ABCD']
+        slots = cpg.promotion_slots(groups, 2)
+        for aka, shiro in self.pairs(slots):
+            self.assertNotEqual(aka[0], shiro[0])
+            self.assertEqual(('1', '2'), (aka[1], shiro[1]))
+        for group in 'ABCD':
+            self.assertEqual(1, len([team for team in slots[:4] if team[0] == group]))
+
+    def test_small_groups_leave_byes_to_top_seeds(self):
+        slots = cpg.promotion_slots([['A1', 'A2'], ['B1']], 2)
+        self.assertEqual([('A1', None), ('B1', 'A2')], self.pairs(slots))
+
+
+class PlanTests(SimpleTestCase):
+    def test_full_bracket_has_first_round_fights_for_all_teams(self):
+        cup_fights, links = cpg.plan(cpg.seeded_slots([1, 2, 3, 4]))
+        self.assertEqual([(1, 4), (2, 3)], [(cf.team_fight.aka_team_id, cf.team_fight.shiro_team_id)
+                                            for cf in cup_fights if cf.team_fight is not None])
+        self.assertEqual(3, len(cup_fights))
+        self.assertEqual(2, len(links))
+
+    def test_top_seeds_get_byes(self):
+        cup_fights, links = cpg.plan(cpg.seeded_slots([1, 2, 3, 4, 5]))
+        first_round = [(cf.team_fight.aka_team_id, cf.team_fight.shiro_team_id)
+                       for cf in cup_fights if cf.team_fight is not None]
+        self.assertEqual([(4, 5), (2, 3)], first_round)
+        self.assertEqual([1], [cf.bye_team_id for cf in cup_fights if cf.bye_team_id is not None])
+        self.assertEqual(4, len(cup_fights))
+
+
+def create_tournament(name):
+    return tm.Tournament.objects.create(name=name, webpage='http://w1.co', description='d1', city='c1',
+                                        date=datetime.date(year=2021, month=1, day=1), address='a1', team_size=1,
+                                        group_match_length=3, ko_match_length=3, final_match_length=3,
+                                        finals_depth=0, age_constraint=5, age_constraint_value=20,
+                                        rank_constraint=5, rank_constraint_value=7, sex_constraint=1)
+
+
+class GenerateTests(TestCase):
+    def setUp(self):
+        self.tournament = create_tournament('T1')
+        self.cup_phase = self.tournament.cup_phases.create(fight_length=3, name="cp1", final_fight_length=4)
+
+    def create_teams(self, count):
+        return [self.tournament.teams.create(name='t{}'.format(i)).id for i in range(count)]
+
+    def test_bracket_is_created_in_constant_number_of_queries(self):
+        small = self.tournament.cup_phases.create(fight_length=3, name="cp2", final_fight_length=4)
+        teams = self.create_teams(64)
+        with self.assertNumQueries(11):
+            cpg.generate(small, cpg.seeded_slots(teams[:4]))
+        with self.assertNumQueries(11):
+            cpg.generate(self.cup_phase, cpg.seeded_slots(teams))
+        self.assertEqual(63, self.cup_phase.cup_fights.count())
+        self.assertEqual(32, self.cup_phase.cup_fights.filter(team_fight__isnull=False).count())
+
+    def test_tree_is_linked_up_to_single_final(self):
+        cpg.generate(self.cup_phase, cpg.seeded_slots(self.create_teams(6)))
+        cup_fights = list(self.cup_phase.cup_fights.all())
+        previous = [cf.previous_aka_fight_id for cf in cup_fights] + [cf.previous_shiro_fight_id for cf in cup_fights]
+        finals = [cf for cf in cup_fights if cf.id not in previous]
+        self.assertEqual(1, len(finals))
+        self.assertEqual(5, len(cup_fights))
+
+    def test_previous_fights_point_at_following_ones(self):
+        cpg.generate(self.cup_phase, cpg.seeded_slots(self.create_teams(5)))
+        for cup_fight in self.cup_phase.cup_fights.all():
+            for side, previous in [(cfm.AKA, cup_fight.previous_aka_fight), (cfm.SHIRO, cup_fight.previous_shiro_fight)]:
+                if previous is not None:
+                    self.assertEqual((cup_fight.id, side), (previous.next_fight_id, previous.next_fight_side))
+        self.assertEqual(1, self.cup_phase.cup_fights.filter(next_fight__isnull=True).count())
+
+    def test_bye_team_advances_when_opponent_is_decided(self):
+        t1, t2, t3 = self.create_teams(3)
+        cpg.generate(self.cup_phase, cpg.seeded_slots([t1, t2, t3]))
+        first_round = self.cup_phase.cup_fights.get(team_fight__isnull=False)
+        self.assertEqual((t2, t3), (first_round.team_fight.aka_team_id, first_round.team_fight.shiro_team_id))
+        first_round.team_fight.winner = 2
+        first_round.team_fight.save()
+        final = self.cup_phase.cup_fights.get(bye_team=t1)
+        self.assertEqual((t1, t3), (final.team_fight.aka_team_id, final.team_fight.shiro_team_id))
+
+    def test_generating_twice_raises(self):
+        teams = self.create_teams(2)
+        cpg.generate(self.cup_phase, cpg.seeded_slots(teams))
+        with self.assertRaises(ValueError):
+            cpg.generate(self.cup_phase, cpg.seeded_slots(teams))
+
+    def test_teams_of_other_tournament_raise(self):
+        teams = self.create_teams(1) + [create_tournament('T2').teams.create(name='o').id]
+        with self.assertRaises(ValueError):
+            cpg.generate(self.cup_phase, cpg.seeded_slots(teams))
+
+    def create_group_phase(self, groups):
+        group_phase = self.tournament.group_phases.create(fight_length=3, name='gp')
+        for number, teams in enumerate(groups):
+            group = group_phase.groups.create(name='g{}'.format(number))
+            for team in teams:
+                group.group_members.create(team_id=team)
+        return group_phase
+
+    def add_result(self, group_phase, winner, loser, status=2):
+        group = group_phase.groups.get(group_members__team=winner)
+        team_fight = self.tournament.team_fights.create(aka_team_id=winner, shiro_team_id=loser, winner=1,
+                                                        status=status)
+        group.group_fights.create(team_fight=team_fight)
+
+    def test_promote_pairs_group_winners_with_runners_up_of_other_groups(self):
+        a1, a2, b1, b2 = self.create_teams(4)
+        group_phase = self.create_group_phase([[a2, a1], [b1, b2]])
+        self.add_result(group_phase, a1, a2)
+        self.add_result(group_phase, b1, b2)
+        cpg.promote(group_phase, self.cup_phase, 2)
+        first_round = self.cup_phase.cup_fights.filter(team_fight__isnull=False).order_by('pk')
+        self.assertEqual([(a1, b2), (b1, a2)],
+                         [(cf.team_fight.aka_team_id, cf.team_fight.shiro_team_id) for cf in first_round])
+
+    def test_promote_from_not_finished_group_phase_raises(self):
+        a1, a2, b1, b2 = self.create_teams(4)
+        group_phase = self.create_group_phase([[a1, a2], [b1, b2]])
+        self.add_result(group_phase, a1, a2, status=1)
+        with self.assertRaises(ValueError):
+            cpg.promote(group_phase, self.cup_phase, 2)
+        self.assertFalse(self.cup_phase.cup_fights.exists())
+
+    def test_promote_from_group_phase_without_fights_raises(self):
+        a1, a2, b1, b2 = self.create_teams(4)
+        group_phase = self.create_group_phase([[a1, a2], [b1, b2]])
+        with self.assertRaises(ValueError):
+            cpg.promote(group_phase, self.cup_phase, 2)
+        self.assertFalse(self.cup_phase.cup_fights.exists())
+
+    def test_promote_from_group_with_missing_round_robin_fight_raises(self):
+        a1, a2, a3, b1, b2 = self.create_teams(5)
+        group_phase = self.create_group_phase([[a1, a2, a3], [b1, b2]])
+        self.add_result(group_phase, a1, a2)
+        self.add_result(group_phase, a1, a3)
+        self.add_result(group_phase, b1, b2)
+        with self.assertRaises(ValueError):
+            cpg.promote(group_phase, self.cup_phase, 2)
+        self.assertFalse(self.cup_phase.cup_fights.exists())
+
+    def test_duplicated_teams_raise(self):
+        t1, = self.create_teams(1)
+        with self.assertRaises(ValueError):
+            cpg.generate(self.cup_phase, cpg.seeded_slots([t1, t1]))
+        self.assertFalse(cfm.CupFight.objects.exists())
@@ -0,0 +1,6 @@
+import ippon.models.cup_phase as cpm
+import ippon.utils.permissions as iup
+
+
+class IsCupPhaseOwner(iup.IsTournamentDependentOwner):
+    model = cpm.CupPhase
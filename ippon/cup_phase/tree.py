@@ -0,0 +1,47 @@
+import ippon.models.cup_fight as cfm
+
+
+def team_node(team):
+    return {'id': team.id, 'name': team.name} if team is not None else None
+
+
+def team_fight_node(team_fight):
+    if team_fight is None:
+        return None
+    return {
+        'id': team_fight.id,
+        'aka_team': team_node(team_fight.aka_team),
+        'shiro_team': team_node(team_fight.shiro_team),
+        'winner': team_fight.winner,
+        'status': team_fight.status,
+        'aka_score': team_fight.aka_wins,
+        'shiro_score': team_fight.shiro_wins,
+        'aka_points': team_fight.aka_points,
+        'shiro_points': team_fight.shiro_points
+    }
+
+
+def bracket_tree(cup_phase_id):
+    """
+    Cup fights of the phase nested from the final down to the first round, with their team fights, teams
+    and stored scores, all read in one query. Returns a list of roots, as a bracket built by hand may have
+    several of them.
+    """
+    cup_fights = {cup_fight.id: cup_fight for cup_fight in cfm.CupFight.objects.filter(cup_phase=cup_phase_id)
+                  .select_related('team_fight__aka_team', 'team_fight__shiro_team', 'bye_team').order_by('pk')}
+    previous = {fight_id for cup_fight in cup_fights.values()
+                for fight_id in (cup_fight.previous_aka_fight_id, cup_fight.previous_shiro_fight_id)}
+
+    def node(cup_fight_id):
+        cup_fight = cup_fights.get(cup_fight_id)
+        if cup_fight is None:
+            return None
+        return {
+            'id': cup_fight.id,
+            'team_fight': team_fight_node(cup_fight.team_fight),
+            'bye_team': team_node(cup_fight.bye_team),
+            'previous_aka_fight': node(cup_fight.previous_aka_fight_id),
+            'previous_shiro_fight': node(cup_fight.previous_shiro_fight_id)
+        }
+
+    return [node(cup_fight_id) for cup_fight_id in cup_fights if cup_fight_id not in previous]
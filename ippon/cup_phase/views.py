@@ -1,30 +1,102 @@
-from rest_framework import viewsets, permissions
+from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action, api_view
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 
 import ippon.cup_fight.serializers as cfs
+import ippon.cup_phase.generation as cpg
+import ippon.cup_phase.permissions as cpp
 import ippon.cup_phase.serializers as cps
+import ippon.cup_phase.tree as cpt
+import ippon.fight.line_ups as flu
+import ippon.fight.serializers as fs
 import ippon.models.cup_fight as cfm
 import ippon.models.cup_phase as cpm
+import ippon.models.group_phase as gpm
+import ippon.models.team_fight as tfm
 import ippon.tournament.authorizations as ta
 import ippon.tournament.permissions as tp
+import ippon.utils.cache as iuc
+import ippon.utils.etag as iue
+import ippon.utils.pagination as iupg
 
 
-class CupPhaseViewSet(viewsets.ModelViewSet):
+class CupPhaseViewSet(iue.TournamentVersionETagMixin, viewsets.ModelViewSet):
     queryset = cpm.CupPhase.objects.all()
     serializer_class = cps.CupPhaseSerializer
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,
                           tp.IsTournamentAdminOrReadOnlyDependent)
+    tournament_lookup = 'cup_phases'
+    etag_actions = ('retrieve', 'cup_fights', 'bracket')
 
     @action(
         methods=['get'],
         detail=True,
         url_name='cup_fights')
+    @iuc.cached_response
     def cup_fights(self, request, pk=None):
         get_object_or_404(self.queryset, pk=pk)
-        serializer = cfs.CupFightSerializer(cfm.CupFight.objects.filter(cup_phase=pk), many=True)
-        return Response(serializer.data)
+        return iupg.paginated_response(self, cfm.CupFight.objects.filter(cup_phase=pk).order_by('pk'),
+                                       cfs.CupFightSerializer)
+
+    @action(
+        methods=['get'],
+        detail=True,
+        url_name='bracket')
+    @iuc.cached_response
+    def bracket(self, request, pk=None):
+        get_object_or_404(self.queryset, pk=pk)
+        return Response(cpt.bracket_tree(pk))
+
+    @action(
+        methods=['post'],
+        detail=True,
+        url_name='generate',
+        url_path='generate',
+        permission_classes=[
+            permissions.IsAuthenticated,
+            cpp.IsCupPhaseOwner])
+    def generate(self, request, pk=None):
+        cup_phase = get_object_or_404(self.queryset, pk=pk)
+        try:
+            cup_fights = cpg.generate(cup_phase, cpg.seeded_slots(request.data.get('teams', [])))
+        except (TypeError, ValueError) as e:
+            return Response(status=status.HTTP_400_BAD_REQUEST, data={'error': str(e)})
+        return Response(cfs.CupFightSerializer(cup_fights, many=True).data, status=status.HTTP_201_CREATED)
+
+    @action(
+        methods=['post'],
+        detail=True,
+        url_name='promote',
+        url_path='promote',
+        permission_classes=[
+            permissions.IsAuthenticated,
+            cpp.IsCupPhaseOwner])
+    def promote(self, request, pk=None):
+        cup_phase = get_object_or_404(self.queryset, pk=pk)
+        try:
+            group_phase = get_object_or_404(gpm.GroupPhase.objects.filter(tournament=cup_phase.tournament_id),
+                                            pk=int(request.data.get('group_phase')))
+            top = int(request.data.get('top', 2))
+            if top < 1:
+                raise ValueError('top must be positive')
+            cup_fights = cpg.promote(group_phase, cup_phase, top)
+        except (TypeError, ValueError) as e:
+            return Response(status=status.HTTP_400_BAD_REQUEST, data={'error': str(e)})
+        return Response(cfs.CupFightSerializer(cup_fights, many=True).data, status=status.HTTP_201_CREATED)
+
+    @action(
+        methods=['post'],
+        detail=True,
+        url_name='generate_fights',
+        url_path='generate_fights',
+        permission_classes=[
+            permissions.IsAuthenticated,
+            cpp.IsCupPhaseOwner])
+    def generate_fights(self, request, pk=None):
+        cup_phase = get_object_or_404(self.queryset, pk=pk)
+        fights = flu.generate(tfm.TeamFight.objects.filter(cup_fight__cup_phase=cup_phase))
+        return Response(fs.FightSerializer(fights, many=True).data, status=status.HTTP_201_CREATED)
 
 
 @api_view(['GET'])
@@ -6,6 +6,7 @@ from rest_framework.response import Response
 import ippon.event.permissions as ep
 import ippon.event.serializers as es
 import ippon.models.event as em
+import ippon.utils.pagination as iupg
 
 
 class EventViewSet(viewsets.ModelViewSet):
@@ -28,7 +29,7 @@ class EventViewSet(viewsets.ModelViewSet):
         url_name='my_tournaments')
     def return_users_events(self, request: Request):
         if request.user.is_authenticated:
-            events = [i.event for i in em.EventAdmin.objects.filter(user=request.user)]
-            return Response(data=self.serializer_class(events, many=True).data)
+            events = em.Event.objects.filter(eventadmin__user=request.user)
+            return iupg.paginated_response(self, events, self.serializer_class)
         else:
             return Response(status=status.HTTP_401_UNAUTHORIZED, data={"error": "You are not logged in."})
@@ -43,9 +43,9 @@ class FightViewTest(APITestCase):
         self.f2 = self.tf.fights.create(aka=self.p2, shiro=self.p1)
 
         self.f1_json = {'id': self.f1.id, 'aka': self.p1.id, 'shiro': self.p2.id, 'team_fight': self.tf.id, 'status': 0,
-                        'winner': 0}
+                        'winner': 0, 'aka_points': 0, 'shiro_points': 0, 'aka_fouls': 0, 'shiro_fouls': 0}
         self.f2_json = {'id': self.f2.id, 'aka': self.p2.id, 'shiro': self.p1.id, 'team_fight': self.tf.id, 'status': 0,
-                        'winner': 0}
+                        'winner': 0, 'aka_points': 0, 'shiro_points': 0, 'aka_fouls': 0, 'shiro_fouls': 0}
         self.valid_payload = {'id': self.f1.id, 'aka': self.p1.id, 'shiro': self.p1.id, 'team_fight': self.tf.id,
                               'status': 1, 'winner': 0}
         self.invalid_payload = {'id': self.f1.id, 'aka': self.p1.id, 'shiro': iuv.BAD_PK, 'team_fight': self.tf.id,
@@ -102,6 +102,27 @@ class FightViewSetAuthorizedTests(FightViewTest):
         response = self.client.delete(reverse('fight-detail', kwargs={'pk': -5}))
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_post_record_adds_points_and_finishes_fight(self):
+        response = self.client.post(reverse('fight-record', kwargs={'pk': self.f1.pk}),
+                                    {'points': [{'player': self.p1.id, 'type': 0}, {'player': self.p2.id, 'type': 1}],
+                                     'winner': 0, 'status': 2}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        points = list(self.f1.points.order_by('pk'))
+        self.assertEqual({'fight': dict(self.f1_json, status=2),
+                          'points': [{'id': points[0].id, 'player': self.p1.id, 'fight': self.f1.id, 'type': 0},
+                                     {'id': points[1].id, 'player': self.p2.id, 'fight': self.f1.id, 'type': 1}]},
+                         response.data)
+
+    def test_post_record_with_invalid_point_returns_bad_request(self):
+        response = self.client.post(reverse('fight-record', kwargs={'pk': self.f1.pk}),
+                                    {'points': [{'player': iuv.BAD_PK, 'type': 0}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(self.f1.points.exists())
+
+    def test_post_record_for_not_existing_fight_returns_not_found(self):
+        response = self.client.post(reverse('fight-record', kwargs={'pk': iuv.BAD_PK}), {'points': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
 
 class FightViewSetUnauthenticatedTests(FightViewTest):
     def setUp(self):
@@ -122,6 +143,10 @@ class FightViewSetUnauthenticatedTests(FightViewTest):
         response = self.client.get(reverse('fight-detail', kwargs={'pk': -1}))
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_post_record_gets_unauthorized(self):
+        response = self.client.post(reverse('fight-record', kwargs={'pk': self.f1.pk}), {'points': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
 
 class FightViewSetUnauthorizedTests(FightViewTest):
     def setUp(self):
@@ -148,6 +173,12 @@ class FightViewSetUnauthorizedTests(FightViewTest):
         response = self.client.delete(reverse('fight-detail', kwargs={'pk': self.t1.id}))
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_unauthorized_post_record_gets_forbidden(self):
+        response = self.client.post(reverse('fight-record', kwargs={'pk': self.f1.pk}),
+                                    {'points': [{'player': self.p1.id, 'type': 0}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(self.f1.points.exists())
+
 
 class UnauthenticatedFightsPointsTest(FightViewSetUnauthenticatedTests):
     def setUp(self):
@@ -155,6 +186,8 @@ class UnauthenticatedFightsPointsTest(FightViewSetUnauthenticatedTests):
         self.po1 = self.f1.points.create(player=self.p1, type=0)
         self.po2 = self.f1.points.create(player=self.p2, type=1)
         self.po3 = self.f2.points.create(player=self.p2, type=1)
+        self.f1_json.update(aka_points=1, shiro_points=1)
+        self.f2_json.update(aka_points=1)
 
         self.po1_json = {'id': self.po1.id, 'player': self.p1.id, 'fight': self.f1.id, 'type': 0}
         self.po2_json = {'id': self.po2.id, 'player': self.p2.id, 'fight': self.f1.id, 'type': 1}
@@ -0,0 +1,52 @@
+import collections
+
+from django.db import transaction
+
+import ippon.models.fight as fm
+import ippon.models.team as tem
+import ippon.models.tournament_changes as tcm
+
+
+def load_line_ups(team_ids):
+    """
+    Players of the teams in the order in which they were added to them, read in one query.
+    """
+    line_ups = collections.defaultdict(list)
+    for team_id, player_id in tem.TeamMember.objects.filter(team__in=team_ids).order_by('team_id', 'pk') \
+            .values_list('team_id', 'player_id'):
+        line_ups[team_id].append(player_id)
+    return line_ups
+
+
+def plan_fights(team_fight, line_ups, team_size):
+    """
+    Fights of the team fight pairing players of both line-ups position by position, up to the team size.
+    Positions which one of the teams cannot fill get no fight.
+    """
+    aka = line_ups.get(team_fight.aka_team_id, [])[:team_size]
+    shiro = line_ups.get(team_fight.shiro_team_id, [])[:team_size]
+    return [fm.Fight(team_fight=team_fight, aka_id=aka_id, shiro_id=shiro_id, ordering_number=number)
+            for number, (aka_id, shiro_id) in enumerate(zip(aka, shiro))]
+
+
+def generate(team_fights):
+    """
+    Creates the fights of those of the given team fights which have none yet, from the line-ups of their teams,
+    in one transaction and a constant number of queries. Returns the created fights.
+    """
+    with transaction.atomic():
+        team_fights = list(team_fights.select_related('tournament').select_for_update(of=('self',)).order_by('pk'))
+        fought = set(fm.Fight.objects.filter(team_fight__in=[team_fight.id for team_fight in team_fights])
+                     .values_list('team_fight_id', flat=True).distinct())
+        team_fights = [team_fight for team_fight in team_fights if team_fight.id not in fought]
+        line_ups = load_line_ups({team_id for team_fight in team_fights
+                                  for team_id in (team_fight.aka_team_id, team_fight.shiro_team_id)})
+        fights = fm.Fight.objects.bulk_create(
+            [fight for team_fight in team_fights
+             for fight in plan_fights(team_fight, line_ups, team_fight.tournament.team_size)])
+
+        for tournament_id in {fight.team_fight.tournament_id for fight in fights}:
+            tcm.notify_changed(tournament_id, fm.Fight,
+                               [fight for fight in fights if fight.team_fight.tournament_id == tournament_id],
+                               tcm.CREATED)
+    return fights
@@ -0,0 +1,65 @@
+import datetime
+
+from django.test import TestCase
+
+import ippon.fight.line_ups as flu
+import ippon.models.club as cl
+import ippon.models.fight as fm
+import ippon.models.player as plm
+import ippon.models.team_fight as tfm
+import ippon.models.tournament as tm
+
+
+class LineUpsTests(TestCase):
+    def setUp(self):
+        self.club = cl.Club.objects.create(name='cn1', webpage='http://cw1.co', description='cd1', city='cc1')
+        self.tournament = tm.Tournament.objects.create(
+            name='T1', webpage='http://w1.co', description='d1', city='c1',
+            date=datetime.date(year=2021, month=1, day=1), address='a1', team_size=3, group_match_length=3,
+            ko_match_length=3, final_match_length=3, finals_depth=0, age_constraint=5, age_constraint_value=20,
+            rank_constraint=5, rank_constraint_value=7, sex_constraint=1)
+
+    def create_team(self, name, size):
+        team = self.tournament.teams.create(name=name)
+        players = []
+        for number in range(size):
+            player = plm.Player.objects.create(name='{}p{}'.format(name, number), surname='s', rank=7, sex=1,
+                                               birthday=datetime.date(year=2001, month=1, day=1), club_id=self.club)
+            team.team_members.create(player=player)
+            players.append(player.id)
+        return team, players
+
+    def get_fights(self, team_fight):
+        return list(team_fight.fights.order_by('ordering_number').values_list('ordering_number', 'aka', 'shiro'))
+
+    def test_players_are_paired_in_member_order_up_to_team_size(self):
+        aka, aka_players = self.create_team('a', 4)
+        shiro, shiro_players = self.create_team('s', 3)
+        team_fight = self.tournament.team_fights.create(aka_team=aka, shiro_team=shiro)
+        flu.generate(tfm.TeamFight.objects.filter(pk=team_fight.pk))
+        self.assertEqual([(number, aka_players[number], shiro_players[number]) for number in range(3)],
+                         self.get_fights(team_fight))
+
+    def test_positions_not_filled_by_both_teams_get_no_fight(self):
+        aka, aka_players = self.create_team('a', 3)
+        shiro, shiro_players = self.create_team('s', 1)
+        team_fight = self.tournament.team_fights.create(aka_team=aka, shiro_team=shiro)
+        flu.generate(tfm.TeamFight.objects.filter(pk=team_fight.pk))
+        self.assertEqual([(0, aka_players[0], shiro_players[0])], self.get_fights(team_fight))
+
+    def test_team_fights_with_fights_are_skipped(self):
+        aka, aka_players = self.create_team('a', 3)
+        shiro, shiro_players = self.create_team('s', 3)
+        team_fight = self.tournament.team_fights.create(aka_team=aka, shiro_team=shiro)
+        team_fight.fights.create(aka_id=aka_players[2], shiro_id=shiro_players[2])
+        self.assertEqual([], flu.generate(tfm.TeamFight.objects.filter(pk=team_fight.pk)))
+        self.assertEqual(1, team_fight.fights.count())
+
+    def test_fights_of_many_team_fights_are_created_in_constant_number_of_queries(self):
+        teams = [self.create_team('t{}'.format(number), 3)[0] for number in range(8)]
+        for aka, shiro in zip(teams[:4], teams[4:]):
+            self.tournament.team_fights.create(aka_team=aka, shiro_team=shiro)
+        with self.assertNumQueries(8):
+            fights = flu.generate(tfm.TeamFight.objects.filter(tournament=self.tournament))
+        self.assertEqual(12, len(fights))
+        self.assertEqual(12, fm.Fight.objects.count())
@@ -1,6 +1,7 @@
 from rest_framework import permissions
 
 import ippon.fight.serializers as fs
+import ippon.models.fight as fm
 import ippon.models.team_fight as tfm
 import ippon.models.tournament as tm
 import ippon.utils.permissions as ip
@@ -16,3 +17,8 @@ class IsFightOwnerOrReadOnly(permissions.BasePermission):
         if request and request.method in permissions.SAFE_METHODS:
             return True
         return tm.TournamentAdmin.objects.filter(tournament=fight.team_fight.tournament, user=request.user).count() > 0
+
+
+class IsFightOwner(ip.IsTournamentDependentOwner):
+    model = fm.Fight
+    tournament_path = 'team_fight__tournament'
@@ -0,0 +1,59 @@
+from django.db import transaction
+
+import ippon.models.fight as fm
+import ippon.models.point as ptm
+import ippon.models.score_counters as scm
+import ippon.models.team_fight as tfm
+import ippon.models.tournament_changes as tcm
+
+POINT_TYPES = {point_type for point_type, _ in ptm.POINT_TYPE}
+WINNERS = {winner for winner, _ in tfm.WINNER}
+STATUSES = {fight_status for fight_status, _ in tfm.STATUS}
+
+
+def choice(value, choices, name):
+    if type(value) is not int or value not in choices:
+        raise ValueError('{} has to be one of {}'.format(name, sorted(choices)))
+    return value
+
+
+def record(fight_id, points, winner=None, status=None):
+    """
+    Adds points to the fight and optionally sets its winner and status, all in one transaction.
+    Points are given as dicts with player (one of the fight's players) and type; nothing is written unless
+    all of them are valid. The fight row is locked, so batches recorded for one fight apply one after another.
+    Returns the fight and the created points.
+    """
+    if not isinstance(points, list):
+        raise TypeError('points has to be a list')
+    if winner is not None:
+        choice(winner, WINNERS, 'winner')
+    if status is not None:
+        choice(status, STATUSES, 'status')
+    with transaction.atomic():
+        fight = fm.Fight.objects.select_for_update().select_related('team_fight').get(pk=fight_id)
+        players = {fight.aka_id, fight.shiro_id}
+        created = []
+        for point in points:
+            if not isinstance(point, dict):
+                raise TypeError('every point has to be an object')
+            created.append(ptm.Point(fight=fight, player_id=choice(point.get('player'), players, 'player'),
+                                     type=choice(point.get('type'), POINT_TYPES, 'type')))
+        created = ptm.Point.objects.bulk_create(created)
+
+        changes = {name: value for name, value in (('winner', winner), ('status', status))
+                   if value is not None and value != getattr(fight, name)}
+        if changes:
+            fm.Fight.objects.filter(pk=fight.pk).update(**changes)
+            for name, value in changes.items():
+                setattr(fight, name, value)
+        if not created and not changes:
+            return fight, created
+
+        scm.refresh_counters(fight_ids=[fight.id])
+        tournament_id = fight.team_fight.tournament_id
+        if created:
+            tcm.notify_changed(tournament_id, ptm.Point, created, tcm.CREATED)
+        if changes:
+            tcm.notify_changed(tournament_id, fm.Fight, [fight], tcm.UPDATED)
+    return fight, created
@@ -0,0 +1,74 @@
+import datetime
+
+from django.test import TestCase
+
+import ippon.fight.recording as fr
+import ippon.models.club as cl
+import ippon.models.fight as fm
+import ippon.models.player as plm
+import ippon.models.tournament as tm
+
+
+class RecordTests(TestCase):
+    def setUp(self):
+        club = cl.Club.objects.create(name='cn1', webpage='http://cw1.co', description='cd1', city='cc1')
+        self.tournament = tm.Tournament.objects.create(
+            name='T1', webpage='http://w1.co', description='d1', city='c1',
+            date=datetime.date(year=2021, month=1, day=1), address='a1', team_size=1, group_match_length=3,
+            ko_match_length=3, final_match_length=3, finals_depth=0, age_constraint=5, age_constraint_value=20,
+            rank_constraint=5, rank_constraint_value=7, sex_constraint=1)
+        self.p1 = plm.Player.objects.create(name='pn1', surname='ps1', rank=7, sex=1, club_id=club,
+                                            birthday=datetime.date(year=2001, month=1, day=1))
+        self.p2 = plm.Player.objects.create(name='pn2', surname='ps2', rank=7, sex=1, club_id=club,
+                                            birthday=datetime.date(year=2001, month=1, day=1))
+        self.p3 = plm.Player.objects.create(name='pn3', surname='ps3', rank=7, sex=1, club_id=club,
+                                            birthday=datetime.date(year=2001, month=1, day=1))
+        t1 = self.tournament.teams.create(name='t1')
+        t1.team_members.create(player=self.p1)
+        t2 = self.tournament.teams.create(name='t2')
+        t2.team_members.create(player=self.p2)
+        self.team_fight = self.tournament.team_fights.create(aka_team=t1, shiro_team=t2)
+        self.fight = self.team_fight.fights.create(aka=self.p1, shiro=self.p2)
+
+    def get_version(self):
+        return tm.Tournament.objects.get(pk=self.tournament.pk).version
+
+    def test_points_winner_and_status_are_recorded_with_counters(self):
+        fight, points = fr.record(self.fight.id, [{'player': self.p1.id, 'type': 0},
+                                                  {'player': self.p1.id, 'type': 1},
+                                                  {'player': self.p2.id, 'type': 4}], winner=1, status=2)
+        self.assertEqual(3, self.fight.points.count())
+        self.assertEqual({point.id for point in points}, set(self.fight.points.values_list('pk', flat=True)))
+        self.fight.refresh_from_db()
+        self.assertEqual((1, 2, 2, 0, 0, 1), (self.fight.winner, self.fight.status, self.fight.aka_points,
+                                              self.fight.shiro_points, self.fight.aka_fouls,
+                                              self.fight.shiro_fouls))
+        self.team_fight.refresh_from_db()
+        self.assertEqual((1, 2), (self.team_fight.aka_wins, self.team_fight.aka_points))
+        self.assertEqual((1, 2), (fight.winner, fight.status))
+
+    def test_invalid_point_writes_nothing(self):
+        version = self.get_version()
+        with self.assertRaises(ValueError):
+            fr.record(self.fight.id, [{'player': self.p1.id, 'type': 0}, {'player': self.p3.id, 'type': 0}],
+                      status=2)
+        with self.assertRaises(ValueError):
+            fr.record(self.fight.id, [{'player': self.p1.id, 'type': 9}])
+        with self.assertRaises(ValueError):
+            fr.record(self.fight.id, [], winner=3)
+        with self.assertRaises(TypeError):
+            fr.record(self.fight.id, {'player': self.p1.id, 'type': 0})
+        self.assertFalse(self.fight.points.exists())
+        self.assertEqual(0, fm.Fight.objects.get(pk=self.fight.pk).status)
+        self.assertEqual(version, self.get_version())
+
+    def test_empty_batch_changes_nothing(self):
+        version = self.get_version()
+        fight, points = fr.record(self.fight.id, [], winner=0)
+        self.assertEqual([], points)
+        self.assertEqual(version, self.get_version())
+
+    def test_batch_is_recorded_in_constant_number_of_queries(self):
+        with self.assertNumQueries(14):
+            fr.record(self.fight.id, [{'player': self.p1.id, 'type': 0}] * 20, winner=1, status=2)
+        self.assertEqual(20, self.fight.points.count())
@@ -12,5 +12,10 @@ class FightSerializer(serializers.ModelSerializer):
             'shiro',
             'team_fight',
             'winner',
-            'status'
+            'status',
+            'aka_points',
+            'shiro_points',
+            'aka_fouls',
+            'shiro_fouls'
         )
+        read_only_fields = ippon.models.fight.COUNTER_FIELDS
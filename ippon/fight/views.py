@@ -1,22 +1,27 @@
-from rest_framework import viewsets, permissions
+from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action, api_view
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 
 import ippon.fight.permissions as fp
+import ippon.fight.recording as fr
 import ippon.fight.serializers as fs
 import ippon.models
 import ippon.models.fight
 import ippon.models.point as ptm
 import ippon.point.serializers as pts
 import ippon.tournament.authorizations as ta
+import ippon.utils.etag as iue
+import ippon.utils.pagination as iupg
 
 
-class FightViewSet(viewsets.ModelViewSet):
+class FightViewSet(iue.TournamentVersionETagMixin, viewsets.ModelViewSet):
     queryset = ippon.models.fight.Fight.objects.all()
     serializer_class = fs.FightSerializer
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,
                           fp.IsFightOwnerOrReadOnly)
+    tournament_lookup = 'team_fights__fights'
+    etag_actions = ('retrieve', 'points')
 
     @action(
         methods=['get'],
@@ -24,8 +29,28 @@ class FightViewSet(viewsets.ModelViewSet):
         url_name='points')
     def points(self, request, pk=None):
         fight = get_object_or_404(self.queryset, pk=pk)
-        serializer = pts.PointSerializer(ptm.Point.objects.filter(fight=fight), many=True)
-        return Response(serializer.data)
+        return iupg.paginated_response(self, ptm.Point.objects.filter(fight=fight), pts.PointSerializer)
+
+    @action(
+        methods=['post'],
+        detail=True,
+        url_name='record',
+        url_path='record',
+        permission_classes=[
+            permissions.IsAuthenticated,
+            fp.IsFightOwner])
+    def record(self, request, pk=None):
+        try:
+            if not isinstance(request.data, dict):
+                raise TypeError('object with points, winner and status is required')
+            fight, points = fr.record(pk, request.data.get('points', []), request.data.get('winner'),
+                                      request.data.get('status'))
+        except ippon.models.fight.Fight.DoesNotExist:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        except (TypeError, ValueError) as e:
+            return Response(status=status.HTTP_400_BAD_REQUEST, data={'error': str(e)})
+        return Response({'fight': fs.FightSerializer(fight).data,
+                         'points': pts.PointSerializer(points, many=True).data})
 
 
 @api_view(['GET'])
@@ -185,6 +185,27 @@ class GroupViewSetUnauthenticatedTests(GroupViewTest):
         response = self.client.get(reverse('group-group_fights', kwargs={'pk': iuv.BAD_PK}))
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_get_team_fights_for_valid_group_returns_team_fights_with_scores(self):
+        c = cl.Club.objects.create(name='cn1', webpage='http://cw1.co', description='cd1', city='cc1')
+        p1 = plm.Player.objects.create(name='pn1', surname='ps1', rank=7,
+                                       birthday=datetime.date(year=2001, month=1, day=1), sex=1, club_id=c)
+        t1 = tem.Team.objects.create(tournament=self.to, name='t1')
+        t2 = tem.Team.objects.create(tournament=self.to, name='t2')
+        tf1 = tfm.TeamFight.objects.create(aka_team=t1, shiro_team=t2, tournament=self.to)
+        tf2 = tfm.TeamFight.objects.create(aka_team=t2, shiro_team=t1, tournament=self.to)
+        self.group1.group_fights.create(team_fight=tf1)
+        self.group2.group_fights.create(team_fight=tf2)
+        tf1.fights.create(aka=p1, shiro=p1, winner=2)
+
+        response = self.client.get(reverse('group-team_fights', kwargs={'pk': self.group1.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([{'id': tf1.id, 'aka_team': t1.id, 'shiro_team': t2.id, 'tournament': self.to.id,
+                           'winner': 0, 'status': 0, 'aka_score': 0, 'shiro_score': 1}], response.data)
+
+    def test_get_team_fights_for_invalid_group_returns_not_found(self):
+        response = self.client.get(reverse('group-team_fights', kwargs={'pk': iuv.BAD_PK}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
 
 class GroupViewSetMembersTests(GroupViewTest):
     def setUp(self):
@@ -215,6 +236,11 @@ class GroupViewSetMembersUnauthorizedTests(GroupViewSetMembersTests):
         response = self.client.get(reverse('group-not-assigned', kwargs={'pk': self.group1.pk}))
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_post_round_robin_returns_forbidden(self):
+        response = self.client.post(reverse('group-round_robin', kwargs={'pk': self.group1.pk}))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(tfm.TeamFight.objects.exists())
+
 
 class GroupViewSetMembersUnauthenticatedTests(GroupViewSetMembersTests):
     def setUp(self):
@@ -232,6 +258,10 @@ class GroupViewSetMembersUnauthenticatedTests(GroupViewSetMembersTests):
         response = self.client.get(reverse('group-not-assigned', kwargs={'pk': self.group1.pk}))
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
+    def test_post_round_robin_returns_unauthorized(self):
+        response = self.client.post(reverse('group-round_robin', kwargs={'pk': self.group1.pk}))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
 
 class GroupMemberViewSetScoreCountingTests(GroupViewTest):
     def setUp(self):
@@ -368,6 +398,37 @@ class GroupMemberViewSetScoreCountingTests(GroupViewTest):
         }
         self.group_member_score_test(expected_response, self.t3.id)
 
+    def expected_standings(self, t2_rank=2, t3_rank=3):
+        return [{'id': self.t1.id, 'wins': 1, 'draws': 1, 'points': 7, 'rank': 1},
+                {'id': self.t2.id, 'wins': 0, 'draws': 1, 'points': 4, 'rank': t2_rank},
+                {'id': self.t3.id, 'wins': 0, 'draws': 2, 'points': 3, 'rank': t3_rank}]
+
+    def test_get_standings_returns_ranked_scores_of_all_members(self):
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('group-standings', kwargs={'pk': self.group1.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.expected_standings(), response.data)
+
+    def test_get_standings_with_custom_tie_breakers_shares_rank_of_still_tied_teams(self):
+        response = self.client.get(reverse('group-standings', kwargs={'pk': self.group1.id}),
+                                   {'tie_breakers': 'wins,head_to_head'})
+        self.assertEqual(self.expected_standings(t2_rank=2, t3_rank=2), response.data)
+
+    def test_get_standings_with_unknown_tie_breaker_returns_bad_request(self):
+        response = self.client.get(reverse('group-standings', kwargs={'pk': self.group1.id}),
+                                   {'tie_breakers': 'wins,luck'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_standings_for_invalid_group_returns_not_found(self):
+        response = self.client.get(reverse('group-standings', kwargs={'pk': iuv.BAD_PK}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_get_group_phase_standings_returns_standings_of_every_group(self):
+        response = self.client.get(reverse('groupphase-standings', kwargs={'pk': self.group_phase.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([{'group': self.group1.id, 'standings': self.expected_standings()},
+                          {'group': self.group2.id, 'standings': []}], response.data)
+
 
 class AuthorizedGroupMembersViewTests(GroupViewSetMembersTests):
     def setUp(self):
@@ -386,6 +447,22 @@ class ValidIdsGroupMembersViewTests(AuthorizedGroupMembersViewTests):
         )
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
+    def test_post_round_robin_creates_team_fight_for_every_pair_of_members(self):
+        self.group1.group_members.create(team=self.t3)
+        response = self.client.post(reverse('group-round_robin', kwargs={'pk': self.group1.pk}))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(3, len(response.data))
+        pairs = tfm.TeamFight.objects.filter(group_fight__group=self.group1).values_list('aka_team', 'shiro_team')
+        self.assertEqual({frozenset((self.t1.id, self.t2.id)), frozenset((self.t1.id, self.t3.id)),
+                          frozenset((self.t2.id, self.t3.id))}, {frozenset(pair) for pair in pairs})
+
+    def test_post_round_robin_again_creates_only_missing_team_fights(self):
+        self.client.post(reverse('group-round_robin', kwargs={'pk': self.group1.pk}))
+        self.group1.group_members.create(team=self.t3)
+        response = self.client.post(reverse('group-round_robin', kwargs={'pk': self.group1.pk}))
+        self.assertEqual(2, len(response.data))
+        self.assertEqual(3, tfm.TeamFight.objects.filter(group_fight__group=self.group1).count())
+
     def test_delete_existing_group_member_deletes_it(self):
         response = self.client.delete(reverse('group-members', kwargs={'pk': self.group1.pk, 'team_id': self.t2.pk}))
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
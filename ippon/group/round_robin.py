@@ -0,0 +1,74 @@
+from django.db import transaction
+
+import ippon.models.group as gm
+import ippon.models.group_fight as gfm
+import ippon.models.team_fight as tfm
+import ippon.models.tournament_changes as tcm
+
+
+def circle_rounds(team_ids):
+    """
+    Round-robin rounds by the circle method: the first team stays in place while the others rotate,
+    so every team fights at most once per round. With an odd number of teams one of them rests each round.
+    """
+    teams = list(team_ids)
+    if len(teams) % 2:
+        teams.append(None)
+    rounds = []
+    for round_number in range(len(teams) - 1):
+        pairs = [(teams[i], teams[-1 - i]) for i in range(len(teams) // 2)]
+        if round_number % 2:
+            pairs[0] = pairs[0][::-1]
+        rounds.append([pair for pair in pairs if None not in pair])
+        teams = [teams[0], teams[-1]] + teams[1:-1]
+    return rounds
+
+
+def schedule(team_ids):
+    """
+    Orders the bouts of every round so that the teams which fought most recently go last,
+    giving each team as much rest between its bouts as the rounds allow.
+    """
+    last_bout = {}
+    bouts = []
+    for pairs in circle_rounds(team_ids):
+        remaining = list(pairs)
+        while remaining:
+            pair = min(remaining, key=lambda p: max(last_bout.get(p[0], -1), last_bout.get(p[1], -1)))
+            remaining.remove(pair)
+            for team_id in pair:
+                last_bout[team_id] = len(bouts)
+            bouts.append(pair)
+    return bouts
+
+
+def generate(groups):
+    """
+    Creates the missing round-robin team fights of the given groups in one transaction,
+    skipping pairs which already fight in their group. Returns the created group fights.
+    """
+    with transaction.atomic():
+        groups = list(groups.select_related('group_phase').select_for_update(of=('self',)).order_by('pk'))
+        group_ids = [group.id for group in groups]
+        members = {}
+        for group_id, team_id in gm.GroupMember.objects.filter(group__in=group_ids).order_by('pk') \
+                .values_list('group_id', 'team_id'):
+            members.setdefault(group_id, []).append(team_id)
+        scheduled = {(group_id, frozenset(pair)) for group_id, *pair in gfm.GroupFight.objects
+                     .filter(group__in=group_ids).values_list('group_id', 'team_fight__aka_team', 'team_fight__shiro_team')}
+
+        planned = [(group, aka, shiro) for group in groups for aka, shiro in schedule(members.get(group.id, []))
+                   if (group.id, frozenset((aka, shiro))) not in scheduled]
+        team_fights = tfm.TeamFight.objects.bulk_create(
+            [tfm.TeamFight(tournament_id=group.group_phase.tournament_id, aka_team_id=aka, shiro_team_id=shiro)
+             for group, aka, shiro in planned])
+        group_fights = gfm.GroupFight.objects.bulk_create(
+            [gfm.GroupFight(group=group, team_fight=team_fight) for (group, _, _), team_fight in zip(planned, team_fights)])
+
+        for tournament_id in {group.group_phase.tournament_id for group, _, _ in planned}:
+            tcm.notify_changed(tournament_id, tfm.TeamFight,
+                               [tf for tf in team_fights if tf.tournament_id == tournament_id], tcm.CREATED)
+            tcm.notify_changed(tournament_id, gfm.GroupFight,
+                               [gf for gf in group_fights if gf.group.group_phase.tournament_id == tournament_id],
+                               tcm.CREATED)
+    return group_fights
@@ -0,0 +1,25 @@
+import itertools
+
+from django.test import SimpleTestCase
+
+import ippon.group.round_robin as grr
+
+
+class ScheduleTests(SimpleTestCase):
+    def test_every_pair_fights_exactly_once(self):
+        for count in range(2, 10):
+            teams = list(range(1, count + 1))
+            bouts = grr.schedule(teams)
+            self.assertEqual(count * (count - 1) // 2, len(bouts))
+            self.assertEqual({frozenset(pair) for pair in itertools.combinations(teams, 2)},
+                             {frozenset(bout) for bout in bouts})
+
+    def test_every_team_fights_at_most_once_per_round(self):
+        for pairs in grr.circle_rounds(range(1, 8)):
+            teams = [team for pair in pairs for team in pair]
+            self.assertEqual(len(set(teams)), len(teams))
+
+    def test_teams_do_not_fight_back_to_back_in_groups_of_five_or_more(self):
+        for count in range(5, 10):
+            bouts = grr.schedule(range(1, count + 1))
+            self.assertFalse([(a, b) for a, b in zip(bouts, bouts[1:]) if set(a) & set(b)])
@@ -0,0 +1,91 @@
+import itertools
+
+import ippon.models.group as gm
+import ippon.models.team_fight as tfm
+
+WINS = 'wins'
+POINTS = 'points'
+HEAD_TO_HEAD = 'head_to_head'
+TIE_BREAKERS = (WINS, POINTS, HEAD_TO_HEAD)
+FINISHED = 2
+
+
+def parse_tie_breakers(value):
+    if not value:
+        return TIE_BREAKERS
+    tie_breakers = tuple(value.split(','))
+    unknown = [tie_breaker for tie_breaker in tie_breakers if tie_breaker not in TIE_BREAKERS]
+    if unknown:
+        raise ValueError('unknown tie breakers: {}'.format(', '.join(unknown)))
+    return tie_breakers
+
+
+def group_phase_standings(group_phase_id, tie_breakers=TIE_BREAKERS):
+    """
+    Standings of every group of the phase, as a dict of group id to rows ordered by rank.
+    Reads group members and finished team fights (with their stored score counters) in two queries.
+    """
+    return compute_standings(gm.GroupMember.objects.filter(group__group_phase=group_phase_id),
+                             tfm.TeamFight.objects.filter(group_fight__group__group_phase=group_phase_id),
+                             tie_breakers)
+
+
+def group_standings(group_id, tie_breakers=TIE_BREAKERS):
+    return compute_standings(gm.GroupMember.objects.filter(group=group_id),
+                             tfm.TeamFight.objects.filter(group_fight__group=group_id),
+                             tie_breakers).get(int(group_id), [])
+
+
+def compute_standings(group_members, team_fights, tie_breakers):
+    rows = {}
+    for group_id, team_id in group_members.order_by('group_id', 'team_id').values_list('group_id', 'team_id'):
+        rows.setdefault(group_id, {})[team_id] = {'id': team_id, 'wins': 0, 'draws': 0, 'points': 0}
+
+    results = {}
+    for group_id, aka, shiro, winner, aka_points, shiro_points in team_fights.filter(status=FINISHED).values_list(
+            'group_fight__group', 'aka_team', 'shiro_team', 'winner', 'aka_points', 'shiro_points'):
+        group_rows = rows.get(group_id, {})
+        for team_id, team_winner, points in [(aka, 1, aka_points), (shiro, 2, shiro_points)]:
+            if team_id not in group_rows:
+                continue
+            row = group_rows[team_id]
+            row['points'] += points
+            if winner == 0:
+                row['draws'] += 1
+            elif winner == team_winner:
+                row['wins'] += 1
+        if winner != 0:
+            winner_id, loser_id = (aka, shiro) if winner == 1 else (shiro, aka)
+            results.setdefault(group_id, []).append((winner_id, loser_id))
+
+    return {group_id: rank(list(group_rows.values()), results.get(group_id, []), tie_breakers)
+            for group_id, group_rows in rows.items()}
+
+
+def rank(rows, results, tie_breakers):
+    tied_groups = [rows]
+    for tie_breaker in tie_breakers:
+        tied_groups = [group for tied in tied_groups for group in split_ties(tied, results, tie_breaker)]
+    ranked = []
+    for tied in tied_groups:
+        position = len(ranked) + 1
+        for row in tied:
+            row['rank'] = position
+            ranked.append(row)
+    return ranked
+
+
+def split_ties(tied, results, tie_breaker):
+    if len(tied) < 2:
+        return [tied]
+    if tie_breaker == HEAD_TO_HEAD:
+        team_ids = {row['id'] for row in tied}
+        head_to_head_wins = {team_id: 0 for team_id in team_ids}
+        for winner_id, loser_id in results:
+            if winner_id in team_ids and loser_id in team_ids:
+                head_to_head_wins[winner_id] += 1
+        key = lambda row: head_to_head_wins[row['id']]
+    else:
+        key = lambda row: row[tie_breaker]
+    ordered = sorted(tied, key=key, reverse=True)
+    return [list(group) for _, group in itertools.groupby(ordered, key=key)]
@@ -0,0 +1,23 @@
+from django.test import SimpleTestCase
+
+import ippon.group.standings as gst
+
+
+class RankTests(SimpleTestCase):
+    def rows(self, *scores):
+        return [{'id': team_id, 'wins': wins, 'draws': 0, 'points': points}
+                for team_id, (wins, points) in enumerate(scores, start=1)]
+
+    def test_head_to_head_breaks_tie_left_after_wins_and_points(self):
+        ranked = gst.rank(self.rows((1, 3), (1, 3), (2, 0)), [(2, 1), (3, 2), (1, 3)], gst.TIE_BREAKERS)
+        self.assertEqual([(3, 1), (2, 2), (1, 3)], [(row['id'], row['rank']) for row in ranked])
+
+    def test_teams_tied_on_every_criterion_share_rank(self):
+        ranked = gst.rank(self.rows((0, 1), (1, 1), (0, 1), (0, 0)), [], gst.TIE_BREAKERS)
+        self.assertEqual([(2, 1), (1, 2), (3, 2), (4, 4)], [(row['id'], row['rank']) for row in ranked])
+
+    def test_parse_tie_breakers_rejects_unknown_names(self):
+        self.assertEqual((gst.POINTS, gst.WINS), gst.parse_tie_breakers('points,wins'))
+        self.assertEqual(gst.TIE_BREAKERS, gst.parse_tie_breakers(None))
+        with self.assertRaises(ValueError):
+            gst.parse_tie_breakers('points,coin_toss')
@@ -1,26 +1,35 @@
-from django.db.models.query_utils import Q
+from django.db.models import Case, Sum, When
+from django.db.models.functions import Coalesce
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action, api_view
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 
 import ippon.group.permissions as gp
+import ippon.group.round_robin as grr
 import ippon.group.serializers as gs
+import ippon.group.standings as gst
 import ippon.group_fight.serializers as gfs
 import ippon.models.group as gm
 import ippon.models.group_fight as gfm
-import ippon.models.point as ptm
 import ippon.models.team as tem
 import ippon.models.team_fight as tfm
 import ippon.team.serializers as tes
+import ippon.team_fight.serializers as tfs
 import ippon.tournament.authorizations as ta
+import ippon.utils.cache as iuc
+import ippon.utils.etag as iue
+import ippon.utils.pagination as iupg
 
 
-class GroupViewSet(viewsets.ModelViewSet):
+class GroupViewSet(iue.TournamentVersionETagMixin, viewsets.ModelViewSet):
     queryset = gm.Group.objects.all()
     serializer_class = gs.GroupSerializer
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,
                           gp.IsGroupOwnerOrReadOnly)
+    tournament_lookup = 'group_phases__groups'
+    etag_actions = ('retrieve', 'members', 'not_assigned', 'group_fights', 'team_fights', 'member_score',
+                    'standings')
 
     # TODO: check when will DRF finally release the multiple actions for single url improvement
     @action(
@@ -70,9 +79,10 @@ class GroupViewSet(viewsets.ModelViewSet):
             return Response(status=status.HTTP_404_NOT_FOUND)
 
     @action(methods=['get'], detail=True)
+    @iuc.cached_response
     def members(self, request, pk=None):
-        serializer = tes.TeamSerializer(tem.Team.objects.filter(group_member__group=pk), many=True)
-        return Response(serializer.data)
+        return iupg.paginated_response(self, tem.Team.objects.filter(group_member__group=pk).with_members(),
+                                       tes.TeamSerializer)
 
     @action(methods=['get'],
             detail=True,
@@ -81,10 +91,11 @@ class GroupViewSet(viewsets.ModelViewSet):
                 gp.IsGroupOwner])
     def not_assigned(self, request, pk=None):
         get_object_or_404(self.queryset, pk=pk)
-        serializer = tes.TeamSerializer(
+        return iupg.paginated_response(
+            self,
             tem.Team.objects.filter(tournament__group_phases__groups=pk)
-                .exclude(group_member__group__group_phase__groups=pk), many=True)
-        return Response(serializer.data)
+                .exclude(group_member__group__group_phase__groups=pk).with_members(),
+            tes.TeamSerializer)
 
     @action(
         methods=['get'],
@@ -92,8 +103,30 @@ class GroupViewSet(viewsets.ModelViewSet):
         url_name='group_fights')
     def group_fights(self, request, pk=None):
         get_object_or_404(self.queryset, pk=pk)
-        serializer = gfs.GroupFightSerializer(gfm.GroupFight.objects.filter(group=pk), many=True)
-        return Response(serializer.data)
+        return iupg.paginated_response(self, gfm.GroupFight.objects.filter(group=pk), gfs.GroupFightSerializer)
+
+    @action(
+        methods=['get'],
+        detail=True,
+        url_name='team_fights')
+    def team_fights(self, request, pk=None):
+        get_object_or_404(self.queryset, pk=pk)
+        return iupg.paginated_response(
+            self,
+            tfm.TeamFight.objects.filter(group_fight__group=pk).order_by('pk'),
+            tfs.TeamFightSerializer)
+
+    @action(
+        methods=['post'],
+        detail=True,
+        url_name='round_robin',
+        url_path='round_robin',
+        permission_classes=[
+            permissions.IsAuthenticated,
+            gp.IsGroupOwner])
+    def round_robin(self, request, pk=None):
+        group_fights = grr.generate(gm.Group.objects.filter(pk=pk))
+        return Response(gfs.GroupFightSerializer(group_fights, many=True).data, status=status.HTTP_201_CREATED)
 
     @action(
         methods=['get'],
@@ -110,13 +143,24 @@ class GroupViewSet(viewsets.ModelViewSet):
                 | fights.filter(shiro_team=team_id, winner=2)).count()
 
         draws = fights.filter(winner=0, status=2).count()
-        points = ptm.Point.objects.exclude(type=4) \
-            .filter(fight__team_fight__group_fight__group=pk, fight__team_fight__status=2) \
-            .filter(Q(fight__team_fight__aka_team=team_id) | Q(fight__team_fight__shiro_team=team_id)) \
-            .filter(player__in=team.get_member_ids()).count()
+        points = fights.aggregate(points=Coalesce(Sum(Case(When(aka_team=team_id, then='aka_points'),
+                                                           default='shiro_points')), 0))['points']
 
         return Response({"wins": wins, "draws": draws, "points": points, "id": team.id})
 
+    @action(
+        methods=['get'],
+        detail=True,
+        url_name='standings')
+    @iuc.cached_response
+    def standings(self, request, pk=None):
+        get_object_or_404(self.queryset, pk=pk)
+        try:
+            tie_breakers = gst.parse_tie_breakers(request.query_params.get('tie_breakers'))
+        except ValueError as e:
+            return Response(status=status.HTTP_400_BAD_REQUEST, data={'error': str(e)})
+        return Response(gst.group_standings(pk, tie_breakers))
+
 
 @api_view(['GET'])
 def group_authorization(request, pk, format=None):
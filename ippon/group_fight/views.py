@@ -3,10 +3,12 @@ from rest_framework import viewsets, permissions
 import ippon.group_fight.permissions as gfp
 import ippon.group_fight.serializers as gfs
 import ippon.models.group_fight as gfm
+import ippon.utils.etag as iue
 
 
-class GroupFightViewSet(viewsets.ModelViewSet):
+class GroupFightViewSet(iue.TournamentVersionETagMixin, viewsets.ModelViewSet):
     queryset = gfm.GroupFight.objects.all()
     serializer_class = gfs.GroupFightSerializer
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,
                           gfp.IsGroupFightOwnerOrReadOnly)
+    tournament_lookup = 'group_phases__groups__group_fights'
@@ -6,6 +6,9 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
 
+import ippon.models.club as cl
+import ippon.models.group as gm
+import ippon.models.player as plm
 import ippon.models.tournament as tm
 import ippon.utils.values as iuv
 
@@ -36,6 +39,85 @@ class GroupPhasesViewSetAuthorizedTests(GroupPhasesViewTest):
         tm.TournamentAdmin.objects.create(user=self.user, tournament=self.to, is_master=False)
         self.client.force_authenticate(user=self.user)
 
+    def add_groups(self, count, teams_per_group):
+        for i in range(count):
+            group = self.gp1.groups.create(name='G{}'.format(i))
+            for j in range(teams_per_group):
+                group.group_members.create(team=self.to.teams.create(name='t{}-{}'.format(i, j)))
+
+    def add_team(self, club, *ranks):
+        team = self.to.teams.create(name='t{}'.format(self.to.teams.count()))
+        for rank in ranks:
+            team.team_members.create(player=plm.Player.objects.create(
+                name='pn', surname='ps', rank=rank, birthday=datetime.date(year=2001, month=1, day=1), sex=1,
+                club_id=club))
+        return team
+
+    def test_post_seed_assigns_unassigned_teams_to_new_groups(self):
+        c1 = cl.Club.objects.create(name='cn1', webpage='http://cw1.co', description='cd1', city='cc1')
+        c2 = cl.Club.objects.create(name='cn2', webpage='http://cw1.co', description='cd1', city='cc1')
+        t1 = self.add_team(c1, 10, 8)
+        t2 = self.add_team(c2, 8, 8)
+        t3 = self.add_team(c2, 7)
+        t4 = self.add_team(c1, 1, 2)
+        with self.assertNumQueries(13):
+            response = self.client.post(reverse('groupphase-seed', kwargs={'pk': self.gp1.pk}), {'groups': 2})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        groups = list(self.gp1.groups.order_by('pk'))
+        self.assertEqual(['Group 1', 'Group 2'], [group.name for group in groups])
+        self.assertEqual([{'group': groups[0].id, 'teams': [t1.id, t3.id]},
+                          {'group': groups[1].id, 'teams': [t2.id, t4.id]}], response.data)
+        self.assertEqual(4, gm.GroupMember.objects.filter(group__group_phase=self.gp1).count())
+
+    def test_post_seed_again_assigns_only_new_teams(self):
+        self.gp1.groups.create(name='G1')
+        self.add_team(cl.Club.objects.create(name='cn1', webpage='http://cw1.co', description='cd1', city='cc1'), 7)
+        self.client.post(reverse('groupphase-seed', kwargs={'pk': self.gp1.pk}))
+        response = self.client.post(reverse('groupphase-seed', kwargs={'pk': self.gp1.pk}))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([[]], [group['teams'] for group in response.data])
+
+    def test_post_seed_without_groups_returns_bad_request(self):
+        response = self.client.post(reverse('groupphase-seed', kwargs={'pk': self.gp1.pk}))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_post_seed_with_invalid_group_count_returns_bad_request(self):
+        response = self.client.post(reverse('groupphase-seed', kwargs={'pk': self.gp1.pk}), {'groups': 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_post_seed_with_fewer_groups_than_existing_returns_bad_request(self):
+        self.add_groups(2, 1)
+        self.add_team(cl.Club.objects.create(name='cn1', webpage='http://cw1.co', description='cd1', city='cc1'), 7)
+        response = self.client.post(reverse('groupphase-seed', kwargs={'pk': self.gp1.pk}), {'groups': 1})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(2, gm.GroupMember.objects.filter(group__group_phase=self.gp1).count())
+
+    def test_post_round_robin_creates_team_fights_of_all_groups_in_constant_number_of_queries(self):
+        self.add_groups(2, 4)
+        with self.assertNumQueries(14):
+            response = self.client.post(reverse('groupphase-round_robin', kwargs={'pk': self.gp1.pk}))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(12, len(response.data))
+
+        self.add_groups(16, 4)
+        with self.assertNumQueries(14):
+            response = self.client.post(reverse('groupphase-round_robin', kwargs={'pk': self.gp1.pk}))
+        self.assertEqual(16 * 6, len(response.data))
+
+    def test_post_generate_fights_creates_fights_of_all_group_team_fights(self):
+        club = cl.Club.objects.create(name='cn1', webpage='http://cw1.co', description='cd1', city='cc1')
+        group = self.gp1.groups.create(name='G1')
+        for _ in range(3):
+            group.group_members.create(team=self.add_team(club, 1))
+        self.client.post(reverse('groupphase-round_robin', kwargs={'pk': self.gp1.pk}))
+        response = self.client.post(reverse('groupphase-generate_fights', kwargs={'pk': self.gp1.pk}))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(3, len(response.data))
+
+    def test_post_generate_fights_for_not_existing_group_phase_returns_not_found(self):
+        response = self.client.post(reverse('groupphase-generate_fights', kwargs={'pk': iuv.BAD_PK}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_post_valid_payload_creates_specified_group_phase(self):
         response = self.client.post(
             reverse('groupphase-list'),
@@ -85,6 +167,19 @@ class GroupPhaseViewSetUnauthorizedTests(GroupPhasesViewTest):
         super(GroupPhaseViewSetUnauthorizedTests, self).setUp()
         self.client.force_authenticate(user=self.user)
 
+    def test_post_seed_gets_forbidden(self):
+        response = self.client.post(reverse('groupphase-seed', kwargs={'pk': self.gp1.pk}), {'groups': 2})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(self.gp1.groups.exists())
+
+    def test_post_generate_fights_gets_forbidden(self):
+        response = self.client.post(reverse('groupphase-generate_fights', kwargs={'pk': self.gp1.pk}))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_post_round_robin_gets_forbidden(self):
+        response = self.client.post(reverse('groupphase-round_robin', kwargs={'pk': self.gp1.pk}))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
     def test_put_gets_forbidden(self):
         response = self.client.put(
             reverse('groupphase-detail', kwargs={'pk': self.gp1.pk}),
@@ -159,3 +254,28 @@ class GroupPhaseViewSetUnauthenticatedTests(GroupPhasesViewTest):
     def test_get_groups_for_invalid_group_phase_returns_not_found(self):
         response = self.client.get(reverse('groupphase-groups', kwargs={'pk': iuv.BAD_PK}))
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_get_team_fights_for_valid_group_phase_returns_scored_team_fights_of_all_groups(self):
+        c = cl.Club.objects.create(name='cn1', webpage='http://cw1.co', description='cd1', city='cc1')
+        p1 = plm.Player.objects.create(name='pn1', surname='ps1', rank=7,
+                                       birthday=datetime.date(year=2001, month=1, day=1), sex=1, club_id=c)
+        t1 = self.to.teams.create(name='t1')
+        t2 = self.to.teams.create(name='t2')
+        team_fights = []
+        for name in ['G1', 'G2']:
+            group = self.gp1.groups.create(name=name)
+            team_fight = self.to.team_fights.create(aka_team=t1, shiro_team=t2)
+            group.group_fights.create(team_fight=team_fight)
+            team_fight.fights.create(aka=p1, shiro=p1, winner=1)
+            team_fights.append(team_fight)
+        self.to.team_fights.create(aka_team=t2, shiro_team=t1)
+
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('groupphase-team_fights', kwargs={'pk': self.gp1.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([(tf.id, 1, 0) for tf in team_fights],
+                         [(tf['id'], tf['aka_score'], tf['shiro_score']) for tf in response.data])
+
+    def test_get_team_fights_for_invalid_group_phase_returns_not_found(self):
+        response = self.client.get(reverse('groupphase-team_fights', kwargs={'pk': iuv.BAD_PK}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,6 @@
+import ippon.models.group_phase as gpm
+import ippon.utils.permissions as iup
+
+
+class IsGroupPhaseOwner(iup.IsTournamentDependentOwner):
+    model = gpm.GroupPhase
@@ -0,0 +1,79 @@
+import collections
+import random
+
+from django.db import transaction
+
+import ippon.models.group as gm
+import ippon.models.team as tem
+import ippon.models.tournament_changes as tcm
+
+SeededTeam = collections.namedtuple('SeededTeam', ['id', 'rank', 'clubs'])
+
+
+def seed_teams(teams, group_ids, seed=0, group_clubs=None):
+    """
+    Snake seeding: teams ordered by rank (ties broken by a shuffle with the given seed) are dealt into pots of
+    one team per group, the pots going alternately forwards and backwards over the groups.
+    Within a pot a team takes the first free group in the snake order that has no team from any of its clubs,
+    or the one with the fewest such teams. Returns a dict of group id to the list of assigned team ids.
+    """
+    teams = list(teams)
+    random.Random(seed).shuffle(teams)
+    teams.sort(key=lambda team: team.rank, reverse=True)
+    clubs = {group_id: set((group_clubs or {}).get(group_id, ())) for group_id in group_ids}
+    assignment = {group_id: [] for group_id in group_ids}
+    for pot_number, start in enumerate(range(0, len(teams), len(group_ids))):
+        free = list(group_ids) if pot_number % 2 == 0 else list(reversed(group_ids))
+        for team in teams[start:start + len(group_ids)]:
+            index, group_id = min(enumerate(free), key=lambda group: (len(clubs[group[1]] & team.clubs), group[0]))
+            del free[index]
+            assignment[group_id].append(team.id)
+            clubs[group_id] |= team.clubs
+    return assignment
+
+
+def load_teams(team_ids):
+    ranks = collections.defaultdict(list)
+    clubs = collections.defaultdict(set)
+    for team_id, rank, club_id in tem.TeamMember.objects.filter(team__in=team_ids) \
+            .values_list('team_id', 'player__rank', 'player__club_id'):
+        ranks[team_id].append(rank)
+        clubs[team_id].add(club_id)
+    return ranks, clubs
+
+
+def seed_group_phase(group_phase, group_count=None, seed=0):
+    """
+    Assigns the tournament's teams which are not in any group of the phase to its groups, creating groups
+    when group_count exceeds their number. A group_count below the number of existing groups is refused. Returns a dict of group id to the list of newly assigned team ids.
+    """
+    with transaction.atomic():
+        groups = list(group_phase.groups.select_for_update().order_by('pk'))
+        if group_count is not None:
+            if group_count < len(groups):
+                raise ValueError('group phase already has {} groups'.format(len(groups)))
+            groups = groups + gm.Group.objects.bulk_create(
+                [gm.Group(group_phase=group_phase, name='Group {}'.format(number))
+                 for number in range(len(groups) + 1, group_count + 1)])
+        if not groups:
+            raise ValueError('group phase has no groups')
+        group_ids = [group.id for group in groups]
+
+        team_ids = list(tem.Team.objects.filter(tournament=group_phase.tournament_id)
+                        .exclude(group_member__group__group_phase=group_phase).order_by('pk')
+                        .values_list('pk', flat=True))
+        members = list(gm.GroupMember.objects.filter(group__in=group_ids).values_list('group_id', 'team_id'))
+        ranks, clubs = load_teams(team_ids + [team_id for _, team_id in members])
+        group_clubs = collections.defaultdict(set)
+        for group_id, team_id in members:
+            group_clubs[group_id] |= clubs[team_id]
+
+        teams = [SeededTeam(team_id, sum(ranks[team_id]) / len(ranks[team_id]) if ranks[team_id] else 0,
+                            frozenset(clubs[team_id])) for team_id in team_ids]
+        assignment = seed_teams(teams, group_ids, seed, group_clubs)
+        group_members = gm.GroupMember.objects.bulk_create(
+            [gm.GroupMember(group_id=group_id, team_id=team_id)
+             for group_id, assigned in assignment.items() for team_id in assigned])
+        if group_members:
+            tcm.notify_changed(group_phase.tournament_id, gm.GroupMember, group_members, tcm.CREATED)
+    return assignment
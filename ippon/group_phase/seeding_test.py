@@ -0,0 +1,28 @@
+from django.test import SimpleTestCase
+
+import ippon.group_phase.seeding as gpse
+
+
+def team(team_id, rank, *clubs):
+    return gpse.SeededTeam(team_id, rank, frozenset(clubs))
+
+
+class SeedTeamsTests(SimpleTestCase):
+    def test_teams_are_snake_seeded_by_rank(self):
+        teams = [team(team_id, 10 - team_id, team_id) for team_id in range(1, 7)]
+        self.assertEqual({'A': [1, 4, 5], 'B': [2, 3, 6]}, gpse.seed_teams(teams, ['A', 'B']))
+
+    def test_teams_from_same_club_are_separated_within_pot(self):
+        teams = [team(1, 9, 'x'), team(2, 8, 'y'), team(3, 7, 'y'), team(4, 6, 'z')]
+        self.assertEqual({'A': [1, 3], 'B': [2, 4]}, gpse.seed_teams(teams, ['A', 'B']))
+
+    def test_clubs_of_existing_members_are_taken_into_account(self):
+        teams = [team(1, 9, 'x'), team(2, 8, 'y')]
+        self.assertEqual({'A': [2], 'B': [1]}, gpse.seed_teams(teams, ['A', 'B'], group_clubs={'A': {'x'}}))
+
+    def test_seed_decides_order_of_equally_ranked_teams_deterministically(self):
+        teams = [team(team_id, 5, team_id) for team_id in range(20)]
+        self.assertEqual(gpse.seed_teams(teams, ['A', 'B', 'C'], seed=3),
+                         gpse.seed_teams(teams, ['A', 'B', 'C'], seed=3))
+        self.assertNotEqual(gpse.seed_teams(teams, ['A', 'B', 'C'], seed=3),
+                            gpse.seed_teams(teams, ['A', 'B', 'C'], seed=4))
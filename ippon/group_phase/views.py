@@ -1,21 +1,35 @@
-from rest_framework import viewsets, permissions
+from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action, api_view
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 
+import ippon.fight.line_ups as flu
+import ippon.fight.serializers as fs
 import ippon.group.serializers as gs
+import ippon.group.round_robin as grr
+import ippon.group.standings as gst
+import ippon.group_fight.serializers as gfs
+import ippon.group_phase.permissions as gpp
+import ippon.group_phase.seeding as gpse
 import ippon.group_phase.serializers as gps
 import ippon.models.group as gm
 import ippon.models.group_phase as gpm
+import ippon.models.team_fight as tfm
+import ippon.team_fight.serializers as tfs
 import ippon.tournament.authorizations as ta
 import ippon.tournament.permissions as tp
+import ippon.utils.cache as iuc
+import ippon.utils.etag as iue
+import ippon.utils.pagination as iupg
 
 
-class GroupPhaseViewSet(viewsets.ModelViewSet):
+class GroupPhaseViewSet(iue.TournamentVersionETagMixin, viewsets.ModelViewSet):
     queryset = gpm.GroupPhase.objects.all()
     serializer_class = gps.GroupPhaseSerializer
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,
                           tp.IsTournamentAdminOrReadOnlyDependent)
+    tournament_lookup = 'group_phases'
+    etag_actions = ('retrieve', 'groups', 'team_fights', 'standings')
 
     @action(
         methods=['get'],
@@ -23,8 +37,80 @@ class GroupPhaseViewSet(viewsets.ModelViewSet):
         url_name='groups')
     def groups(self, request, pk=None):
         get_object_or_404(self.queryset, pk=pk)
-        serializer = gs.GroupSerializer(gm.Group.objects.filter(group_phase=pk), many=True)
-        return Response(serializer.data)
+        return iupg.paginated_response(self, gm.Group.objects.filter(group_phase=pk), gs.GroupSerializer)
+
+    @action(
+        methods=['get'],
+        detail=True,
+        url_name='team_fights')
+    def team_fights(self, request, pk=None):
+        get_object_or_404(self.queryset, pk=pk)
+        return iupg.paginated_response(
+            self,
+            tfm.TeamFight.objects.filter(group_fight__group__group_phase=pk).order_by('pk'),
+            tfs.TeamFightSerializer)
+
+    @action(
+        methods=['post'],
+        detail=True,
+        url_name='round_robin',
+        url_path='round_robin',
+        permission_classes=[
+            permissions.IsAuthenticated,
+            gpp.IsGroupPhaseOwner])
+    def round_robin(self, request, pk=None):
+        group_phase = get_object_or_404(self.queryset, pk=pk)
+        group_fights = grr.generate(gm.Group.objects.filter(group_phase=group_phase))
+        return Response(gfs.GroupFightSerializer(group_fights, many=True).data, status=status.HTTP_201_CREATED)
+
+    @action(
+        methods=['post'],
+        detail=True,
+        url_name='seed',
+        url_path='seed',
+        permission_classes=[
+            permissions.IsAuthenticated,
+            gpp.IsGroupPhaseOwner])
+    def seed(self, request, pk=None):
+        group_phase = get_object_or_404(self.queryset, pk=pk)
+        try:
+            group_count = request.data.get('groups')
+            group_count = None if group_count is None else int(group_count)
+            if group_count is not None and group_count < 1:
+                raise ValueError('groups must be positive')
+            assignment = gpse.seed_group_phase(group_phase, group_count, int(request.data.get('seed', 0)))
+        except (TypeError, ValueError) as e:
+            return Response(status=status.HTTP_400_BAD_REQUEST, data={'error': str(e)})
+        return Response([{'group': group_id, 'teams': team_ids} for group_id, team_ids in assignment.items()],
+                        status=status.HTTP_201_CREATED)
+
+    @action(
+        methods=['get'],
+        detail=True,
+        url_name='standings')
+    @iuc.cached_response
+    def standings(self, request, pk=None):
+        get_object_or_404(self.queryset, pk=pk)
+        try:
+            tie_breakers = gst.parse_tie_breakers(request.query_params.get('tie_breakers'))
+        except ValueError as e:
+            return Response(status=status.HTTP_400_BAD_REQUEST, data={'error': str(e)})
+        standings = gst.group_phase_standings(pk, tie_breakers)
+        groups = gm.Group.objects.filter(group_phase=pk).order_by('pk').values_list('pk', flat=True)
+        return Response([{'group': group_id, 'standings': standings.get(group_id, [])} for group_id in groups])
+
+    @action(
+        methods=['post'],
+        detail=True,
+        url_name='generate_fights',
+        url_path='generate_fights',
+        permission_classes=[
+            permissions.IsAuthenticated,
+            gpp.IsGroupPhaseOwner])
+    def generate_fights(self, request, pk=None):
+        group_phase = get_object_or_404(self.queryset, pk=pk)
+        fights = flu.generate(tfm.TeamFight.objects.filter(group_fight__group__group_phase=group_phase))
+        return Response(fs.FightSerializer(fights, many=True).data, status=status.HTTP_201_CREATED)
 
 
 @api_view(['GET'])
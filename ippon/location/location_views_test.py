@@ -0,0 +1,136 @@
+import datetime
+import json
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+import ippon.models.tournament as tm
+import ippon.utils.cache as iuc
+import ippon.utils.values as iuv
+
+
+class LocationsViewTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        iuc.get_cache().clear()
+        self.user = User.objects.create(username='admin', password='password')
+        self.to = tm.Tournament.objects.create(name='T1', webpage='http://w1.co', description='d1', city='c1',
+                                               date=datetime.date(year=2021, month=1, day=1), address='a1',
+                                               team_size=1, group_match_length=3, ko_match_length=3,
+                                               final_match_length=3, finals_depth=0, age_constraint=5,
+                                               age_constraint_value=20, rank_constraint=5, rank_constraint_value=7,
+                                               sex_constraint=1)
+        self.l1 = self.to.locations.create(name='court 1')
+        self.l2 = self.to.locations.create(name='court 2')
+        self.l1_json = {'id': self.l1.id, 'tournament': self.to.id, 'name': 'court 1'}
+        self.l2_json = {'id': self.l2.id, 'tournament': self.to.id, 'name': 'court 2'}
+        self.valid_payload = {'id': self.l1.id, 'tournament': self.to.id, 'name': 'court 3'}
+        self.invalid_payload = {'id': self.l1.id, 'tournament': self.to.id, 'name': ''}
+
+
+class LocationViewSetAuthorizedTests(LocationsViewTest):
+    def setUp(self):
+        super(LocationViewSetAuthorizedTests, self).setUp()
+        tm.TournamentAdmin.objects.create(user=self.user, tournament=self.to, is_master=False)
+        self.client.force_authenticate(user=self.user)
+
+    def test_post_valid_payload_creates_specified_location(self):
+        response = self.client.post(reverse('location-list'), data=json.dumps(self.valid_payload),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(3, self.to.locations.count())
+
+    def test_post_invalid_payload_returns_400(self):
+        response = self.client.post(reverse('location-list'), data=json.dumps(self.invalid_payload),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_put_valid_payload_updates_location(self):
+        response = self.client.put(reverse('location-detail', kwargs={'pk': self.l1.pk}),
+                                   data=json.dumps(self.valid_payload), content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.valid_payload, response.data)
+
+    def test_delete_existing_location_deletes_it(self):
+        response = self.client.delete(reverse('location-detail', kwargs={'pk': self.l1.pk}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+
+class LocationViewSetUnauthorizedTests(LocationsViewTest):
+    def setUp(self):
+        super(LocationViewSetUnauthorizedTests, self).setUp()
+        self.client.force_authenticate(user=self.user)
+
+    def test_post_gets_forbidden(self):
+        response = self.client.post(reverse('location-list'), data=json.dumps(self.valid_payload),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_delete_gets_forbidden(self):
+        response = self.client.delete(reverse('location-detail', kwargs={'pk': self.l1.pk}))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class LocationViewSetUnauthenticatedTests(LocationsViewTest):
+    def setUp(self):
+        super(LocationViewSetUnauthenticatedTests, self).setUp()
+        self.start = timezone.make_aware(datetime.datetime(2021, 1, 1, 9))
+        self.teams = [self.to.teams.create(name='t{}'.format(i)) for i in range(2)]
+
+    def add_team_fight(self, location, minutes, team_fight_status=0):
+        return self.to.team_fights.create(aka_team=self.teams[0], shiro_team=self.teams[1], location=location,
+                                          scheduled_start=self.start + datetime.timedelta(minutes=minutes),
+                                          status=team_fight_status)
+
+    def test_list_returns_all_locations(self):
+        response = self.client.get(reverse('location-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([self.l1_json, self.l2_json], response.data)
+
+    def test_detail_for_existing_location_returns_correct_location(self):
+        response = self.client.get(reverse('location-detail', kwargs={'pk': self.l1.pk}))
+        self.assertEqual(self.l1_json, response.data)
+
+    def test_post_gets_unauthorized(self):
+        response = self.client.post(reverse('location-list'), data=json.dumps(self.valid_payload),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_get_queue_returns_started_and_next_team_fights_of_location(self):
+        self.add_team_fight(self.l1, 0, team_fight_status=2)
+        current = self.add_team_fight(self.l1, 10, team_fight_status=1)
+        third = self.add_team_fight(self.l1, 30)
+        second = self.add_team_fight(self.l1, 20)
+        self.add_team_fight(self.l1, 40)
+        self.add_team_fight(self.l2, 15)
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('location-queue', kwargs={'pk': self.l1.pk}), {'next': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(current.id, response.data['current']['id'])
+        self.assertEqual([second.id, third.id], [team_fight['id'] for team_fight in response.data['next']])
+
+    def test_get_queue_without_started_team_fight_has_no_current(self):
+        first = self.add_team_fight(self.l1, 0)
+        response = self.client.get(reverse('location-queue', kwargs={'pk': self.l1.pk}))
+        self.assertIsNone(response.data['current'])
+        self.assertEqual([first.id], [team_fight['id'] for team_fight in response.data['next']])
+
+    def test_get_queue_follows_status_changes(self):
+        first = self.add_team_fight(self.l1, 0)
+        self.client.get(reverse('location-queue', kwargs={'pk': self.l1.pk}))
+        first.status = 1
+        first.save()
+        response = self.client.get(reverse('location-queue', kwargs={'pk': self.l1.pk}))
+        self.assertEqual(first.id, response.data['current']['id'])
+        self.assertEqual([], response.data['next'])
+
+    def test_get_queue_with_invalid_count_returns_bad_request(self):
+        response = self.client.get(reverse('location-queue', kwargs={'pk': self.l1.pk}), {'next': 'many'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_queue_for_not_existing_location_returns_not_found(self):
+        response = self.client.get(reverse('location-queue', kwargs={'pk': iuv.BAD_PK}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,13 @@
+from rest_framework import serializers
+
+import ippon.models.location as lm
+
+
+class LocationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = lm.Location
+        fields = (
+            'id',
+            'tournament',
+            'name'
+        )
@@ -0,0 +1,45 @@
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+
+import ippon.location.serializers as ls
+import ippon.models.location as lm
+import ippon.models.team_fight as tfm
+import ippon.team_fight.serializers as tfs
+import ippon.tournament.permissions as tp
+import ippon.utils.cache as iuc
+import ippon.utils.etag as iue
+
+STARTED = 1
+MAX_NEXT = 20
+
+
+class LocationViewSet(iue.TournamentVersionETagMixin, viewsets.ModelViewSet):
+    queryset = lm.Location.objects.order_by('pk')
+    serializer_class = ls.LocationSerializer
+    permission_classes = (permissions.IsAuthenticatedOrReadOnly,
+                          tp.IsTournamentAdminOrReadOnlyDependent)
+    tournament_lookup = 'locations'
+    etag_actions = ('retrieve', 'queue')
+
+    @action(
+        methods=['get'],
+        detail=True,
+        url_name='queue')
+    @iuc.cached_response
+    def queue(self, request, pk=None):
+        get_object_or_404(self.queryset, pk=pk)
+        try:
+            count = int(request.query_params.get('next', 3))
+            if not 0 <= count <= MAX_NEXT:
+                raise ValueError('next must be between 0 and {}'.format(MAX_NEXT))
+        except ValueError as e:
+            return Response(status=status.HTTP_400_BAD_REQUEST, data={'error': str(e)})
+        team_fights = list(tfm.TeamFight.objects.location_queue(pk)[:count + 1])
+        current = team_fights[0] if team_fights and team_fights[0].status == STARTED else None
+        following = team_fights[1:] if current is not None else team_fights[:count]
+        return Response({
+            'current': tfs.ScheduledTeamFightSerializer(current).data if current is not None else None,
+            'next': tfs.ScheduledTeamFightSerializer(following, many=True).data
+        })
@@ -0,0 +1,59 @@
+import collections
+import random
+import timeit
+
+from django.core.management.base import BaseCommand
+
+import ippon.group.round_robin as grr
+import ippon.group_phase.seeding as gpse
+import ippon.tournament.scheduling as tsc
+
+
+def seeding_case(size):
+    rng = random.Random(size)
+    teams = [gpse.SeededTeam(team_id, rng.randint(0, 14), frozenset({rng.randrange(size // 4 + 1)}))
+             for team_id in range(size)]
+    group_ids = list(range(max(1, size // 4)))
+    return lambda: gpse.seed_teams(teams, group_ids, seed=1)
+
+
+def scheduling_case(size):
+    # Round robin groups of four teams for three quarters of the bouts, a knockout tree for the rest,
+    # on one court per 32 bouts.
+    rng = random.Random(size)
+    bouts = []
+    teams = 0
+    while len(bouts) < size * 3 // 4:
+        bouts.extend(tsc.Bout(len(bouts), pair, 9, []) for pair in grr.schedule(range(teams, teams + 4)))
+        teams += 4
+    leaves = (size - len(bouts) + 1) // 2
+    waiting = collections.deque()
+    while len(bouts) < size:
+        after = [waiting.popleft(), waiting.popleft()] if leaves <= 0 and len(waiting) >= 2 else []
+        leaves -= 1
+        bouts.append(tsc.Bout(len(bouts), tuple(rng.sample(range(teams), 2)), 15, after))
+        waiting.append(bouts[-1].id)
+    courts = {court: 0 for court in range(max(1, size // 32))}
+    return lambda: tsc.schedule(bouts, courts, rest=5)
+
+
+BENCHMARKS = {
+    'scheduling': scheduling_case,
+    'seeding': seeding_case,
+}
+
+
+class Command(BaseCommand):
+    help = 'Times in-memory engines on synthetic data, without touching the database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('benchmark', choices=sorted(BENCHMARKS))
+        parser.add_argument('--size', type=int, action='append',
+                            help='Problem size (number of teams or fights), may be repeated.')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        for size in options['size'] or [64, 256, 1024]:
+            run = BENCHMARKS[options['benchmark']](size)
+            best = min(timeit.repeat(run, number=1, repeat=options['repeat']))
+            self.stdout.write('{} size={}: {:.2f} ms'.format(options['benchmark'], size, best * 1000))
@@ -0,0 +1,16 @@
+import io
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+
+class BenchmarkTests(SimpleTestCase):
+    def test_benchmark_reports_time_for_every_size(self):
+        out = io.StringIO()
+        call_command('benchmark', 'seeding', '--size', '8', '--size', '16', '--repeat', '1', stdout=out)
+        self.assertEqual(2, len(out.getvalue().splitlines()))
+
+    def test_scheduling_benchmark_runs(self):
+        out = io.StringIO()
+        call_command('benchmark', 'scheduling', '--size', '64', '--repeat', '1', stdout=out)
+        self.assertIn('scheduling size=64', out.getvalue())
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+import ippon.models.score_counters as scm
+import ippon.models.team_fight as tfm
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the denormalized score counters of fights and team fights and verifies them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tournament', type=int, help='Only handle team fights of this tournament.')
+        parser.add_argument('--check', action='store_true',
+                            help='Only verify the counters, exit with an error when any of them is stale.')
+
+    def handle(self, *args, **options):
+        team_fights = tfm.TeamFight.objects.all()
+        if options['tournament'] is not None:
+            team_fights = team_fights.filter(tournament=options['tournament'])
+        if not options['check']:
+            scm.rebuild(team_fights)
+            self.stdout.write('Rebuilt score counters of {} team fights.'.format(team_fights.count()))
+
+        stale_fights = list(scm.stale_fights(team_fights).values_list('pk', flat=True))
+        stale_team_fights = list(scm.stale_team_fights(team_fights).values_list('pk', flat=True))
+        if stale_fights or stale_team_fights:
+            raise CommandError('Stale score counters of fights {} and team fights {}.'.format(stale_fights,
+                                                                                              stale_team_fights))
+        self.stdout.write('Score counters are up to date.')
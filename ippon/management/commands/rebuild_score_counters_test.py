@@ -0,0 +1,44 @@
+import datetime
+import io
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+import ippon.models.club as cl
+import ippon.models.fight as fm
+import ippon.models.player as plm
+import ippon.models.team_fight as tfm
+import ippon.models.tournament as tm
+
+
+class RebuildScoreCountersTests(TestCase):
+    def setUp(self):
+        self.tournament = tm.Tournament.objects.create(
+            name='T1', webpage='http://w1.co', description='d1', city='c1',
+            date=datetime.date(year=2021, month=1, day=1), address='a1', team_size=1, group_match_length=3,
+            ko_match_length=3, final_match_length=3, finals_depth=0, age_constraint=5, age_constraint_value=20,
+            rank_constraint=5, rank_constraint_value=7, sex_constraint=1)
+        c = cl.Club.objects.create(name='cn1', webpage='http://cw1.co', description='cd1', city='cc1')
+        p1 = plm.Player.objects.create(name='pn1', surname='ps1', rank=7,
+                                       birthday=datetime.date(year=2001, month=1, day=1), sex=1, club_id=c)
+        p2 = plm.Player.objects.create(name='pn2', surname='ps2', rank=7,
+                                       birthday=datetime.date(year=2001, month=1, day=1), sex=1, club_id=c)
+        t1 = self.tournament.teams.create(name='t1')
+        t2 = self.tournament.teams.create(name='t2')
+        t1.team_members.create(player=p1)
+        self.team_fight = self.tournament.team_fights.create(aka_team=t1, shiro_team=t2)
+        self.fight = self.team_fight.fights.create(aka=p1, shiro=p2, winner=1)
+        self.fight.points.create(player=p1, type=0)
+        tfm.TeamFight.objects.update(aka_wins=5, aka_points=0)
+        fm.Fight.objects.update(aka_points=3)
+
+    def test_check_reports_stale_counters(self):
+        with self.assertRaises(CommandError):
+            call_command('rebuild_score_counters', '--check', stdout=io.StringIO())
+
+    def test_rebuild_restores_counters(self):
+        call_command('rebuild_score_counters', '--tournament', str(self.tournament.id), stdout=io.StringIO())
+        call_command('rebuild_score_counters', '--check', stdout=io.StringIO())
+        self.assertEqual((1, 1), tfm.TeamFight.objects.values_list('aka_wins', 'aka_points').get())
+        self.assertEqual(1, fm.Fight.objects.values_list('aka_points', flat=True).get())
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.db import migrations
+
+SEARCHED_COLUMNS = [
+    ('ippon_player_name_search', 'ippon_player', 'name'),
+    ('ippon_player_surname_search', 'ippon_player', 'surname'),
+    ('ippon_auth_user_username_search', 'auth_user', 'username'),
+]
+
+
+def has_trigram_extension(cursor):
+    cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    return cursor.fetchone() is not None
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        if has_trigram_extension(cursor):
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            template = 'CREATE INDEX IF NOT EXISTS {index} ON {table} USING gin (UPPER({column}::text) gin_trgm_ops)'
+        else:
+            template = 'CREATE INDEX IF NOT EXISTS {index} ON {table} (UPPER({column}::text) text_pattern_ops)'
+        for index, table, column in SEARCHED_COLUMNS:
+            cursor.execute(template.format(index=index, table=table, column=column))
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for index, _, _ in SEARCHED_COLUMNS:
+            cursor.execute('DROP INDEX IF EXISTS {index}'.format(index=index))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('ippon', '0044_event_locationid'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 10:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ippon', '0045_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournament',
+            name='version',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 3.2.25 on 2026-10-18 10:41
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+FOUL = 4
+
+
+def count_subquery(queryset, group_field):
+    counts = queryset.order_by().values(group_field).annotate(count=Count('pk')).values('count')
+    return Coalesce(Subquery(counts, output_field=models.IntegerField()), 0)
+
+
+def fill_score_counters(apps, schema_editor):
+    Fight = apps.get_model('ippon', 'Fight')
+    Point = apps.get_model('ippon', 'Point')
+    TeamFight = apps.get_model('ippon', 'TeamFight')
+
+    def fight_points(player_field, fouls):
+        points = Point.objects.filter(fight=OuterRef('pk'), player=OuterRef(player_field))
+        return count_subquery(points.filter(type=FOUL) if fouls else points.exclude(type=FOUL), 'fight')
+
+    def wins(winner):
+        return count_subquery(Fight.objects.filter(team_fight=OuterRef('pk'), winner=winner), 'team_fight')
+
+    def team_points(team_field):
+        return count_subquery(Point.objects.filter(fight__team_fight=OuterRef('pk'),
+                                                   player__team_member__team=OuterRef(team_field)).exclude(type=FOUL),
+                              'fight__team_fight')
+
+    Fight.objects.update(aka_points=fight_points('aka', False), shiro_points=fight_points('shiro', False),
+                         aka_fouls=fight_points('aka', True), shiro_fouls=fight_points('shiro', True))
+    TeamFight.objects.update(aka_wins=wins(1), shiro_wins=wins(2), aka_points=team_points('aka_team'),
+                             shiro_points=team_points('shiro_team'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ippon', '0046_tournament_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fight',
+            name='aka_fouls',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='fight',
+            name='aka_points',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='fight',
+            name='shiro_fouls',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='fight',
+            name='shiro_points',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='teamfight',
+            name='aka_points',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='teamfight',
+            name='aka_wins',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='teamfight',
+            name='shiro_points',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='teamfight',
+            name='shiro_wins',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(fill_score_counters, migrations.RunPython.noop),
+    ]
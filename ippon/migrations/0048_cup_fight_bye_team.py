@@ -0,0 +1,19 @@
+# Generated by Django 3.2.25 on 2026-10-18 10:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ippon', '0047_score_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cupfight',
+            name='bye_team',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='ippon.team'),
+        ),
+    ]
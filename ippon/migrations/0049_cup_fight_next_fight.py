@@ -0,0 +1,36 @@
+# Generated by Django 3.2.25 on 2026-10-18 10:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Exists, OuterRef, Subquery
+
+AKA = 1
+SHIRO = 2
+
+
+def fill_next_fights(apps, schema_editor):
+    CupFight = apps.get_model('ippon', 'CupFight')
+    for side, field in [(AKA, 'previous_aka_fight'), (SHIRO, 'previous_shiro_fight')]:
+        following = CupFight.objects.filter(**{field: OuterRef('pk')}).values('pk')
+        CupFight.objects.filter(Exists(following)).update(next_fight=Subquery(following[:1]), next_fight_side=side)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ippon', '0048_cup_fight_bye_team'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cupfight',
+            name='next_fight',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='previous_fights', to='ippon.cupfight'),
+        ),
+        migrations.AddField(
+            model_name='cupfight',
+            name='next_fight_side',
+            field=models.IntegerField(choices=[(1, 'Aka'), (2, 'Shiro')], null=True),
+        ),
+        migrations.RunPython(fill_next_fights, migrations.RunPython.noop),
+    ]
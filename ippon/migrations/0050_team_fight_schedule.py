@@ -0,0 +1,24 @@
+# Generated by Django 3.2.25 on 2026-10-18 11:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ippon', '0049_cup_fight_next_fight'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='teamfight',
+            name='location',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='team_fights', to='ippon.location'),
+        ),
+        migrations.AddField(
+            model_name='teamfight',
+            name='scheduled_start',
+            field=models.DateTimeField(null=True),
+        ),
+    ]
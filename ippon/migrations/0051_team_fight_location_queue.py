@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-18 11:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ippon', '0050_team_fight_schedule'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='teamfight',
+            index=models.Index(condition=models.Q(('status__lt', 2)), fields=['location', 'status', 'scheduled_start'], name='team_fight_location_queue'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.25 on 2026-10-18 11:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ippon', '0051_team_fight_location_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TournamentChange',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sequence', models.BigIntegerField()),
+                ('model', models.CharField(max_length=50)),
+                ('object_id', models.BigIntegerField()),
+                ('action', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted')], max_length=10)),
+                ('tournament', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='changes', to='ippon.tournament')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='tournamentchange',
+            index=models.Index(fields=['tournament', 'sequence'], name='tournament_change_sequence'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 3.2.25 on 2026-10-18 11:35
+
+from django.db import migrations, models
+
+
+def mark_cup_team_fights(apps, schema_editor):
+    TeamFight = apps.get_model('ippon', 'TeamFight')
+    TeamFight.objects.filter(cup_fight__isnull=False).update(in_cup=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ippon', '0052_tournament_change'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='teamfight',
+            name='in_cup',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_cup_team_fights, migrations.RunPython.noop),
+    ]
@@ -12,3 +12,6 @@ from ippon.models.team import Team, TeamMember
 from ippon.models.team_fight import TeamFight
 from ippon.models.club import Club, ClubAdmin
 from ippon.models.event import Event, EventAdmin
+import ippon.models.tournament_changes
+import ippon.models.score_counters
+import ippon.models.bracket
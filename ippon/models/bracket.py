@@ -0,0 +1,144 @@
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_save, pre_save
+from django.dispatch.dispatcher import receiver
+
+import ippon.models.cup_fight as cfm
+import ippon.models.score_counters as scm
+import ippon.models.team_fight as tfm
+import ippon.models.tournament_changes as tcm
+
+
+class Bracket(object):
+    """
+    In-memory tree of a cup phase, loaded with its team fights in one query.
+    Winner advancement is computed on the loaded rows and only the changed ones are written back.
+    """
+
+    def __init__(self, cup_fights):
+        self.cup_fights = {cup_fight.id: cup_fight for cup_fight in cup_fights}
+        self.parents = {}
+        for cup_fight in self.cup_fights.values():
+            for child_id in (cup_fight.previous_aka_fight_id, cup_fight.previous_shiro_fight_id):
+                if child_id is not None:
+                    self.parents[child_id] = cup_fight
+        self.by_team_fight = {cup_fight.team_fight_id: cup_fight for cup_fight in self.cup_fights.values()
+                              if cup_fight.team_fight_id is not None}
+
+    @classmethod
+    def load(cls, cup_phase_id):
+        return cls(cfm.CupFight.objects.filter(cup_phase=cup_phase_id).select_related('team_fight'))
+
+    @classmethod
+    def containing(cls, team_fight_id):
+        return cls(cfm.CupFight.objects.filter(cup_phase__cup_fights__team_fight=team_fight_id)
+                   .select_related('team_fight'))
+
+    def winner(self, cup_fight_id, bye_team_id=None):
+        if cup_fight_id is None:
+            return bye_team_id
+        cup_fight = self.cup_fights.get(cup_fight_id)
+        team_fight = cup_fight.team_fight if cup_fight is not None else None
+        if team_fight is None or team_fight.winner == 0:
+            return None
+        return team_fight.aka_team_id if team_fight.winner == 1 else team_fight.shiro_team_id
+
+    def propagate(self, team_fight_id):
+        """
+        Advances winners from the cup fight of the given team fight towards the final. A parent team fight is
+        created once both of its previous fights have winners, and existing ones get their sides corrected;
+        a correction of an already decided fight changes its winner, so it cascades further up.
+        A parent whose previous fight lost its winner has its team fight removed (check_winner_reset keeps
+        that from happening to a started one).
+        A side without a previous fight is taken by the parent's bye team.
+        Returns (cup fights which need a new team fight, team fights whose teams were changed,
+        cup fights whose team fight has to be removed).
+        """
+        created = []
+        updated = []
+        removed = []
+        cup_fight = self.by_team_fight.get(team_fight_id)
+        while cup_fight is not None and cup_fight.id in self.parents:
+            parent = self.parents[cup_fight.id]
+            aka = self.winner(parent.previous_aka_fight_id, parent.bye_team_id)
+            shiro = self.winner(parent.previous_shiro_fight_id, parent.bye_team_id)
+            team_fight = parent.team_fight
+            if team_fight is None:
+                if aka is not None and shiro is not None:
+                    parent.team_fight = tfm.TeamFight(tournament_id=cup_fight.team_fight.tournament_id,
+                                                      aka_team_id=aka, shiro_team_id=shiro, in_cup=True)
+                    created.append(parent)
+                return created, updated, removed
+            if (aka is None and parent.previous_aka_fight_id is not None) or \
+                    (shiro is None and parent.previous_shiro_fight_id is not None):
+                removed.append(parent)
+                return created, updated, removed
+            teams = (team_fight.aka_team_id, team_fight.shiro_team_id)
+            team_fight.aka_team_id = aka if aka is not None else team_fight.aka_team_id
+            team_fight.shiro_team_id = shiro if shiro is not None else team_fight.shiro_team_id
+            if teams == (team_fight.aka_team_id, team_fight.shiro_team_id):
+                return created, updated, removed
+            updated.append(team_fight)
+            cup_fight = parent
+        return created, updated, removed
+
+    def save(self, created, updated, removed):
+        if not created and not updated and not removed:
+            return
+        with transaction.atomic():
+            if removed:
+                removed_ids = [cup_fight.team_fight_id for cup_fight in removed]
+                tournament_id = removed[0].team_fight.tournament_id
+                for cup_fight in removed:
+                    cup_fight.team_fight = None
+                tfm.TeamFight.objects.filter(pk__in=removed_ids).delete()
+                tcm.notify_changed(tournament_id, cfm.CupFight, removed, tcm.UPDATED)
+            if not created and not updated:
+                return
+            team_fights = tfm.TeamFight.objects.bulk_create([cup_fight.team_fight for cup_fight in created])
+            for cup_fight, team_fight in zip(created, team_fights):
+                cup_fight.team_fight = team_fight
+                self.by_team_fight[team_fight.id] = cup_fight
+            cfm.CupFight.objects.bulk_update(created, ['team_fight'])
+            tfm.TeamFight.objects.bulk_update(updated, ['aka_team', 'shiro_team'])
+            scm.refresh_counters(team_fight_ids=[team_fight.id for team_fight in updated])
+            for team_fight in team_fights + updated:
+                team_fight.remember_bracket_state()
+
+            tournament_id = (team_fights + updated)[0].tournament_id
+            if created:
+                tcm.notify_changed(tournament_id, tfm.TeamFight, team_fights, tcm.CREATED)
+                tcm.notify_changed(tournament_id, cfm.CupFight, created, tcm.UPDATED)
+            if updated:
+                tcm.notify_changed(tournament_id, tfm.TeamFight, updated, tcm.UPDATED)
+
+
+class FollowingFightStartedException(Exception):
+    pass
+
+
+def has_lost_winner(team_fight):
+    return team_fight.in_cup and team_fight.winner == 0 and team_fight._bracket_state[0] not in (0, None)
+
+
+@receiver(pre_save, sender=tfm.TeamFight)
+def check_winner_reset(sender, instance, raw=False, **kwargs):
+    """
+    Refuses to take the winner away from a cup team fight once the team fight it advanced to has started,
+    since that one cannot lose a side.
+    """
+    if raw or instance._state.adding or not has_lost_winner(instance):
+        return
+    if tfm.TeamFight.objects.filter(cup_fight__previous_fights__team_fight=instance.id) \
+            .filter(Q(status__gt=0) | Q(winner__gt=0)).exists():
+        raise FollowingFightStartedException()
+
+
+@receiver(post_save, sender=tfm.TeamFight)
+def advance_winner(sender, instance, created, raw=False, **kwargs):
+    changed = not raw and not created and instance.in_cup and instance.has_bracket_state_changed()
+    instance.remember_bracket_state()
+    if not changed:
+        return
+    bracket = Bracket.containing(instance.id)
+    bracket.save(*bracket.propagate(instance.id))
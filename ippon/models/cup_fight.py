@@ -1,22 +1,56 @@
 from django.db import models
+from django.db.models import Case, IntegerField, Value, When
 from django.db.models.query_utils import Q
-from django.db.models.signals import post_save
-from django.dispatch.dispatcher import receiver
 
 import ippon.models.team_fight as tfm
 
+AKA = 1
+SHIRO = 2
+SIDE = [
+    (AKA, 'Aka'),
+    (SHIRO, 'Shiro')
+]
+
 
 class CupFight(models.Model):
     cup_phase = models.ForeignKey('CupPhase', related_name='cup_fights', on_delete=models.PROTECT)
     team_fight = models.ForeignKey('TeamFight', related_name='cup_fight', on_delete=models.SET_NULL, null=True)
     previous_shiro_fight = models.OneToOneField('self', on_delete=models.CASCADE, related_name='+', null=True)
     previous_aka_fight = models.OneToOneField('self', on_delete=models.CASCADE, related_name='+', null=True)
+    bye_team = models.ForeignKey('Team', on_delete=models.PROTECT, related_name='+', null=True)
+    next_fight = models.ForeignKey('self', on_delete=models.SET_NULL, related_name='previous_fights', null=True)
+    next_fight_side = models.IntegerField(choices=SIDE, null=True)
 
     def get_following_fight(self):
-        try:
-            return CupFight.objects.get(Q(previous_aka_fight=self) | Q(previous_shiro_fight=self))
-        except CupFight.DoesNotExist:
+        if self.next_fight_id is None:
             raise NoSuchFightException()
+        return self.next_fight
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super(CupFight, self).save(*args, **kwargs)
+        if self.team_fight_id is not None:
+            self.mark_team_fight_in_cup()
+        if not adding or self.previous_aka_fight_id is not None or self.previous_shiro_fight_id is not None:
+            self.link_previous_fights()
+
+    def mark_team_fight_in_cup(self):
+        if self._meta.get_field('team_fight').is_cached(self):
+            self.team_fight.in_cup = True
+        tfm.TeamFight.objects.filter(pk=self.team_fight_id, in_cup=False).update(in_cup=True)
+
+    def link_previous_fights(self):
+        """
+        Points next_fight of the previous fights at this one and clears it on fights which are not previous anymore,
+        in one update.
+        """
+        previous = [(side, fight_id) for side, fight_id in
+                    [(AKA, self.previous_aka_fight_id), (SHIRO, self.previous_shiro_fight_id)] if fight_id is not None]
+        previous_ids = [fight_id for _, fight_id in previous]
+        CupFight.objects.filter(Q(next_fight=self) | Q(pk__in=previous_ids)).update(
+            next_fight=Case(When(pk__in=previous_ids, then=Value(self.pk)), default=None, output_field=IntegerField()),
+            next_fight_side=Case(*[When(pk=fight_id, then=Value(side)) for side, fight_id in previous],
+                                 default=None, output_field=IntegerField()))
 
     def delete(self, using=None, keep_parents=False):
         super(CupFight, self).delete()
@@ -34,33 +68,5 @@ class CupFight(models.Model):
         )
 
 
-@receiver(post_save, sender=tfm.TeamFight)
-def winner_change_handler(sender, **kwargs):
-    try:
-        cup_fight = CupFight.objects.get(team_fight=kwargs['instance'].id)
-        parent = cup_fight.get_following_fight()
-        sibling = parent.previous_aka_fight if parent.previous_aka_fight.id is not cup_fight.id else parent.previous_shiro_fight
-        if sibling.team_fight.winner is not 0:
-            tournament = parent.cup_phase.tournament
-            if parent.team_fight is None:
-                parent.team_fight = tournament.team_fights.create(aka_team=get_winner(parent.previous_aka_fight),
-                                                                  shiro_team=get_winner(parent.previous_shiro_fight))
-                parent.save()
-            else:
-                if parent.previous_aka_fight.id is cup_fight.id:
-                    parent.team_fight.aka_team = get_winner(cup_fight)
-                else:
-                    parent.team_fight.shiro_team = get_winner(cup_fight)
-                parent.team_fight.save()
-
-    except (CupFight.DoesNotExist, NoSuchFightException):
-        return
-
-
-def get_winner(cup_fight):
-    team_fight = cup_fight.team_fight
-    return team_fight.aka_team if team_fight.winner is 1 else team_fight.shiro_team
-
-
 class NoSuchFightException(Exception):
     pass
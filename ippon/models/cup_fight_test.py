@@ -1,10 +1,12 @@
 import datetime
 
 import django
-from django.db import IntegrityError
+from django.db import IntegrityError, connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 import ippon.models
+import ippon.models.bracket as bm
 import ippon.models.club as cl
 import ippon.models.cup_fight
 import ippon.models.cup_fight as cfm
@@ -54,9 +56,35 @@ class CupFightFollowingFightTests(TestCupFights):
 
     def test_cup_fight_which_is_previous_on_aka_side_returns_following_fight(self):
         following_aka = self.cup_phase.cup_fights.create(team_fight=self.team_fight1, previous_aka_fight=self.cup_fight)
+        self.cup_fight.refresh_from_db()
         self.assertEqual(self.cup_fight.get_following_fight(), following_aka)
 
 
+class CupFightNextFightTests(TestCupFights):
+    def setUp(self):
+        super(CupFightNextFightTests, self).setUp()
+        self.other = self.cup_phase.cup_fights.create(team_fight=self.team_fight1)
+        self.following = self.cup_phase.cup_fights.create(previous_aka_fight=self.cup_fight,
+                                                          previous_shiro_fight=self.other)
+
+    def test_creating_following_fight_points_previous_fights_at_it(self):
+        self.cup_fight.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual((self.following.id, cfm.AKA), (self.cup_fight.next_fight_id, self.cup_fight.next_fight_side))
+        self.assertEqual((self.following.id, cfm.SHIRO), (self.other.next_fight_id, self.other.next_fight_side))
+
+    def test_removing_previous_fight_clears_its_next_fight(self):
+        self.following.previous_aka_fight = None
+        self.following.save()
+        self.cup_fight.refresh_from_db()
+        self.assertEqual((None, None), (self.cup_fight.next_fight_id, self.cup_fight.next_fight_side))
+
+    def test_following_fight_is_read_through_next_fight(self):
+        self.other.refresh_from_db()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.following, self.other.get_following_fight())
+
+
 class CupFightSiblingTests(TestCupFights):
     def setUp(self):
         super(CupFightSiblingTests, self).setUp()
@@ -107,6 +135,86 @@ class CupFightSiblingTests(TestCupFights):
         self.assertEqual(current_parent_tf.shiro_team, self.t2)
 
 
+class CupFightBracketPropagationTests(TestCupFights):
+    def setUp(self):
+        super(CupFightBracketPropagationTests, self).setUp()
+        self.teams = [self.t1, self.t2] + [self.tournament.teams.create(name='t{}'.format(i)) for i in range(3, 7)]
+        t1, t2, t3, t4, t5, t6 = self.teams
+        self.qf1 = self.cup_fight
+        self.qf2 = self.cup_phase.cup_fights.create(
+            team_fight=self.tournament.team_fights.create(aka_team=t3, shiro_team=t4))
+        self.sf1 = self.cup_phase.cup_fights.create(previous_aka_fight=self.qf1, previous_shiro_fight=self.qf2)
+        self.sf2 = self.cup_phase.cup_fights.create(
+            team_fight=self.tournament.team_fights.create(aka_team=t5, shiro_team=t6))
+        self.final = self.cup_phase.cup_fights.create(previous_aka_fight=self.sf1, previous_shiro_fight=self.sf2)
+
+    def set_winner(self, cup_fight, winner):
+        cup_fight.refresh_from_db()
+        cup_fight.team_fight.winner = winner
+        cup_fight.team_fight.save()
+
+    def get_teams(self, cup_fight):
+        cup_fight.refresh_from_db()
+        return cup_fight.team_fight.aka_team, cup_fight.team_fight.shiro_team
+
+    def test_changed_result_is_corrected_through_all_following_fights(self):
+        t1, t2, t3, t4, t5, t6 = self.teams
+        self.set_winner(self.qf1, 1)
+        self.set_winner(self.qf2, 1)
+        self.set_winner(self.sf1, 1)
+        self.set_winner(self.sf2, 1)
+        self.assertEqual((t1, t5), self.get_teams(self.final))
+
+        self.set_winner(self.qf1, 2)
+        self.assertEqual((t2, t3), self.get_teams(self.sf1))
+        self.assertEqual((t2, t5), self.get_teams(self.final))
+
+    def test_reset_winner_removes_not_started_following_team_fight(self):
+        self.set_winner(self.qf1, 1)
+        self.set_winner(self.qf2, 1)
+        self.sf1.refresh_from_db()
+        removed_id = self.sf1.team_fight_id
+        self.set_winner(self.qf1, 0)
+        self.sf1.refresh_from_db()
+        self.assertIsNone(self.sf1.team_fight)
+        self.assertFalse(tfm.TeamFight.objects.filter(pk=removed_id).exists())
+
+    def test_reset_winner_is_refused_once_following_team_fight_has_started(self):
+        t1, t2, t3, t4, t5, t6 = self.teams
+        self.set_winner(self.qf1, 1)
+        self.set_winner(self.qf2, 1)
+        self.set_winner(self.sf1, 1)
+        self.set_winner(self.sf2, 1)
+        self.final.refresh_from_db()
+        self.final.team_fight.status = 1
+        self.final.team_fight.save()
+        with self.assertRaises(bm.FollowingFightStartedException):
+            self.set_winner(self.sf1, 0)
+        self.assertEqual(1, tfm.TeamFight.objects.get(pk=self.sf1.team_fight_id).winner)
+        self.assertEqual((t1, t5), self.get_teams(self.final))
+
+    def test_saving_without_change_of_result_does_not_load_bracket(self):
+        self.qf1.team_fight.status = 1
+        with CaptureQueriesContext(connection) as queries:
+            self.qf1.team_fight.save()
+        self.assertFalse([query for query in queries if 'ippon_cupfight' in query['sql']])
+
+    def test_result_of_team_fight_outside_of_cup_skips_bracket(self):
+        team_fight = self.tournament.team_fights.create(aka_team=self.t1, shiro_team=self.t2)
+        team_fight.winner = 1
+        with self.assertNumQueries(0):
+            bm.advance_winner(tfm.TeamFight, team_fight, created=False)
+        with CaptureQueriesContext(connection) as queries:
+            team_fight.save()
+        self.assertFalse([query for query in queries if 'ippon_cupfight' in query['sql']])
+
+    def test_linking_team_fight_to_cup_fight_marks_it_in_cup(self):
+        team_fight = self.tournament.team_fights.create(aka_team=self.t1, shiro_team=self.t2)
+        self.cup_phase.cup_fights.create(team_fight=team_fight)
+        self.assertTrue(team_fight.in_cup)
+        self.assertTrue(tfm.TeamFight.objects.get(pk=team_fight.pk).in_cup)
+
+
 class CupPhaseTests(TestCase):
     def setUp(self) -> None:
         self.tournament = tm.Tournament.objects.create(
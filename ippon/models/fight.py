@@ -3,6 +3,8 @@ from django.db import models
 import ippon.models.player as plm
 import ippon.models.team_fight as tfm
 
+COUNTER_FIELDS = ('aka_points', 'shiro_points', 'aka_fouls', 'shiro_fouls')
+
 
 class Fight(models.Model):
     aka = models.ForeignKey(plm.Player, on_delete=models.CASCADE, related_name='+')
@@ -11,3 +13,12 @@ class Fight(models.Model):
     ordering_number = models.IntegerField(default=0)
     winner = models.IntegerField(choices=tfm.WINNER, default=0)
     status = models.IntegerField(choices=tfm.STATUS, default=0)
+    aka_points = models.IntegerField(default=0)
+    shiro_points = models.IntegerField(default=0)
+    aka_fouls = models.IntegerField(default=0)
+    shiro_fouls = models.IntegerField(default=0)
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = tfm.fields_without(Fight, COUNTER_FIELDS)
+        super(Fight, self).save(*args, **kwargs)
@@ -0,0 +1,113 @@
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch.dispatcher import receiver
+
+import ippon.models.fight as fm
+import ippon.models.point as ptm
+import ippon.models.team_fight as tfm
+
+FOUL = 4
+
+
+def fight_points_expression(player_field, fouls):
+    points = ptm.Point.objects.filter(fight=OuterRef('pk'), player=OuterRef(player_field))
+    points = points.filter(type=FOUL) if fouls else points.exclude(type=FOUL)
+    return tfm.count_subquery(points, 'fight')
+
+
+def fight_wins_expression(winner):
+    return tfm.count_subquery(fm.Fight.objects.filter(team_fight=OuterRef('pk'), winner=winner), 'team_fight')
+
+
+def fight_counters():
+    return {
+        'aka_points': fight_points_expression('aka', fouls=False),
+        'shiro_points': fight_points_expression('shiro', fouls=False),
+        'aka_fouls': fight_points_expression('aka', fouls=True),
+        'shiro_fouls': fight_points_expression('shiro', fouls=True)
+    }
+
+
+def team_fight_counters():
+    return {
+        'aka_wins': fight_wins_expression(1),
+        'shiro_wins': fight_wins_expression(2),
+        'aka_points': tfm.team_points_expression('aka_team'),
+        'shiro_points': tfm.team_points_expression('shiro_team')
+    }
+
+
+def refresh_counters(fight_ids=(), team_fight_ids=()):
+    """
+    Recomputes counters of the given fights and of their team fights (plus the given team fights) from the
+    stored points and fights. Team fight rows are locked first, so concurrent writers of one team fight
+    refresh its counters one after another and the last one always sees all committed changes.
+    """
+    fight_ids = list(fight_ids)
+    team_fights = tfm.TeamFight.objects.filter(pk__in=list(team_fight_ids)) \
+        | tfm.TeamFight.objects.filter(pk__in=Subquery(fm.Fight.objects.filter(pk__in=fight_ids).values('team_fight')))
+    with transaction.atomic():
+        locked_ids = list(team_fights.select_for_update().order_by('pk').values_list('pk', flat=True))
+        if fight_ids:
+            fm.Fight.objects.filter(pk__in=fight_ids).update(**fight_counters())
+        if locked_ids:
+            tfm.TeamFight.objects.filter(pk__in=locked_ids).update(**team_fight_counters())
+
+
+def rebuild(team_fights):
+    with transaction.atomic():
+        fm.Fight.objects.filter(team_fight__in=team_fights).update(**fight_counters())
+        team_fights.update(**team_fight_counters())
+
+
+def stale_fights(team_fights):
+    counters = fight_counters()
+    return fm.Fight.objects.filter(team_fight__in=team_fights) \
+        .annotate(**{name + '_count': expression for name, expression in counters.items()}) \
+        .exclude(**{name: F(name + '_count') for name in counters})
+
+
+def stale_team_fights(team_fights):
+    return team_fights.with_scores(points=True).exclude(aka_wins=F('aka_wins_count'),
+                                                        shiro_wins=F('shiro_wins_count'),
+                                                        aka_points=F('aka_points_count'),
+                                                        shiro_points=F('shiro_points_count'))
+
+
+@receiver(pre_save, sender=ptm.Point)
+def point_saving(sender, instance, raw=False, **kwargs):
+    if not raw and not instance._state.adding:
+        instance.counted_fight_id = ptm.Point.objects.filter(pk=instance.pk).values_list('fight_id', flat=True) \
+            .first()
+
+
+@receiver(post_save, sender=ptm.Point)
+def point_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_counters(fight_ids={instance.fight_id, getattr(instance, 'counted_fight_id', None)} - {None})
+
+
+@receiver(post_delete, sender=ptm.Point)
+def point_deleted(sender, instance, **kwargs):
+    refresh_counters(fight_ids=[instance.fight_id])
+
+
+@receiver(post_save, sender=fm.Fight)
+def fight_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_counters(fight_ids=[instance.id])
+
+
+@receiver(post_delete, sender=fm.Fight)
+def fight_deleted(sender, instance, **kwargs):
+    refresh_counters(team_fight_ids=[instance.team_fight_id])
+
+
+@receiver(post_save, sender=tfm.TeamFight)
+def team_fight_saved(sender, instance, created, raw=False, **kwargs):
+    # Points are attributed to teams through their members, so changing the teams may change the totals.
+    changed = not raw and not created and instance.have_teams_changed()
+    instance.remember_teams()
+    if changed:
+        refresh_counters(team_fight_ids=[instance.id])
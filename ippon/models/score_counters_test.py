@@ -0,0 +1,101 @@
+import datetime
+from unittest.mock import patch
+
+from django.test import TestCase
+
+import ippon.models.club as cl
+import ippon.models.fight as fm
+import ippon.models.player as plm
+import ippon.models.score_counters as scm
+import ippon.models.team_fight as tfm
+import ippon.models.tournament as tm
+
+
+class ScoreCountersTests(TestCase):
+    def setUp(self):
+        self.tournament = tm.Tournament.objects.create(
+            name='T1', webpage='http://w1.co', description='d1', city='c1',
+            date=datetime.date(year=2021, month=1, day=1), address='a1', team_size=1, group_match_length=3,
+            ko_match_length=3, final_match_length=3, finals_depth=0, age_constraint=5, age_constraint_value=20,
+            rank_constraint=5, rank_constraint_value=7, sex_constraint=1)
+        c = cl.Club.objects.create(name='cn1', webpage='http://cw1.co', description='cd1', city='cc1')
+        self.p1 = plm.Player.objects.create(name='pn1', surname='ps1', rank=7,
+                                            birthday=datetime.date(year=2001, month=1, day=1), sex=1, club_id=c)
+        self.p2 = plm.Player.objects.create(name='pn2', surname='ps2', rank=7,
+                                            birthday=datetime.date(year=2001, month=1, day=1), sex=1, club_id=c)
+        self.t1 = self.tournament.teams.create(name='t1')
+        self.t2 = self.tournament.teams.create(name='t2')
+        self.t1.team_members.create(player=self.p1)
+        self.t2.team_members.create(player=self.p2)
+        self.team_fight = self.tournament.team_fights.create(aka_team=self.t1, shiro_team=self.t2)
+        self.f1 = self.team_fight.fights.create(aka=self.p1, shiro=self.p2)
+        self.f2 = self.team_fight.fights.create(aka=self.p1, shiro=self.p2)
+
+    def team_fight_counters(self):
+        return tfm.TeamFight.objects.values_list('aka_wins', 'shiro_wins', 'aka_points', 'shiro_points') \
+            .get(pk=self.team_fight.pk)
+
+    def fight_counters(self, fight):
+        return fm.Fight.objects.values_list('aka_points', 'shiro_points', 'aka_fouls', 'shiro_fouls') \
+            .get(pk=fight.pk)
+
+    def test_recording_points_updates_fight_and_team_fight_counters(self):
+        self.f1.points.create(player=self.p1, type=0)
+        self.f1.points.create(player=self.p1, type=1)
+        self.f1.points.create(player=self.p2, type=4)
+        self.assertEqual((2, 0, 0, 1), self.fight_counters(self.f1))
+        self.assertEqual((0, 0, 2, 0), self.team_fight_counters())
+
+    def test_deleting_point_updates_counters(self):
+        point = self.f1.points.create(player=self.p2, type=0)
+        point.delete()
+        self.assertEqual((0, 0, 0, 0), self.fight_counters(self.f1))
+        self.assertEqual((0, 0, 0, 0), self.team_fight_counters())
+
+    def test_moving_point_to_other_fight_updates_both_fights(self):
+        point = self.f1.points.create(player=self.p2, type=0)
+        point.fight = self.f2
+        point.save()
+        self.assertEqual((0, 0, 0, 0), self.fight_counters(self.f1))
+        self.assertEqual((0, 1, 0, 0), self.fight_counters(self.f2))
+
+    def test_fight_winners_are_counted_and_deleted_fights_uncounted(self):
+        self.f1.winner = 1
+        self.f1.save()
+        self.f2.winner = 2
+        self.f2.save()
+        self.assertEqual((1, 1, 0, 0), self.team_fight_counters())
+        self.f2.delete()
+        self.assertEqual((1, 0, 0, 0), self.team_fight_counters())
+
+    def test_saving_stale_instance_keeps_counters(self):
+        stale = tfm.TeamFight.objects.get(pk=self.team_fight.pk)
+        stale_fight = fm.Fight.objects.get(pk=self.f1.pk)
+        self.f1.points.create(player=self.p1, type=0)
+        stale_fight.status = 1
+        stale_fight.save()
+        stale.status = 1
+        stale.save()
+        self.assertEqual((1, 0, 0, 0), self.fight_counters(self.f1))
+        self.assertEqual((0, 0, 1, 0), self.team_fight_counters())
+
+    def test_saving_team_fight_without_changing_teams_skips_refresh(self):
+        self.team_fight.status = 1
+        with patch.object(scm, 'refresh_counters') as refresh:
+            self.team_fight.save()
+        refresh.assert_not_called()
+
+    def test_swapping_teams_refreshes_team_fight_counters(self):
+        self.f1.points.create(player=self.p1, type=0)
+        self.team_fight.aka_team, self.team_fight.shiro_team = self.t2, self.t1
+        self.team_fight.save()
+        self.assertEqual((0, 0, 0, 1), self.team_fight_counters())
+
+    def test_counters_match_computed_scores(self):
+        self.f1.points.create(player=self.p1, type=0)
+        self.f1.points.create(player=self.p2, type=2)
+        self.f1.winner = 1
+        self.f1.save()
+        team_fights = tfm.TeamFight.objects.all()
+        self.assertFalse(scm.stale_fights(team_fights).exists())
+        self.assertFalse(scm.stale_team_fights(team_fights).exists())
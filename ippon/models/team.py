@@ -4,13 +4,21 @@ import ippon.models.player as plm
 import ippon.models.tournament as tm
 
 
+class TeamQuerySet(models.QuerySet):
+    def with_members(self):
+        return self.prefetch_related('team_members')
+
+
 class Team(models.Model):
     name = models.CharField(max_length=100, blank=False)
     tournament = models.ForeignKey(tm.Tournament, related_name='teams', on_delete=models.CASCADE)
 
+    objects = TeamQuerySet.as_manager()
+
     def get_member_ids(self):
-        members = TeamMember.objects.filter(team__pk=self.id)
-        return [player.id for player in plm.Player.objects.filter(pk__in=[member.player.id for member in members])]
+        if 'team_members' in getattr(self, '_prefetched_objects_cache', {}):
+            return sorted(member.player_id for member in self.team_members.all())
+        return list(self.team_members.order_by('player_id').values_list('player_id', flat=True))
 
 
 class TeamMember(models.Model):
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 
 import ippon.models.point as ptm
 import ippon.models.team as tem
@@ -16,12 +18,100 @@ STATUS = [
 ]
 
 
+COUNTER_FIELDS = ('aka_wins', 'shiro_wins', 'aka_points', 'shiro_points')
+BRACKET_FIELDS = ('winner', 'aka_team_id', 'shiro_team_id')
+TEAM_FIELDS = ('aka_team_id', 'shiro_team_id')
+
+
+def fields_without(model, excluded):
+    return [field.name for field in model._meta.concrete_fields if not field.primary_key and field.name not in excluded]
+
+
+def count_subquery(queryset, group_field):
+    counts = queryset.order_by().values(group_field).annotate(count=Count('pk')).values('count')
+    return Coalesce(Subquery(counts, output_field=models.IntegerField()), 0)
+
+
+def team_points_expression(team_field):
+    return count_subquery(ptm.Point.objects.filter(fight__team_fight=OuterRef('pk'),
+                                                   player__team_member__team=OuterRef(team_field)).exclude(type=4),
+                          'fight__team_fight')
+
+
+class TeamFightQuerySet(models.QuerySet):
+    def with_scores(self, points=False):
+        queryset = self.annotate(aka_wins_count=Count('fights', filter=Q(fights__winner=1)),
+                                 shiro_wins_count=Count('fights', filter=Q(fights__winner=2)))
+        if points:
+            queryset = queryset.annotate(aka_points_count=team_points_expression('aka_team'),
+                                         shiro_points_count=team_points_expression('shiro_team'))
+        return queryset
+
+    def location_queue(self, location_id):
+        # Served by the partial team_fight_location_queue index, whatever the size of the tournament.
+        return self.filter(location=location_id, status__lt=2).order_by('-status', 'scheduled_start', 'pk')
+
+
 class TeamFight(models.Model):
     tournament = models.ForeignKey(tm.Tournament, related_name='team_fights', on_delete=models.PROTECT)
     aka_team = models.ForeignKey(tem.Team, on_delete=models.PROTECT, related_name='+')
     shiro_team = models.ForeignKey(tem.Team, on_delete=models.PROTECT, related_name='+')
     winner = models.IntegerField(choices=WINNER, default=0)
     status = models.IntegerField(choices=STATUS, default=0)
+    aka_wins = models.IntegerField(default=0)
+    shiro_wins = models.IntegerField(default=0)
+    aka_points = models.IntegerField(default=0)
+    shiro_points = models.IntegerField(default=0)
+    location = models.ForeignKey('Location', related_name='team_fights', on_delete=models.SET_NULL, null=True)
+    scheduled_start = models.DateTimeField(null=True)
+    # Set once the team fight is linked to a cup fight, so results outside of cups skip the bracket engine.
+    in_cup = models.BooleanField(default=False)
+
+    objects = TeamFightQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['location', 'status', 'scheduled_start'], condition=Q(status__lt=2),
+                         name='team_fight_location_queue')
+        ]
+
+    def __init__(self, *args, **kwargs):
+        super(TeamFight, self).__init__(*args, **kwargs)
+        self.remember_bracket_state()
+        self.remember_status()
+        self.remember_teams()
+
+    def get_bracket_state(self):
+        # Read from __dict__ so that deferred fields are not loaded.
+        return tuple(self.__dict__.get(field) for field in BRACKET_FIELDS)
+
+    def remember_bracket_state(self):
+        self._bracket_state = self.get_bracket_state()
+
+    def has_bracket_state_changed(self):
+        return self._bracket_state != self.get_bracket_state()
+
+    def remember_status(self):
+        self._status = self.__dict__.get('status')
+
+    def has_status_changed(self):
+        return self._status != self.__dict__.get('status')
+
+    def get_teams(self):
+        return tuple(self.__dict__.get(field) for field in TEAM_FIELDS)
+
+    def remember_teams(self):
+        self._teams = self.get_teams()
+
+    def have_teams_changed(self):
+        return self._teams != self.get_teams()
+
+    def save(self, *args, **kwargs):
+        # Score counters are maintained in the database by ippon.models.score_counters and in_cup by CupFight,
+        # a full save of a stale instance must not overwrite them.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = fields_without(TeamFight, COUNTER_FIELDS + ('in_cup',))
+        super(TeamFight, self).save(*args, **kwargs)
 
     def __str__(self):
         return "TeamFight {{id: {id}, aka_team: {aka}, shiro_team: {shiro}, winner: {win} }}".format(id=self.id,
@@ -33,13 +123,21 @@ class TeamFight(models.Model):
         return ptm.Point.objects.filter(player__team_member__team=team, fight__team_fight=self).exclude(type=4).count()
 
     def get_aka_points(self):
+        if hasattr(self, 'aka_points_count'):
+            return self.aka_points_count
         return self.get_teams_points(self.aka_team)
 
     def get_aka_wins(self):
+        if hasattr(self, 'aka_wins_count'):
+            return self.aka_wins_count
         return self.fights.filter(winner=1).count()
 
     def get_shiro_points(self):
+        if hasattr(self, 'shiro_points_count'):
+            return self.shiro_points_count
         return self.get_teams_points(self.shiro_team)
 
     def get_shiro_wins(self):
+        if hasattr(self, 'shiro_wins_count'):
+            return self.shiro_wins_count
         return self.fights.filter(winner=2).count()
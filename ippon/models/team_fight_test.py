@@ -4,6 +4,7 @@ from django.test.testcases import TestCase
 
 import ippon.models.club as cl
 import ippon.models.player as plm
+import ippon.models.team_fight as tfm
 import ippon.models.tournament as tm
 
 
@@ -105,3 +106,15 @@ class TestTeamFights(TestCase):
 
     def test_correctly_counts_shiro_points(self):
         self.assertEqual(self.team_fight1.get_shiro_points(), 3)
+
+    def test_with_scores_annotates_the_same_wins_and_points(self):
+        team_fight = tfm.TeamFight.objects.with_scores(points=True).get(pk=self.team_fight1.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual((2, 1, 5, 3), (team_fight.get_aka_wins(), team_fight.get_shiro_wins(),
+                                            team_fight.get_aka_points(), team_fight.get_shiro_points()))
+
+    def test_with_scores_counts_zero_for_team_fight_without_fights(self):
+        self.tournament.team_fights.create(aka_team=self.t2, shiro_team=self.t1)
+        team_fight = tfm.TeamFight.objects.with_scores(points=True).order_by('pk').last()
+        self.assertEqual((0, 0, 0, 0), (team_fight.aka_wins_count, team_fight.shiro_wins_count,
+                                        team_fight.aka_points_count, team_fight.shiro_points_count))
@@ -29,3 +29,23 @@ class TeamTests(TestCase):
 
         with self.assertRaises(IntegrityError):
             self.t1.team_members.create(player=self.p1)
+
+    def test_get_member_ids_reads_prefetched_members(self):
+        c = cl.Club.objects.create(name='cn1', webpage='http://cw1.co', description='cd1', city='cc1')
+        to = tm.Tournament.objects.create(name='T1', webpage='http://w1.co', description='d1', city='c1',
+                                          date=datetime.date(year=2021, month=1, day=1), address='a1',
+                                          team_size=1, group_match_length=3, ko_match_length=3,
+                                          final_match_length=3, finals_depth=0, age_constraint=5,
+                                          age_constraint_value=20, rank_constraint=5, rank_constraint_value=7,
+                                          sex_constraint=1)
+        t1 = tem.Team.objects.create(tournament=to, name='t1')
+        players = [plm.Player.objects.create(name='pn{}'.format(i), surname='ps{}'.format(i), rank=7,
+                                             birthday=datetime.date(year=2001, month=1, day=1), sex=1, club_id=c)
+                   for i in range(3)]
+        for player in reversed(players):
+            t1.team_members.create(player=player)
+
+        team = tem.Team.objects.with_members().get(pk=t1.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual([player.id for player in players], team.get_member_ids())
+        self.assertEqual([player.id for player in players], t1.get_member_ids())
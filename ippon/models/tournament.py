@@ -1,7 +1,8 @@
 import datetime
 from math import floor
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, F, Q, Value, When
 
 import ippon.models.event as em
 import ippon.models.player as plm
@@ -16,6 +17,45 @@ class TournamentAdmin(models.Model):
         return {'id': self.user.id, 'username': self.user.username}
 
 
+class AgeAt(models.Func):
+    """Full years between the second and the first date, counted the same way as check_is_age_ok does."""
+    template = 'FLOOR((%(expressions)s) / 365.0)'
+    arg_joiner = ' - '
+    output_field = models.IntegerField()
+
+
+def numeric_constraint_expression(constraint, lhs, rhs):
+    return Case(
+        When(**{constraint: 0}, then=Value(True)),
+        When(Q(**{constraint: 1, lhs + '__lt': rhs}), then=Value(True)),
+        When(Q(**{constraint: 2, lhs + '__lte': rhs}), then=Value(True)),
+        When(Q(**{constraint: 3, lhs + '__gt': rhs}), then=Value(True)),
+        When(Q(**{constraint: 4, lhs + '__gte': rhs}), then=Value(True)),
+        When(Q(**{constraint: 5, lhs: rhs}), then=Value(True)),
+        When(Q(**{constraint: 6}) & ~Q(**{lhs: rhs}), then=Value(True)),
+        default=Value(False),
+        output_field=models.BooleanField())
+
+
+def sex_constraint_expression(constraint, sex):
+    return Case(
+        When(**{constraint: 0}, then=Value(True)),
+        When(**{constraint: 1, sex: 1}, then=Value(True)),
+        When(**{constraint: 2, sex: 0}, then=Value(True)),
+        default=Value(False),
+        output_field=models.BooleanField())
+
+
+class TournamentParticipationQuerySet(models.QuerySet):
+    def with_eligibility(self):
+        return self.annotate(player_age=AgeAt(F('tournament__date'), F('player__birthday'))).annotate(
+            age_ok=numeric_constraint_expression('tournament__age_constraint', 'player_age',
+                                                 F('tournament__age_constraint_value')),
+            rank_ok=numeric_constraint_expression('tournament__rank_constraint', 'player__rank',
+                                                  F('tournament__rank_constraint_value')),
+            sex_ok=sex_constraint_expression('tournament__sex_constraint', 'player__sex'))
+
+
 class TournamentParticipation(models.Model):
     tournament = models.ForeignKey('Tournament', related_name='participations', on_delete=models.PROTECT)
     player = models.ForeignKey(plm.Player, related_name='participations', on_delete=models.PROTECT)
@@ -24,17 +64,25 @@ class TournamentParticipation(models.Model):
     is_qualified = models.BooleanField(default=False)
     notes = models.TextField(blank=True)
 
+    objects = TournamentParticipationQuerySet.as_manager()
+
     def check_is_age_ok(self):
+        if hasattr(self, 'age_ok'):
+            return self.age_ok
         delta = self.tournament.date - self.player.birthday
         pa = floor(delta / datetime.timedelta(days=365))
         ta = self.tournament.age_constraint_value
         return is_numeric_constraint_satisfied(pa, self.tournament.age_constraint, ta)
 
     def check_is_rank_ok(self):
+        if hasattr(self, 'rank_ok'):
+            return self.rank_ok
         return is_numeric_constraint_satisfied(self.player.rank, self.tournament.rank_constraint,
                                                self.tournament.rank_constraint_value)
 
     def check_is_sex_ok(self):
+        if hasattr(self, 'sex_ok'):
+            return self.sex_ok
         constraints = {
             0: True,
             1: self.player.sex == 1,
@@ -91,3 +139,14 @@ class Tournament(models.Model):
     finals_depth = models.IntegerField()
 
     event = models.ForeignKey(em.Event, on_delete=models.CASCADE, null=True)
+    version = models.BigIntegerField(default=0)
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            super(Tournament, self).save(*args, **kwargs)
+            return
+        # The update bumps the version, the post_save receiver logs the change and reads the new version
+        # back; both within the transaction of the update.
+        with transaction.atomic():
+            self.version = F('version') + 1
+            super(Tournament, self).save(*args, **kwargs)
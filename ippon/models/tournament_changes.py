@@ -0,0 +1,143 @@
+import django.dispatch
+from django.db import connection, models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch.dispatcher import receiver
+
+import ippon.models.cup_fight as cfm
+import ippon.models.cup_phase as cpm
+import ippon.models.fight as fm
+import ippon.models.group as gm
+import ippon.models.group_fight as gfm
+import ippon.models.group_phase as gpm
+import ippon.models.location as lm
+import ippon.models.point as ptm
+import ippon.models.team as tem
+import ippon.models.team_fight as tfm
+import ippon.models.tournament as tm
+
+CREATED = 'created'
+UPDATED = 'updated'
+DELETED = 'deleted'
+
+ACTION_CHOICES = (
+    (CREATED, 'Created'),
+    (UPDATED, 'Updated'),
+    (DELETED, 'Deleted'),
+)
+
+# Sent after rows belonging to a tournament were written, with tournament_id, instances, action and the
+# sequence number (tournament version) of the change.
+tournament_changed = django.dispatch.Signal()
+
+# model: (lookup from Tournament to the parent row, attribute of the instance holding the parent id)
+TOURNAMENT_LOOKUPS = {
+    tm.TournamentParticipation: ('pk', 'tournament_id'),
+    tm.TournamentAdmin: ('pk', 'tournament_id'),
+    tem.Team: ('pk', 'tournament_id'),
+    tem.TeamMember: ('teams', 'team_id'),
+    tfm.TeamFight: ('pk', 'tournament_id'),
+    fm.Fight: ('team_fights', 'team_fight_id'),
+    ptm.Point: ('team_fights__fights', 'fight_id'),
+    gpm.GroupPhase: ('pk', 'tournament_id'),
+    gm.Group: ('group_phases', 'group_phase_id'),
+    gm.GroupMember: ('group_phases__groups', 'group_id'),
+    gfm.GroupFight: ('group_phases__groups', 'group_id'),
+    cpm.CupPhase: ('pk', 'tournament_id'),
+    cfm.CupFight: ('cup_phases', 'cup_phase_id'),
+    lm.Location: ('pk', 'tournament_id'),
+}
+
+
+def get_tournament_id(instance):
+    lookup, attribute = TOURNAMENT_LOOKUPS[type(instance)]
+    parent_id = getattr(instance, attribute)
+    if lookup == 'pk' or parent_id is None:
+        return parent_id
+    return tm.Tournament.objects.filter(**{lookup: parent_id}).values_list('pk', flat=True).first()
+
+
+class TournamentChange(models.Model):
+    """
+    Append-only log of the writes to a tournament's rows. sequence is the tournament version the write
+    produced, so the rows of one notification share it and sequences only grow within a tournament.
+    The tournament is not a database constraint: changes logged while the tournament itself is being
+    deleted are removed after it instead.
+    """
+    tournament = models.ForeignKey(tm.Tournament, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False,
+                                   related_name='changes')
+    sequence = models.BigIntegerField()
+    model = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+
+    class Meta:
+        indexes = [models.Index(fields=['tournament', 'sequence'], name='tournament_change_sequence')]
+
+
+def bump_version(tournament_id):
+    """
+    Increments the tournament version and returns the new one (None for a missing tournament).
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('UPDATE {} SET version = version + 1 WHERE id = %s RETURNING version'.format(
+            connection.ops.quote_name(tm.Tournament._meta.db_table)), [tournament_id])
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def log_changes(tournament_id, sequence, model, instances, action):
+    TournamentChange.objects.bulk_create(
+        [TournamentChange(tournament_id=tournament_id, sequence=sequence, model=model._meta.model_name,
+                          object_id=instance.pk, action=action) for instance in instances])
+
+
+def notify_changed(tournament_id, model, instances, action):
+    """
+    Bumps the tournament version, logs the change and announces it. Has to be called explicitly after
+    bulk_create/bulk_update/queryset updates, which do not send model signals.
+    """
+    sequence = bump_version(tournament_id)
+    if sequence is None:
+        return
+    log_changes(tournament_id, sequence, model, instances, action)
+    tournament_changed.send(sender=model, tournament_id=tournament_id, instances=instances, action=action,
+                            sequence=sequence)
+
+
+def dependent_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    tournament_id = get_tournament_id(instance)
+    if tournament_id is not None:
+        notify_changed(tournament_id, sender, [instance], CREATED if created else UPDATED)
+
+
+def dependent_deleted(sender, instance, **kwargs):
+    tournament_id = get_tournament_id(instance)
+    if tournament_id is not None:
+        notify_changed(tournament_id, sender, [instance], DELETED)
+
+
+for dependent_model in TOURNAMENT_LOOKUPS:
+    post_save.connect(dependent_saved, sender=dependent_model, dispatch_uid='tournament_version_save')
+    post_delete.connect(dependent_deleted, sender=dependent_model, dispatch_uid='tournament_version_delete')
+
+
+@receiver(post_save, sender=tm.Tournament)
+def tournament_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        sequence = 0
+    else:
+        # The version of an updated tournament is still an F() expression here.
+        sequence = tm.Tournament.objects.filter(pk=instance.id).values_list('version', flat=True)[0]
+        instance.version = sequence
+        log_changes(instance.id, sequence, sender, [instance], UPDATED)
+    tournament_changed.send(sender=sender, tournament_id=instance.id, instances=[instance],
+                            action=CREATED if created else UPDATED, sequence=sequence)
+
+
+@receiver(post_delete, sender=tm.Tournament)
+def tournament_deleted(sender, instance, **kwargs):
+    TournamentChange.objects.filter(tournament=instance.id).delete()
@@ -0,0 +1,144 @@
+import datetime
+from unittest.mock import patch
+
+from django.db import DatabaseError
+from django.test import TestCase
+
+import ippon.models.club as cl
+import ippon.models.player as plm
+import ippon.models.tournament as tm
+import ippon.models.tournament_changes as tcm
+
+
+class TournamentVersionTests(TestCase):
+    def setUp(self):
+        self.tournament = tm.Tournament.objects.create(
+            name='T1',
+            webpage='http://w1.co',
+            description='d1',
+            city='c1',
+            date=datetime.date(year=2021, month=1, day=1),
+            address='a1',
+            team_size=1,
+            group_match_length=3,
+            ko_match_length=3,
+            final_match_length=3,
+            finals_depth=0,
+            age_constraint=5,
+            age_constraint_value=20,
+            rank_constraint=5,
+            rank_constraint_value=7,
+            sex_constraint=1)
+        c = cl.Club.objects.create(name='cn1', webpage='http://cw1.co', description='cd1', city='cc1')
+        self.p1 = plm.Player.objects.create(name='pn1', surname='ps1', rank=7,
+                                            birthday=datetime.date(year=2001, month=1, day=1), sex=1, club_id=c)
+        self.p2 = plm.Player.objects.create(name='pn2', surname='ps2', rank=7,
+                                            birthday=datetime.date(year=2001, month=1, day=1), sex=1, club_id=c)
+        self.t1 = self.tournament.teams.create(name='t1')
+        self.t2 = self.tournament.teams.create(name='t2')
+        self.team_fight = self.tournament.team_fights.create(aka_team=self.t1, shiro_team=self.t2)
+        self.fight = self.team_fight.fights.create(aka=self.p1, shiro=self.p2)
+
+    def get_version(self):
+        return tm.Tournament.objects.get(pk=self.tournament.pk).version
+
+    def assert_bumps_version(self, change):
+        before = self.get_version()
+        change()
+        self.assertGreater(self.get_version(), before)
+
+    def test_creating_updating_and_deleting_points_bumps_version(self):
+        point = self.fight.points.create(player=self.p1, type=0)
+        self.assert_bumps_version(lambda: self.fight.points.create(player=self.p1, type=1))
+        point.type = 2
+        self.assert_bumps_version(point.save)
+        self.assert_bumps_version(point.delete)
+
+    def test_changes_of_every_dependent_model_bump_version(self):
+        group_phase = self.tournament.group_phases.create(name='gp', fight_length=3)
+        group = group_phase.groups.create(name='g')
+        cup_phase = self.tournament.cup_phases.create(name='cp', fight_length=3, final_fight_length=3)
+        changes = [
+            lambda: self.t1.team_members.create(player=self.p1),
+            lambda: self.tournament.participations.create(player=self.p1),
+            lambda: self.tournament.teams.create(name='t3'),
+            lambda: self.tournament.team_fights.create(aka_team=self.t1, shiro_team=self.t2),
+            lambda: self.team_fight.fights.create(aka=self.p1, shiro=self.p2),
+            lambda: self.tournament.group_phases.create(name='gp2', fight_length=3),
+            lambda: group_phase.groups.create(name='g2'),
+            lambda: group.group_members.create(team=self.t1),
+            lambda: group.group_fights.create(team_fight=self.team_fight),
+            lambda: self.tournament.cup_phases.create(name='cp2', fight_length=3, final_fight_length=3),
+            lambda: cup_phase.cup_fights.create(team_fight=self.team_fight),
+            lambda: self.tournament.locations.create(name='court'),
+        ]
+        for change in changes:
+            self.assert_bumps_version(change)
+
+    def test_saving_stale_tournament_does_not_roll_version_back(self):
+        stale = tm.Tournament.objects.get(pk=self.tournament.pk)
+        self.fight.points.create(player=self.p1, type=0)
+        current = self.get_version()
+        stale.name = 'T2'
+        stale.save()
+        self.assertEqual(current + 1, self.get_version())
+        self.assertEqual(current + 1, stale.version)
+
+    def test_changes_are_announced_with_tournament_id(self):
+        received = []
+
+        def listener(sender, tournament_id, instances, action, **kwargs):
+            received.append((sender, tournament_id, instances, action))
+
+        tcm.tournament_changed.connect(listener)
+        try:
+            point = self.fight.points.create(player=self.p1, type=0)
+        finally:
+            tcm.tournament_changed.disconnect(listener)
+        self.assertEqual([(type(point), self.tournament.id, [point], tcm.CREATED)], received)
+
+    def test_changes_are_logged_with_the_version_they_produced(self):
+        point = self.fight.points.create(player=self.p1, type=0)
+        created = self.get_version()
+        point_id = point.id
+        point.delete()
+        self.assertEqual([(created, 'point', point_id, tcm.CREATED), (created + 1, 'point', point_id, tcm.DELETED)],
+                         list(self.tournament.changes.filter(model='point').order_by('sequence')
+                              .values_list('sequence', 'model', 'object_id', 'action')))
+
+    def test_bulk_change_logs_every_instance_with_one_sequence(self):
+        teams = [self.tournament.teams.create(name='t{}'.format(number)) for number in range(3, 5)]
+        tcm.notify_changed(self.tournament.id, type(self.t1), teams, tcm.UPDATED)
+        self.assertEqual({(self.get_version(), team.id) for team in teams},
+                         set(self.tournament.changes.filter(action=tcm.UPDATED).values_list('sequence', 'object_id')))
+
+    def test_tournament_update_is_logged(self):
+        self.tournament.name = 'T2'
+        self.tournament.save()
+        self.assertEqual((self.get_version(), tcm.UPDATED),
+                         self.tournament.changes.filter(model='tournament').values_list('sequence', 'action').get())
+
+    def test_tournament_update_bumps_version_once(self):
+        before = self.get_version()
+        self.tournament.name = 'T2'
+        self.tournament.save()
+        self.assertEqual(before + 1, self.tournament.version)
+        self.assertEqual(before + 1, self.get_version())
+
+    def test_failed_tournament_update_log_leaves_version_and_data_unchanged(self):
+        before = self.get_version()
+        self.tournament.name = 'T2'
+        with patch.object(tcm, 'log_changes', side_effect=DatabaseError), self.assertRaises(DatabaseError):
+            self.tournament.save()
+        self.assertEqual((before, 'T1'), tm.Tournament.objects.values_list('version', 'name').get(pk=self.tournament.pk))
+
+    def test_deleting_tournament_deletes_its_changes(self):
+        tournament = tm.Tournament.objects.create(
+            name='T2', webpage='http://w1.co', description='d1', city='c1',
+            date=datetime.date(year=2021, month=1, day=1), address='a1', team_size=1, group_match_length=3,
+            ko_match_length=3, final_match_length=3, finals_depth=0, age_constraint=5, age_constraint_value=20,
+            rank_constraint=5, rank_constraint_value=7, sex_constraint=1)
+        tournament.locations.create(name='court')
+        tournament_id = tournament.id
+        tournament.delete()
+        self.assertFalse(tcm.TournamentChange.objects.filter(tournament=tournament_id).exists())
@@ -68,3 +68,46 @@ class TournamentParticipationTests(TestCase):
     def test_is_sex_ok_false_when_female_and_man_only(self):
         self.tournament.sex_constraint = 2
         self.assertFalse(self.part.check_is_sex_ok())
+
+
+class TournamentParticipationEligibilityAnnotationTests(TournamentParticipationTests):
+    def assert_annotations_match_checks(self):
+        annotated = tm.TournamentParticipation.objects.with_eligibility().get(pk=self.part.pk)
+        plain = tm.TournamentParticipation.objects.get(pk=self.part.pk)
+        self.assertEqual(plain.check_is_age_ok(), annotated.check_is_age_ok())
+        self.assertEqual(plain.check_is_rank_ok(), annotated.check_is_rank_ok())
+        self.assertEqual(plain.check_is_sex_ok(), annotated.check_is_sex_ok())
+
+    def test_annotations_match_checks_for_every_numeric_constraint(self):
+        for constraint, _ in tm.NUMERIC_CONSTRAINT:
+            for value in [6, 7, 8, 19, 20, 21]:
+                with self.subTest(constraint=constraint, value=value):
+                    tm.Tournament.objects.filter(pk=self.tournament.pk).update(
+                        age_constraint=constraint, age_constraint_value=value + 13,
+                        rank_constraint=constraint, rank_constraint_value=value)
+                    self.assert_annotations_match_checks()
+
+    def test_annotations_match_checks_for_every_sex_constraint(self):
+        for constraint, _ in tm.SEX_CONSTRAINT:
+            for sex, _ in plm.SEX_CHOICES:
+                with self.subTest(constraint=constraint, sex=sex):
+                    tm.Tournament.objects.filter(pk=self.tournament.pk).update(sex_constraint=constraint)
+                    plm.Player.objects.filter(pk=self.part.player.pk).update(sex=sex)
+                    self.assert_annotations_match_checks()
+
+    def test_age_is_counted_in_365_day_years_like_in_check(self):
+        plm.Player.objects.filter(pk=self.part.player.pk).update(birthday=datetime.date(year=2001, month=1, day=6))
+        tm.Tournament.objects.filter(pk=self.tournament.pk).update(age_constraint=5, age_constraint_value=20)
+        self.assert_annotations_match_checks()
+        self.assertTrue(tm.TournamentParticipation.objects.with_eligibility().get(pk=self.part.pk).age_ok)
+
+    def test_eligibility_of_many_participations_is_computed_in_a_single_query(self):
+        for i in range(10):
+            player = plm.Player.objects.create(name='p{}'.format(i), surname='s', rank=i, sex=i % 2,
+                                               birthday=datetime.date(year=2001, month=1, day=1),
+                                               club_id=self.part.player.club_id)
+            self.tournament.participations.create(player=player)
+        with self.assertNumQueries(1):
+            flags = [(p.check_is_age_ok(), p.check_is_rank_ok(), p.check_is_sex_ok()) for p in
+                     tm.TournamentParticipation.objects.with_eligibility()]
+        self.assertEqual(11, len(flags))
@@ -3,10 +3,12 @@ from rest_framework import viewsets, permissions
 import ippon.models.point as ptm
 import ippon.point.permissions as ptp
 import ippon.point.serializers as pts
+import ippon.utils.etag as iue
 
 
-class PointViewSet(viewsets.ModelViewSet):
+class PointViewSet(iue.TournamentVersionETagMixin, viewsets.ModelViewSet):
     queryset = ptm.Point.objects.all()
     serializer_class = pts.PointSerializer
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,
                           ptp.IsPointOwnerOrReadOnly)
+    tournament_lookup = 'team_fights__fights__points'
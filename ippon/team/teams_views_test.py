@@ -157,6 +157,14 @@ class TeamViewSetUnauthenticatedTests(TeamsViewTest):
         response = self.client.get(reverse('team-detail', kwargs={'pk': -1}))
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_teams_list_takes_two_queries_regardless_of_number_of_teams(self):
+        for i in range(5):
+            team = self.to.teams.create(name='tx{}'.format(i))
+            team.team_members.create(player=self.p1)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('team-list'))
+        self.assertEqual(self.t2_json, response.data[1])
+
     def test_unauthorized_put_gets_unauthorized(self):
         response = self.client.put(
             reverse('team-detail', kwargs={"pk": self.t1.pk}),
@@ -10,13 +10,16 @@ import ippon.team.permissions as tep
 import ippon.team.serializers as tes
 import ippon.tournament.authorizations as ta
 import ippon.tournament.permissions as tp
+import ippon.utils.etag as iue
+import ippon.utils.pagination as iupg
 
 
-class TeamViewSet(viewsets.ModelViewSet):
-    queryset = tem.Team.objects.all()
+class TeamViewSet(iue.TournamentVersionETagMixin, viewsets.ModelViewSet):
+    queryset = tem.Team.objects.with_members()
     serializer_class = tes.TeamSerializer
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,
                           tp.IsTournamentAdminOrReadOnlyDependent)
+    tournament_lookup = 'teams'
 
     # TODO: check when will DRF finally release the multiple actions for single url improvement
     @action(
@@ -65,17 +68,17 @@ class TeamViewSet(viewsets.ModelViewSet):
 
     @action(methods=['get'], detail=True)
     def members(self, request, pk=None):
-        serializer = pls.PlayerSerializer(plm.Player.objects.filter(team_member__team=pk), many=True)
-        return Response(serializer.data)
+        return iupg.paginated_response(self, plm.Player.objects.filter(team_member__team=pk), pls.PlayerSerializer)
 
     @action(methods=['get'], detail=True, permission_classes=[
         permissions.IsAuthenticated,
         tp.IsTournamentAdminDependent])
     def not_assigned(self, request, pk=None):
-        serializer = pls.PlayerSerializer(
+        return iupg.paginated_response(
+            self,
             plm.Player.objects.filter(participations__tournament__teams=pk)
-                .exclude(team_member__team__tournament__teams=pk), many=True)
-        return Response(serializer.data)
+                .exclude(team_member__team__tournament__teams=pk),
+            pls.PlayerSerializer)
 
 
 @api_view(['GET'])
@@ -0,0 +1,6 @@
+import ippon.models.team_fight as tfm
+import ippon.utils.permissions as iup
+
+
+class IsTeamFightOwner(iup.IsTournamentDependentOwner):
+    model = tfm.TeamFight
@@ -4,8 +4,8 @@ import ippon.models.team_fight as tfm
 
 
 class TeamFightSerializer(serializers.ModelSerializer):
-    aka_score = serializers.IntegerField(source='get_aka_wins', read_only=True)
-    shiro_score = serializers.IntegerField(source='get_shiro_wins', read_only=True)
+    aka_score = serializers.IntegerField(source='aka_wins', read_only=True)
+    shiro_score = serializers.IntegerField(source='shiro_wins', read_only=True)
 
     class Meta:
         model = tfm.TeamFight
@@ -19,3 +19,16 @@ class TeamFightSerializer(serializers.ModelSerializer):
             'aka_score',
             'shiro_score'
         )
+
+
+class ScheduledTeamFightSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = tfm.TeamFight
+        fields = (
+            'id',
+            'aka_team',
+            'shiro_team',
+            'status',
+            'location',
+            'scheduled_start'
+        )
@@ -66,6 +66,19 @@ class TeamFightViewSetAuthorizedTests(TeamFightViewTest):
         tm.TournamentAdmin.objects.create(user=self.user, tournament=self.to, is_master=False)
         self.client.force_authenticate(user=self.user)
 
+    def test_post_generate_fights_creates_fights_from_line_ups(self):
+        response = self.client.post(reverse('teamfight-generate_fights', kwargs={'pk': self.tf1.pk}))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([(self.p1.id, self.p2.id, self.tf1.id)],
+                         [(fight['aka'], fight['shiro'], fight['team_fight']) for fight in response.data])
+        self.assertEqual(0, self.tf2.fights.count())
+
+    def test_post_generate_fights_again_creates_nothing(self):
+        self.client.post(reverse('teamfight-generate_fights', kwargs={'pk': self.tf1.pk}))
+        response = self.client.post(reverse('teamfight-generate_fights', kwargs={'pk': self.tf1.pk}))
+        self.assertEqual([], response.data)
+        self.assertEqual(1, self.tf1.fights.count())
+
     def test_post_valid_payload_creates_specified_team_fight(self):
         response = self.client.post(
             reverse('teamfight-list'),
@@ -101,6 +114,24 @@ class TeamFightViewSetAuthorizedTests(TeamFightViewTest):
         )
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_put_reset_winner_of_cup_fight_with_started_following_fight_gets_bad_request(self):
+        cup_phase = self.to.cup_phases.create(name='cp', fight_length=3, final_fight_length=3)
+        cf1 = cup_phase.cup_fights.create(team_fight=self.tf1)
+        cf2 = cup_phase.cup_fights.create(team_fight=self.tf2)
+        final = cup_phase.cup_fights.create(previous_aka_fight=cf1, previous_shiro_fight=cf2)
+        for team_fight in (self.tf1, self.tf2):
+            team_fight.refresh_from_db()
+            team_fight.winner = 1
+            team_fight.save()
+        final.refresh_from_db()
+        final.team_fight.status = 1
+        final.team_fight.save()
+        payload = dict(self.tf1_json, winner=0)
+        response = self.client.put(reverse('teamfight-detail', kwargs={'pk': self.tf1.pk}),
+                                   data=json.dumps(payload), content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(1, tfm.TeamFight.objects.get(pk=self.tf1.pk).winner)
+
     def test_delete_existing_team_fight_deletes_it(self):
         response = self.client.delete(reverse('teamfight-detail', kwargs={'pk': self.tf1.pk}))
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
@@ -115,6 +146,11 @@ class TeamFightViewSetUnauthorizedTests(TeamFightViewTest):
         super(TeamFightViewSetUnauthorizedTests, self).setUp()
         self.client.force_authenticate(user=self.user)
 
+    def test_post_generate_fights_gets_forbidden(self):
+        response = self.client.post(reverse('teamfight-generate_fights', kwargs={'pk': self.tf2.pk}))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(0, self.tf2.fights.count())
+
     def test_put_gets_forbidden(self):
         response = self.client.post(
             reverse('teamfight-detail', kwargs={'pk': self.tf1.pk}),
@@ -146,6 +182,15 @@ class TeamFightViewSetUnauthenticatedTests(TeamFightViewTest):
         self.assertEqual([self.tf1_json, self.tf2_json], response.data)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_list_counts_scores_in_single_query(self):
+        self.tf1.fights.create(aka=self.p1, shiro=self.p2, winner=1)
+        self.tf1.fights.create(aka=self.p1, shiro=self.p2, winner=2)
+        self.tf1.fights.create(aka=self.p1, shiro=self.p2, winner=1)
+        self.tf2.fights.create(aka=self.p3, shiro=self.p4, winner=2)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('teamfight-list'))
+        self.assertEqual([(2, 1), (0, 1)], [(tf['aka_score'], tf['shiro_score']) for tf in response.data])
+
     def test_detail_for_existing_fight_returns_correct_fight(self):
         response = self.client.get(reverse('teamfight-detail', kwargs={'pk': self.tf1.pk}))
         self.assertEqual(self.tf1_json, response.data)
@@ -183,9 +228,9 @@ class UnauthorizedTeamFightsFightsTest(TeamFightViewSetUnauthorizedTests):
         self.f2 = self.tf1.fights.create(aka=self.p2, shiro=self.p1)
 
         self.f1_json = {'id': self.f1.id, 'aka': self.p1.id, 'shiro': self.p2.id, 'team_fight': self.tf1.id,
-                        'status': 0, 'winner': 0}
+                        'status': 0, 'winner': 0, 'aka_points': 0, 'shiro_points': 0, 'aka_fouls': 0, 'shiro_fouls': 0}
         self.f2_json = {'id': self.f2.id, 'aka': self.p2.id, 'shiro': self.p1.id, 'team_fight': self.tf1.id,
-                        'status': 0, 'winner': 0}
+                        'status': 0, 'winner': 0, 'aka_points': 0, 'shiro_points': 0, 'aka_fouls': 0, 'shiro_fouls': 0}
 
     def test_get_fights_for_valid_team_fight_returns_list_of_fights(self):
         expected = [self.f1_json, self.f2_json]
@@ -1,21 +1,35 @@
-from rest_framework import viewsets, permissions
+from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action, api_view
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 
+import ippon.fight.line_ups as flu
 import ippon.fight.serializers as fs
+import ippon.models.bracket as bm
 import ippon.models.fight as fm
 import ippon.models.team_fight as tfm
+import ippon.team_fight.permissions as tfp
 import ippon.team_fight.serializers as tfs
 import ippon.tournament.authorizations as ta
 import ippon.tournament.permissions as tp
+import ippon.utils.etag as iue
+import ippon.utils.pagination as iupg
 
 
-class TeamFightViewSet(viewsets.ModelViewSet):
-    queryset = tfm.TeamFight.objects.all()
+class TeamFightViewSet(iue.TournamentVersionETagMixin, viewsets.ModelViewSet):
+    queryset = tfm.TeamFight.objects.order_by('pk')
     serializer_class = tfs.TeamFightSerializer
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,
                           tp.IsTournamentAdminOrReadOnlyDependent)
+    tournament_lookup = 'team_fights'
+    etag_actions = ('retrieve', 'fights')
+
+    def perform_update(self, serializer):
+        try:
+            serializer.save()
+        except bm.FollowingFightStartedException:
+            raise ValidationError({'winner': 'the following cup fight has already started'})
 
     @action(
         methods=['get'],
@@ -23,8 +37,21 @@ class TeamFightViewSet(viewsets.ModelViewSet):
         url_name='fights')
     def fights(self, request, pk=None):
         team_fight = get_object_or_404(self.queryset, pk=pk)
-        serializer = fs.FightSerializer(fm.Fight.objects.filter(team_fight=team_fight), many=True)
-        return Response(serializer.data)
+        return iupg.paginated_response(self, fm.Fight.objects.filter(team_fight=team_fight).order_by('pk'),
+                                       fs.FightSerializer)
+
+    @action(
+        methods=['post'],
+        detail=True,
+        url_name='generate_fights',
+        url_path='generate_fights',
+        permission_classes=[
+            permissions.IsAuthenticated,
+            tfp.IsTeamFightOwner])
+    def generate_fights(self, request, pk=None):
+        team_fight = get_object_or_404(self.queryset, pk=pk)
+        fights = flu.generate(tfm.TeamFight.objects.filter(pk=team_fight.pk))
+        return Response(fs.FightSerializer(fights, many=True).data, status=status.HTTP_201_CREATED)
 
 
 @api_view(['GET'])
@@ -0,0 +1,168 @@
+import csv
+import io
+
+from django.db import transaction
+from rest_framework import serializers
+
+import ippon.models.club as cl
+import ippon.models.player as plm
+import ippon.models.tournament as tm
+import ippon.models.tournament_changes as tcm
+import ippon.player.serializers as pls
+
+BATCH_SIZE = 500
+
+CREATED = 'created'
+UPDATED = 'updated'
+ALREADY_REGISTERED = 'already_registered'
+DUPLICATE = 'duplicate'
+NO_SUCH_PLAYER = 'no_such_player'
+NO_SUCH_CLUB = 'no_such_club'
+NO_SUCH_PARTICIPATION = 'no_such_participation'
+FORBIDDEN = 'forbidden'
+INVALID = 'invalid'
+
+
+class ImportedPlayerSerializer(pls.PlayerSerializer):
+    club_id = serializers.IntegerField()
+
+
+class ParticipationStatusSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    is_paid = serializers.BooleanField(required=False)
+    is_registered = serializers.BooleanField(required=False)
+    is_qualified = serializers.BooleanField(required=False)
+    notes = serializers.CharField(required=False, allow_blank=True)
+
+
+def batches(items, size=BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def register_players(tournament, player_ids):
+    results = [{'row': row, 'player_id': player_id} for row, player_id in enumerate(player_ids)]
+    seen = set()
+    for result in results:
+        if not isinstance(result['player_id'], int) or isinstance(result['player_id'], bool):
+            result['status'] = INVALID
+        elif result['player_id'] in seen:
+            result['status'] = DUPLICATE
+        else:
+            seen.add(result['player_id'])
+
+    pending = [result for result in results if 'status' not in result]
+    created = []
+    with transaction.atomic():
+        for batch in batches(pending):
+            ids = [result['player_id'] for result in batch]
+            existing = set(plm.Player.objects.filter(pk__in=ids).values_list('pk', flat=True))
+            registered = set(tournament.participations.filter(player__in=ids).values_list('player_id', flat=True))
+            for result in batch:
+                if result['player_id'] not in existing:
+                    result['status'] = NO_SUCH_PLAYER
+                elif result['player_id'] in registered:
+                    result['status'] = ALREADY_REGISTERED
+            created += create_participations(tournament, [result for result in batch if 'status' not in result])
+        notify_participations_changed(tournament, created, tcm.CREATED)
+    return results
+
+
+def read_csv(csv_file):
+    """
+    Rows of the uploaded csv file as dicts keyed by its header. A leading byte order mark is skipped.
+    Raises ValueError when the file is not UTF-8 or not a valid csv file.
+    """
+    try:
+        return list(csv.DictReader(io.StringIO(csv_file.read().decode('utf-8-sig'))))
+    except UnicodeDecodeError:
+        raise ValueError('csv file has to be UTF-8 encoded')
+    except csv.Error as e:
+        raise ValueError('invalid csv file: {}'.format(e))
+
+
+def import_players_csv(tournament, user, csv_file):
+    rows = read_csv(csv_file)
+    results = [{'row': row} for row in range(len(rows))]
+    created = []
+    with transaction.atomic():
+        for batch in batches(list(zip(results, rows))):
+            valid = []
+            for result, row in batch:
+                serializer = ImportedPlayerSerializer(data=row)
+                if serializer.is_valid():
+                    valid.append((result, serializer.validated_data))
+                else:
+                    result['status'] = INVALID
+                    result['errors'] = serializer.errors
+
+            club_ids = {data['club_id'] for _, data in valid}
+            existing_clubs = set(cl.Club.objects.filter(pk__in=club_ids).values_list('pk', flat=True))
+            administered_clubs = set(cl.ClubAdmin.objects.filter(user=user, club__in=club_ids)
+                                     .values_list('club_id', flat=True))
+            accepted = []
+            for result, data in valid:
+                if data['club_id'] not in existing_clubs:
+                    result['status'] = NO_SUCH_CLUB
+                elif data['club_id'] not in administered_clubs:
+                    result['status'] = FORBIDDEN
+                else:
+                    accepted.append((result, data))
+
+            players = plm.Player.objects.bulk_create(
+                [plm.Player(club_id_id=data.pop('club_id'), **data) for _, data in accepted])
+            for (result, _), player in zip(accepted, players):
+                result['player_id'] = player.id
+            created += create_participations(tournament, [result for result, _ in accepted])
+        notify_participations_changed(tournament, created, tcm.CREATED)
+    return results
+
+
+def create_participations(tournament, results):
+    participations = tm.TournamentParticipation.objects.bulk_create(
+        [tm.TournamentParticipation(tournament=tournament, player_id=result['player_id']) for result in results])
+    for result, participation in zip(results, participations):
+        result['status'] = CREATED
+        result['participation_id'] = participation.id
+    return participations
+
+
+def notify_participations_changed(tournament, participations, action):
+    if participations:
+        tcm.notify_changed(tournament.id, tm.TournamentParticipation, participations, action)
+
+
+def update_participations(tournament, changes):
+    results = [{'row': row} for row in range(len(changes))]
+    valid = []
+    for result, change in zip(results, changes):
+        serializer = ParticipationStatusSerializer(data=change)
+        if serializer.is_valid():
+            result['id'] = serializer.validated_data['id']
+            valid.append((result, serializer.validated_data))
+        else:
+            result['status'] = INVALID
+            result['errors'] = serializer.errors
+
+    updated = []
+    with transaction.atomic():
+        for batch in batches(valid):
+            participations = tournament.participations.select_for_update() \
+                .in_bulk([data['id'] for _, data in batch])
+            changed_fields = set()
+            for result, data in batch:
+                participation = participations.get(data['id'])
+                if participation is None:
+                    result['status'] = NO_SUCH_PARTICIPATION
+                    continue
+                for field, value in data.items():
+                    if field != 'id':
+                        setattr(participation, field, value)
+                        changed_fields.add(field)
+                result['status'] = UPDATED
+            if changed_fields:
+                tm.TournamentParticipation.objects.bulk_update(participations.values(), changed_fields,
+                                                               batch_size=BATCH_SIZE)
+                updated += participations.values()
+        notify_participations_changed(tournament, updated, tcm.UPDATED)
+    return results
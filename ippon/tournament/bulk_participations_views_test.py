@@ -0,0 +1,171 @@
+import csv
+import datetime
+import json
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+import ippon.models.club as cl
+import ippon.models.player as plm
+import ippon.models.tournament as tm
+import ippon.tournament.bulk as tb
+
+
+class BulkParticipationsViewTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.club = cl.Club.objects.create(name='cn1', webpage='http://cw1.co', description='cd1', city='cc1')
+        self.other_club = cl.Club.objects.create(name='cn2', webpage='http://cw2.co', description='cd2', city='cc2')
+        self.user = User.objects.create(username='admin', password='password')
+        self.user2 = User.objects.create(username='nonadmin', password='password')
+        self.to1 = tm.Tournament.objects.create(name='T1', webpage='http://w1.co', description='d1', city='c1',
+                                                date=datetime.date(year=2021, month=1, day=1), address='a1',
+                                                team_size=1, group_match_length=3, ko_match_length=3,
+                                                final_match_length=3, finals_depth=0, age_constraint=5,
+                                                age_constraint_value=20, rank_constraint=5, rank_constraint_value=7,
+                                                sex_constraint=1)
+        tm.TournamentAdmin.objects.create(user=self.user, tournament=self.to1, is_master=False)
+        cl.ClubAdmin.objects.create(user=self.user, club=self.club)
+        self.p1 = plm.Player.objects.create(name='pn1', surname='ps1', rank=7,
+                                            birthday=datetime.date(year=2001, month=1, day=1), sex=1, club_id=self.club)
+        self.p2 = plm.Player.objects.create(name='pn2', surname='ps2', rank=7,
+                                            birthday=datetime.date(year=2001, month=1, day=1), sex=1, club_id=self.club)
+        self.p3 = plm.Player.objects.create(name='pn3', surname='ps3', rank=7,
+                                            birthday=datetime.date(year=2001, month=1, day=1), sex=1, club_id=self.club)
+        self.to1.participations.create(player=self.p3)
+        self.url = reverse('tournament-bulk_participations', kwargs={'pk': self.to1.id})
+
+    def post_ids(self, player_ids):
+        return self.client.post(self.url, data=json.dumps({'player_ids': player_ids}),
+                                content_type='application/json')
+
+
+class BulkParticipationsAuthorizedTests(BulkParticipationsViewTest):
+    def setUp(self):
+        super(BulkParticipationsAuthorizedTests, self).setUp()
+        self.client.force_authenticate(user=self.user)
+
+    def test_post_player_ids_creates_participations_and_reports_every_row(self):
+        response = self.post_ids([self.p1.id, self.p2.id, self.p3.id, self.p1.id, -1, "x"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([tb.CREATED, tb.CREATED, tb.ALREADY_REGISTERED, tb.DUPLICATE, tb.NO_SUCH_PLAYER, tb.INVALID],
+                         [result['status'] for result in response.data])
+        self.assertEqual({self.p1.id, self.p2.id, self.p3.id},
+                         set(self.to1.participations.values_list('player_id', flat=True)))
+        self.assertEqual(response.data[0]['participation_id'],
+                         self.to1.participations.get(player=self.p1).id)
+
+    def test_post_player_ids_uses_constant_number_of_queries(self):
+        players = [plm.Player(name='n', surname='s', rank=1, birthday=datetime.date(year=2001, month=1, day=1),
+                              sex=0, club_id=self.club) for _ in range(50)]
+        ids = [player.id for player in plm.Player.objects.bulk_create(players)]
+        with self.assertNumQueries(10):
+            response = self.post_ids(ids)
+        self.assertEqual(50, len([result for result in response.data if result['status'] == tb.CREATED]))
+
+    def test_post_csv_creates_players_and_participations(self):
+        content = "name,surname,sex,rank,birthday,club_id\n" \
+                  "n1,s1,0,3,2000-02-02,{club}\n" \
+                  "n2,s2,1,3,not-a-date,{club}\n" \
+                  "n3,s3,1,3,2000-02-02,{other}\n" \
+                  "n4,s4,1,3,2000-02-02,-1\n".format(club=self.club.id, other=self.other_club.id)
+        response = self.client.post(self.url, data={'file': SimpleUploadedFile('players.csv', content.encode())},
+                                    format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([tb.CREATED, tb.INVALID, tb.FORBIDDEN, tb.NO_SUCH_CLUB],
+                         [result['status'] for result in response.data])
+        player = plm.Player.objects.get(pk=response.data[0]['player_id'])
+        self.assertEqual(('n1', 's1', self.club.id), (player.name, player.surname, player.club_id.id))
+        self.assertTrue(self.to1.participations.filter(player=player).exists())
+        self.assertFalse(plm.Player.objects.filter(name__in=['n2', 'n3', 'n4']).exists())
+
+    def post_csv(self, content):
+        return self.client.post(self.url, data={'file': SimpleUploadedFile('players.csv', content)},
+                                format='multipart')
+
+    def test_post_csv_with_byte_order_mark_reads_first_column(self):
+        content = "name,surname,sex,rank,birthday,club_id\n" \
+                  "n1,s1,0,3,2000-02-02,{club}\n".format(club=self.club.id)
+        response = self.post_csv(content.encode('utf-8-sig'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([tb.CREATED], [result['status'] for result in response.data])
+        self.assertEqual('n1', plm.Player.objects.get(pk=response.data[0]['player_id']).name)
+
+    def test_post_csv_not_in_utf8_returns_bad_request(self):
+        content = "name,surname,sex,rank,birthday,club_id\n" \
+                  "Łukasz,Żółw,0,3,2000-02-02,{club}\n".format(club=self.club.id)
+        response = self.post_csv(content.encode('iso-8859-2'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('UTF-8', response.data['error'])
+        self.assertEqual(3, plm.Player.objects.count())
+
+    def test_post_malformed_csv_returns_bad_request(self):
+        too_long = 'n' * (csv.field_size_limit() + 1)
+        content = "name,surname,sex,rank,birthday,club_id\n" \
+                  "{name},s1,0,3,2000-02-02,{club}\n".format(name=too_long, club=self.club.id)
+        response = self.post_csv(content.encode())
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('invalid csv file', response.data['error'])
+        self.assertFalse(self.to1.participations.exclude(player=self.p3).exists())
+
+    def test_post_without_ids_or_file_returns_bad_request(self):
+        response = self.client.post(self.url, data=json.dumps({}), content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_patch_updates_flags_of_many_participations(self):
+        par1 = self.to1.participations.create(player=self.p1, notes='n')
+        par3 = self.to1.participations.get(player=self.p3)
+        other = tm.Tournament.objects.create(name='T2', webpage='http://w2.co', description='d2', city='c2',
+                                             date=datetime.date(year=2021, month=1, day=1), address='a2',
+                                             team_size=1, group_match_length=3, ko_match_length=3,
+                                             final_match_length=3, finals_depth=0, age_constraint=0,
+                                             age_constraint_value=0, rank_constraint=0, rank_constraint_value=0,
+                                             sex_constraint=0)
+        foreign = other.participations.create(player=self.p2)
+        response = self.client.patch(self.url, data=json.dumps([
+            {'id': par1.id, 'is_paid': True},
+            {'id': par3.id, 'is_registered': True, 'is_qualified': True},
+            {'id': foreign.id, 'is_paid': True},
+            {'id': par1.id, 'is_paid': 'maybe'}
+        ]), content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([tb.UPDATED, tb.UPDATED, tb.NO_SUCH_PARTICIPATION, tb.INVALID],
+                         [result['status'] for result in response.data])
+        par1.refresh_from_db()
+        par3.refresh_from_db()
+        foreign.refresh_from_db()
+        self.assertEqual((True, False, False, 'n'), (par1.is_paid, par1.is_registered, par1.is_qualified, par1.notes))
+        self.assertEqual((False, True, True), (par3.is_paid, par3.is_registered, par3.is_qualified))
+        self.assertFalse(foreign.is_paid)
+
+    def test_patch_without_list_returns_bad_request(self):
+        response = self.client.patch(self.url, data=json.dumps({}), content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BulkParticipationsUnauthorizedTests(BulkParticipationsViewTest):
+    def setUp(self):
+        super(BulkParticipationsUnauthorizedTests, self).setUp()
+        self.client.force_authenticate(user=self.user2)
+
+    def test_post_player_ids_returns_forbidden(self):
+        response = self.post_ids([self.p1.id])
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(self.to1.participations.filter(player=self.p1).exists())
+
+    def test_patch_returns_forbidden(self):
+        par3 = self.to1.participations.get(player=self.p3)
+        response = self.client.patch(self.url, data=json.dumps([{'id': par3.id, 'is_paid': True}]),
+                                     content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        par3.refresh_from_db()
+        self.assertFalse(par3.is_paid)
+
+
+class BulkParticipationsUnauthenticatedTests(BulkParticipationsViewTest):
+    def test_post_player_ids_returns_unauthorized(self):
+        response = self.post_ids([self.p1.id])
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
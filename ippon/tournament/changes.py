@@ -0,0 +1,60 @@
+import ippon.models.tournament as tm
+import ippon.models.tournament_changes as tcm
+
+MODELS = {model._meta.model_name: model for model in list(tcm.TOURNAMENT_LOOKUPS) + [tm.Tournament]}
+# Models whose rows are only readable by the admins of the tournament.
+PRIVATE_MODELS = {tm.TournamentParticipation._meta.model_name, tm.TournamentAdmin._meta.model_name}
+
+
+def parse_since(value):
+    since = int(value or 0)
+    if since < 0:
+        raise ValueError('since has to be a non negative sequence number')
+    return since
+
+
+def load_data(model_name, ids):
+    model = MODELS[model_name]
+    fields = [field.name for field in model._meta.concrete_fields]
+    return {row['id']: row for row in model.objects.filter(pk__in=ids).values(*fields)}
+
+
+def changes_since(tournament_id, since, limit, include_private=False):
+    """
+    Changes of the tournament with sequence numbers above since, at most limit log rows unless a single
+    sequence number has more of them (a sequence is never split between pages).
+    Every changed row is reported once, with its latest action and its current field values (None once
+    it is gone), so a client applying the changes in order ends up with the current state.
+    Reads the log once (twice when a page ends within a sequence) and every changed model once.
+    """
+    changes = tcm.TournamentChange.objects.filter(tournament=tournament_id).order_by('sequence', 'pk')
+    if not include_private:
+        changes = changes.exclude(model__in=PRIVATE_MODELS)
+    rows = list(changes.filter(sequence__gt=since).values_list('sequence', 'model', 'object_id', 'action')[:limit + 1])
+    has_more = len(rows) > limit
+    if has_more:
+        boundary = rows[limit][0]
+        rows = [row for row in rows[:limit] if row[0] != boundary] or \
+            list(changes.filter(sequence=boundary).values_list('sequence', 'model', 'object_id', 'action'))
+
+    latest = {}
+    for sequence, model_name, object_id, action in rows:
+        latest.pop((model_name, object_id), None)
+        latest[(model_name, object_id)] = (sequence, action)
+    alive = {}
+    for (model_name, object_id), (_, action) in latest.items():
+        if action != tcm.DELETED:
+            alive.setdefault(model_name, []).append(object_id)
+    data = {model_name: load_data(model_name, ids) for model_name, ids in alive.items()}
+
+    result = []
+    for (model_name, object_id), (sequence, action) in latest.items():
+        row = data.get(model_name, {}).get(object_id)
+        result.append({'sequence': sequence, 'model': model_name, 'id': object_id,
+                       'action': action if row is not None else tcm.DELETED, 'data': row})
+    return {
+        'since': since,
+        'last': rows[-1][0] if rows else since,
+        'has_more': has_more,
+        'changes': result
+    }
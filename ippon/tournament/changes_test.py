@@ -0,0 +1,86 @@
+import datetime
+
+from django.test import TestCase
+
+import ippon.models.club as cl
+import ippon.models.player as plm
+import ippon.models.tournament as tm
+import ippon.models.tournament_changes as tcm
+import ippon.tournament.changes as tch
+
+
+class ChangesSinceTests(TestCase):
+    def setUp(self):
+        self.tournament = tm.Tournament.objects.create(
+            name='T1', webpage='http://w1.co', description='d1', city='c1',
+            date=datetime.date(year=2021, month=1, day=1), address='a1', team_size=3, group_match_length=3,
+            ko_match_length=4, final_match_length=5, finals_depth=0, age_constraint=5, age_constraint_value=20,
+            rank_constraint=5, rank_constraint_value=7, sex_constraint=1)
+        self.t1 = self.tournament.teams.create(name='t1')
+        self.t2 = self.tournament.teams.create(name='t2')
+
+    def get_version(self):
+        return tm.Tournament.objects.get(pk=self.tournament.pk).version
+
+    def test_only_changes_after_since_are_returned_with_current_data(self):
+        since = self.get_version()
+        self.t1.name = 'renamed'
+        self.t1.save()
+        result = tch.changes_since(self.tournament.id, since, 10)
+        self.assertEqual({'since': since, 'last': since + 1, 'has_more': False, 'changes': [
+            {'sequence': since + 1, 'model': 'team', 'id': self.t1.id, 'action': tcm.UPDATED,
+             'data': {'id': self.t1.id, 'name': 'renamed', 'tournament': self.tournament.id}}]}, result)
+
+    def test_row_changed_several_times_is_reported_once_with_latest_action(self):
+        since = self.get_version()
+        team = self.tournament.teams.create(name='t3')
+        team.name = 't4'
+        team.save()
+        self.t1.save()
+        team_id = team.id
+        team.delete()
+        changes = tch.changes_since(self.tournament.id, since, 10)['changes']
+        self.assertEqual([(self.t1.id, tcm.UPDATED), (team_id, tcm.DELETED)],
+                         [(change['id'], change['action']) for change in changes])
+        self.assertIsNone(changes[1]['data'])
+
+    def test_page_ends_before_a_split_sequence(self):
+        since = self.get_version()
+        self.t1.save()
+        tcm.notify_changed(self.tournament.id, type(self.t1), [self.t1, self.t2], tcm.UPDATED)
+        result = tch.changes_since(self.tournament.id, since, 2)
+        self.assertTrue(result['has_more'])
+        self.assertEqual(since + 1, result['last'])
+        self.assertEqual([self.t1.id], [change['id'] for change in result['changes']])
+        result = tch.changes_since(self.tournament.id, result['last'], 2)
+        self.assertFalse(result['has_more'])
+        self.assertEqual([self.t1.id, self.t2.id], [change['id'] for change in result['changes']])
+
+    def test_sequence_larger_than_limit_is_returned_whole(self):
+        since = self.get_version()
+        tcm.notify_changed(self.tournament.id, type(self.t1), [self.t1, self.t2], tcm.UPDATED)
+        self.t1.save()
+        result = tch.changes_since(self.tournament.id, since, 1)
+        self.assertTrue(result['has_more'])
+        self.assertEqual(since + 1, result['last'])
+        self.assertEqual([self.t1.id, self.t2.id], [change['id'] for change in result['changes']])
+
+    def test_participations_are_only_included_on_request(self):
+        club = cl.Club.objects.create(name='cn1', webpage='http://cw1.co', description='cd1', city='cc1')
+        player = plm.Player.objects.create(name='pn1', surname='ps1', rank=7, sex=1, club_id=club,
+                                           birthday=datetime.date(year=2001, month=1, day=1))
+        since = self.get_version()
+        self.tournament.participations.create(player=player)
+        self.assertEqual([], tch.changes_since(self.tournament.id, since, 10)['changes'])
+        self.assertEqual(['tournamentparticipation'],
+                         [change['model'] for change in
+                          tch.changes_since(self.tournament.id, since, 10, include_private=True)['changes']])
+
+    def test_changes_are_read_in_constant_number_of_queries(self):
+        since = self.get_version()
+        for number in range(20):
+            team = self.tournament.teams.create(name='t{}'.format(number + 3))
+            self.tournament.team_fights.create(aka_team=team, shiro_team=self.t1)
+        with self.assertNumQueries(3):
+            result = tch.changes_since(self.tournament.id, since, 100)
+        self.assertEqual(40, len(result['changes']))
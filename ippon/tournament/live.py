@@ -0,0 +1,246 @@
+import abc
+import json
+import logging
+import queue
+import select
+import threading
+import time
+
+import psycopg2
+import psycopg2.extensions
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.dispatch.dispatcher import receiver
+from django.utils.module_loading import import_string
+from rest_framework import renderers
+
+import ippon.models.tournament_changes as tcm
+
+logger = logging.getLogger(__name__)
+
+# Put in place of the events a subscriber was too slow to take; the client has to refetch.
+RESET = object()
+
+
+class Subscription(object):
+    def __init__(self, broker, tournament_id, size):
+        self.broker = broker
+        self.tournament_id = tournament_id
+        self.events = queue.Queue(maxsize=size)
+        self.overflowed = False
+
+    def put(self, event):
+        if self.overflowed:
+            return
+        try:
+            self.events.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout=None):
+        """
+        Next event, RESET once the subscription overflowed, or None when nothing came within timeout.
+        """
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return RESET if self.overflowed else None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class Broker(abc.ABC):
+    """
+    Fans out change events of a tournament to its subscribers. Implementations are picked by the LIVE_BROKER
+    setting; one spanning processes has to deliver every published event to the subscriptions of all of them.
+    """
+
+    @abc.abstractmethod
+    def subscribe(self, tournament_id):
+        pass
+
+    @abc.abstractmethod
+    def unsubscribe(self, subscription):
+        pass
+
+    @abc.abstractmethod
+    def publish(self, tournament_id, event):
+        pass
+
+    def close(self):
+        pass
+
+
+class InProcessBroker(Broker):
+    """
+    Delivers events to the subscribers of this process only, which is enough when a single process
+    serves both the writes and the streams.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+
+    def subscribe(self, tournament_id):
+        subscription = Subscription(self, tournament_id, settings.LIVE_QUEUE_SIZE)
+        with self._lock:
+            self._subscriptions.setdefault(tournament_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.tournament_id, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.tournament_id, None)
+
+    def subscriber_count(self, tournament_id):
+        with self._lock:
+            return len(self._subscriptions.get(tournament_id, ()))
+
+    def publish(self, tournament_id, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(tournament_id, ()))
+        for subscription in subscriptions:
+            subscription.put(event)
+
+    def reset_all(self):
+        with self._lock:
+            subscriptions = [subscription for tournament in self._subscriptions.values() for subscription in tournament]
+        for subscription in subscriptions:
+            subscription.put(RESET)
+
+
+class PostgresBroker(InProcessBroker):
+    """
+    Spreads events across server processes with Postgres NOTIFY. Each process LISTENs on a connection of its
+    own from a background thread and hands what arrives to its subscribers, so a stream gets the writes
+    handled by any process. Subscribers get a reset whenever the listener loses its connection, as events
+    may have been missed meanwhile.
+    """
+    channel = 'ippon_live'
+    # Postgres rejects NOTIFY payloads of 8000 bytes and more.
+    max_payload = 7999
+    poll_seconds = 1
+    reconnect_seconds = 5
+
+    def __init__(self):
+        super(PostgresBroker, self).__init__()
+        self._listening = threading.Event()
+        self._stopped = threading.Event()
+        self._listener = None
+
+    def subscribe(self, tournament_id):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name='ippon-live', daemon=True)
+                self._listener.start()
+        self._listening.wait(self.reconnect_seconds)
+        return super(PostgresBroker, self).subscribe(tournament_id)
+
+    def publish(self, tournament_id, event):
+        payload = json.dumps({'tournament': tournament_id, 'event': event}, separators=(',', ':'))
+        if len(payload.encode()) > self.max_payload:
+            payload = json.dumps({'tournament': tournament_id, 'reset': True}, separators=(',', ':'))
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.channel, payload])
+
+    def close(self):
+        self._stopped.set()
+        if self._listener is not None:
+            self._listener.join()
+
+    def _listen(self):
+        while not self._stopped.is_set():
+            try:
+                self._receive()
+            except psycopg2.Error:
+                logger.exception('Live listener lost its database connection')
+            self._listening.clear()
+            self.reset_all()
+            self._stopped.wait(self.reconnect_seconds)
+
+    def _receive(self):
+        listener = psycopg2.connect(**connections['default'].get_connection_params())
+        try:
+            listener.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            with listener.cursor() as cursor:
+                cursor.execute('LISTEN {}'.format(self.channel))
+            self._listening.set()
+            while not self._stopped.is_set():
+                if select.select([listener], [], [], self.poll_seconds)[0]:
+                    listener.poll()
+                    while listener.notifies:
+                        self._deliver(json.loads(listener.notifies.pop(0).payload))
+        finally:
+            listener.close()
+
+    def _deliver(self, message):
+        super(PostgresBroker, self).publish(message['tournament'], RESET if message.get('reset') else message['event'])
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(settings.LIVE_BROKER)()
+        return _broker
+
+
+def reset_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is not None:
+            _broker.close()
+        _broker = None
+
+
+def make_event(model, instances, action, sequence):
+    return {'model': model._meta.model_name, 'action': action, 'ids': [instance.pk for instance in instances],
+            'sequence': sequence}
+
+
+def format_event(event):
+    return 'event: change\ndata: {}\n\n'.format(json.dumps(event, separators=(',', ':')))
+
+
+def stream(subscription, heartbeat, lifetime):
+    """
+    Server-Sent Events for the subscription: one change event per published event, a comment line when
+    nothing happened for heartbeat seconds (to keep proxies from closing the connection) and a final reset
+    event if the client fell too far behind. The stream ends after lifetime seconds so it does not hold
+    a server worker forever; EventSource clients reconnect on their own and catch up through changes.
+    The subscription is closed together with the response.
+    """
+    deadline = time.monotonic() + lifetime
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            event = subscription.get(min(heartbeat, remaining))
+            if event is RESET:
+                yield 'event: reset\ndata: {}\n\n'
+                return
+            yield ': keepalive\n\n' if event is None else format_event(event)
+    finally:
+        subscription.close()
+
+
+class EventStreamRenderer(renderers.BaseRenderer):
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode() if data is not None else b''
+
+
+@receiver(tcm.tournament_changed)
+def publish_change(sender, tournament_id, instances, action, sequence=None, **kwargs):
+    event = make_event(sender, instances, action, sequence)
+    transaction.on_commit(lambda: get_broker().publish(tournament_id, event))
@@ -0,0 +1,189 @@
+import datetime
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+import ippon.models.team_fight as tfm
+import ippon.models.tournament as tm
+import ippon.tournament.live as tl
+import ippon.utils.values as iuv
+
+
+class InProcessBrokerTests(SimpleTestCase):
+    def setUp(self):
+        self.broker = tl.InProcessBroker()
+
+    def test_event_is_delivered_to_every_subscriber_of_the_tournament(self):
+        first = self.broker.subscribe(1)
+        second = self.broker.subscribe(1)
+        other = self.broker.subscribe(2)
+        self.broker.publish(1, {'model': 'point'})
+        self.assertEqual({'model': 'point'}, first.get(0))
+        self.assertEqual({'model': 'point'}, second.get(0))
+        self.assertIsNone(other.get(0))
+
+    def test_closed_subscription_gets_no_events(self):
+        subscription = self.broker.subscribe(1)
+        subscription.close()
+        self.broker.publish(1, {'model': 'point'})
+        self.assertIsNone(subscription.get(0))
+        self.assertEqual(0, self.broker.subscriber_count(1))
+
+    @override_settings(LIVE_QUEUE_SIZE=2)
+    def test_overflowed_subscription_gets_reset_after_queued_events(self):
+        subscription = self.broker.subscribe(1)
+        for number in range(3):
+            self.broker.publish(1, {'number': number})
+        self.assertEqual([{'number': 0}, {'number': 1}, tl.RESET], [subscription.get(0) for _ in range(3)])
+
+    def test_broker_without_publish_cannot_be_created(self):
+        class IncompleteBroker(tl.Broker):
+            def subscribe(self, tournament_id):
+                pass
+
+            def unsubscribe(self, subscription):
+                pass
+
+        with self.assertRaises(TypeError):
+            IncompleteBroker()
+
+
+class PostgresBrokerTests(TransactionTestCase):
+    def setUp(self):
+        self.broker = self.create_broker()
+
+    def create_broker(self):
+        broker = tl.PostgresBroker()
+        self.addCleanup(broker.close)
+        return broker
+
+    def test_event_is_delivered_to_subscribers_of_the_tournament(self):
+        subscription = self.broker.subscribe(1)
+        other = self.broker.subscribe(2)
+        self.broker.publish(1, {'model': 'point'})
+        self.assertEqual({'model': 'point'}, subscription.get(5))
+        self.assertIsNone(other.get(0))
+
+    def test_event_reaches_subscribers_of_other_brokers(self):
+        subscription = self.create_broker().subscribe(1)
+        self.broker.publish(1, {'model': 'point'})
+        self.assertEqual({'model': 'point'}, subscription.get(5))
+        self.assertIsNone(self.broker.subscribe(1).get(0))
+
+    def test_event_too_large_to_notify_resets_subscribers(self):
+        subscription = self.broker.subscribe(1)
+        self.broker.publish(1, {'model': 'point', 'ids': list(range(2000))})
+        self.assertIs(tl.RESET, subscription.get(5))
+
+    def test_subscribers_are_reset_when_listener_stops(self):
+        subscription = self.broker.subscribe(1)
+        self.broker.close()
+        self.assertIs(tl.RESET, subscription.get(0))
+
+
+class StreamTests(SimpleTestCase):
+    def setUp(self):
+        self.broker = tl.InProcessBroker()
+
+    def test_stream_formats_events_and_heartbeats(self):
+        subscription = self.broker.subscribe(1)
+        events = tl.stream(subscription, 0, 60)
+        self.assertEqual(': keepalive\n\n', next(events))
+        self.broker.publish(1, {'model': 'fight', 'action': 'updated', 'ids': [3]})
+        self.assertEqual('event: change\ndata: {"model":"fight","action":"updated","ids":[3]}\n\n', next(events))
+
+    def test_stream_ends_after_lifetime(self):
+        subscription = self.broker.subscribe(1)
+        self.broker.publish(1, {'model': 'fight'})
+        self.assertEqual([], list(tl.stream(subscription, 0, 0)))
+        self.assertEqual(0, self.broker.subscriber_count(1))
+
+    def test_stream_waits_no_longer_than_its_lifetime(self):
+        subscription = self.broker.subscribe(1)
+        with patch.object(subscription, 'get', return_value=None) as get:
+            events = tl.stream(subscription, 15, 0.5)
+            next(events)
+        self.assertLessEqual(get.call_args[0][0], 0.5)
+
+    def test_closing_stream_unsubscribes(self):
+        events = tl.stream(self.broker.subscribe(1), 0, 60)
+        next(events)
+        events.close()
+        self.assertEqual(0, self.broker.subscriber_count(1))
+
+
+@override_settings(LIVE_HEARTBEAT_SECONDS=0, LIVE_BROKER='ippon.tournament.live.InProcessBroker')
+class LiveViewTests(TestCase):
+    def setUp(self):
+        tl.reset_broker()
+        self.client = APIClient()
+        self.tournament = self.create_tournament('T1')
+        self.teams = [self.tournament.teams.create(name='t{}'.format(i)) for i in range(2)]
+
+    def tearDown(self):
+        tl.reset_broker()
+
+    @staticmethod
+    def create_tournament(name):
+        return tm.Tournament.objects.create(
+            name=name, webpage='http://w1.co', description='d1', city='c1',
+            date=datetime.date(year=2021, month=1, day=1), address='a1', team_size=3, group_match_length=3,
+            ko_match_length=4, final_match_length=5, finals_depth=0, age_constraint=5, age_constraint_value=20,
+            rank_constraint=5, rank_constraint_value=7, sex_constraint=1)
+
+    def test_committed_changes_are_pushed_to_the_stream(self):
+        response = self.client.get(reverse('tournament-live', kwargs={'pk': self.tournament.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual('text/event-stream', response['Content-Type'])
+        self.assertNotIn('ETag', response)
+        events = iter(response.streaming_content)
+        with self.captureOnCommitCallbacks(execute=True):
+            team_fight = self.tournament.team_fights.create(aka_team=self.teams[0], shiro_team=self.teams[1])
+        self.tournament.refresh_from_db()
+        expected = 'event: change\ndata: {{"model":"teamfight","action":"created","ids":[{}],"sequence":{}}}\n\n' \
+            .format(team_fight.id, self.tournament.version)
+        self.assertEqual(expected.encode(), next(events))
+
+    def test_uncommitted_changes_are_not_pushed(self):
+        response = self.client.get(reverse('tournament-live', kwargs={'pk': self.tournament.id}))
+        events = iter(response.streaming_content)
+        with self.captureOnCommitCallbacks(execute=False):
+            tfm.TeamFight.objects.create(tournament=self.tournament, aka_team=self.teams[0],
+                                         shiro_team=self.teams[1])
+        self.assertEqual(b': keepalive\n\n', next(events))
+
+    def test_changes_of_other_tournaments_are_not_pushed(self):
+        other = self.create_tournament('T2')
+        response = self.client.get(reverse('tournament-live', kwargs={'pk': self.tournament.id}))
+        events = iter(response.streaming_content)
+        with self.captureOnCommitCallbacks(execute=True):
+            other.teams.create(name='other')
+        self.assertEqual(b': keepalive\n\n', next(events))
+
+    def test_live_for_not_existing_tournament_returns_not_found(self):
+        response = self.client.get(reverse('tournament-live', kwargs={'pk': iuv.BAD_PK}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(LIVE_HEARTBEAT_SECONDS=5, LIVE_BROKER='ippon.tournament.live.PostgresBroker')
+class PostgresLiveViewTests(TransactionTestCase):
+    def setUp(self):
+        tl.reset_broker()
+        self.client = APIClient()
+        self.tournament = LiveViewTests.create_tournament('T1')
+        self.teams = [self.tournament.teams.create(name='t{}'.format(i)) for i in range(2)]
+
+    def tearDown(self):
+        tl.reset_broker()
+
+    def test_committed_changes_are_pushed_to_the_stream(self):
+        response = self.client.get(reverse('tournament-live', kwargs={'pk': self.tournament.id}))
+        events = iter(response.streaming_content)
+        team_fight = self.tournament.team_fights.create(aka_team=self.teams[0], shiro_team=self.teams[1])
+        self.tournament.refresh_from_db()
+        expected = 'event: change\ndata: {{"model":"teamfight","action":"created","ids":[{}],"sequence":{}}}\n\n' \
+            .format(team_fight.id, self.tournament.version)
+        self.assertEqual(expected.encode(), next(events))
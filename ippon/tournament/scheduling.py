@@ -0,0 +1,212 @@
+import bisect
+import collections
+import datetime
+import heapq
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min
+from django.db.models.signals import post_save
+from django.dispatch.dispatcher import receiver
+from django.utils import timezone
+
+import ippon.models.team_fight as tfm
+import ippon.models.tournament as tm
+import ippon.models.tournament_changes as tcm
+
+PREPARED = 0
+STARTED = 1
+FINISHED = 2
+
+# not_before is the earliest start of the bout, court the one it stays on unless it can start earlier elsewhere.
+Bout = collections.namedtuple('Bout', ['id', 'teams', 'duration', 'after', 'not_before', 'court'], defaults=(0, None))
+
+
+def priorities(bouts, followers):
+    """
+    Length of the longest chain of bouts starting with every bout, the bouts on the critical path come first.
+    """
+    waiting = {bout.id: len(followers[bout.id]) for bout in bouts}
+    previous = collections.defaultdict(list)
+    for bout in bouts:
+        for follower_id in followers[bout.id]:
+            previous[follower_id].append(bout.id)
+    by_id = {bout.id: bout for bout in bouts}
+    result = {}
+    stack = [bout.id for bout in bouts if not waiting[bout.id]]
+    while stack:
+        bout_id = stack.pop()
+        result[bout_id] = by_id[bout_id].duration + max([result[f] for f in followers[bout_id]], default=0)
+        for previous_id in previous[bout_id]:
+            waiting[previous_id] -= 1
+            if not waiting[previous_id]:
+                stack.append(previous_id)
+    return result
+
+
+def schedule(bouts, courts, rest=0, team_free=None):
+    """
+    Greedy list scheduling of bouts on courts. Times are minutes from the start of planning.
+    courts maps court id to the time at which the court becomes free, team_free maps team id to the end of
+    its bout which is already running. Every time a court becomes free it gets the bout which can start
+    earliest on it, respecting the earliest start of the bout, the bouts it has to wait for (after) and the
+    rest of both teams; ties go to the bout with the longest chain of following bouts. A bout with a court
+    it prefers goes elsewhere only when it starts earlier there. Returns a dict of bout id to (court id, start).
+    Bouts waiting for each other in a cycle or for bouts which are not given are left out.
+    """
+    by_id = {bout.id: bout for bout in bouts}
+    followers = collections.defaultdict(list)
+    waiting = {}
+    for bout in bouts:
+        waiting[bout.id] = len(bout.after)
+        for bout_id in bout.after:
+            if bout_id in by_id:
+                followers[bout_id].append(bout.id)
+    priority = priorities(bouts, followers)
+
+    ready = sorted((-priority.get(bout.id, 0), bout.id) for bout in bouts if not waiting[bout.id])
+    free = [(time, court) for court, time in courts.items()]
+    heapq.heapify(free)
+    court_free_at = dict(courts)
+    idle = []
+    team_free = {team: time + rest for team, time in (team_free or {}).items()}
+    ends = {}
+    planned = {}
+    while ready and free:
+        court_free, court = heapq.heappop(free)
+        best = None
+        for index, (_, bout_id) in enumerate(ready):
+            bout = by_id[bout_id]
+            earliest = max([bout.not_before] + [team_free.get(team, 0) for team in bout.teams] +
+                           [ends[previous] for previous in bout.after])
+            start = max(court_free, earliest)
+            if bout.court not in (None, court) and bout.court in court_free_at and \
+                    max(court_free_at[bout.court], earliest) <= start:
+                continue
+            if best is None or start < best[0]:
+                best = (start, index)
+            if start == court_free:
+                break
+        if best is None:
+            # Every ready bout starts as early on the court it prefers; wait for more bouts to become ready.
+            idle.append((court_free, court))
+            continue
+        start, index = best
+        bout = by_id[ready.pop(index)[1]]
+        planned[bout.id] = (court, start)
+        ends[bout.id] = start + bout.duration
+        court_free_at[court] = ends[bout.id]
+        for team in bout.teams:
+            team_free[team] = ends[bout.id] + rest
+        heapq.heappush(free, (ends[bout.id], court))
+        for follower_id in followers[bout.id]:
+            waiting[follower_id] -= 1
+            if not waiting[follower_id]:
+                bisect.insort(ready, (-priority.get(follower_id, 0), follower_id))
+                for entry in idle:
+                    heapq.heappush(free, entry)
+                idle = []
+    return planned
+
+
+def team_fight_duration(tournament, cup_fight_id, next_fight_id):
+    if cup_fight_id is None:
+        length = tournament.group_match_length
+    elif next_fight_id is None:
+        length = tournament.final_match_length
+    else:
+        length = tournament.ko_match_length
+    return length * tournament.team_size
+
+
+def plan(tournament, start=None, planned_only=False):
+    """
+    Assigns every prepared team fight of the tournament to a location and a start time, from start (now by
+    default) on. Started team fights keep their location and teams until they are expected to end. Cup fights
+    wait for their previous fights.
+    With planned_only only the already planned team fights are moved: none of them starts before its planned
+    start, each keeps its location unless another one frees up as early, and those waiting for an unplanned
+    team fight keep their plan.
+    Only the changed team fights are written, in one update. Returns the planned team fights ordered by start.
+    """
+    start = start or timezone.now()
+    rest = settings.SCHEDULE_TEAM_REST_MINUTES
+    with transaction.atomic():
+        tournament = tm.Tournament.objects.select_for_update().get(pk=tournament.pk)
+        courts = {location_id: 0 for location_id in tournament.locations.values_list('pk', flat=True)}
+        if not courts:
+            raise ValueError('tournament has no locations')
+        rows = tfm.TeamFight.objects.filter(tournament=tournament, status__in=[PREPARED, STARTED])
+        if planned_only:
+            rows = rows.exclude(status=PREPARED, scheduled_start__isnull=True)
+        rows = rows.order_by('pk').values_list('pk', 'aka_team', 'shiro_team', 'status', 'location',
+                                               'scheduled_start', 'cup_fight', 'cup_fight__next_fight',
+                                               'cup_fight__previous_aka_fight__team_fight',
+                                               'cup_fight__previous_aka_fight__team_fight__status',
+                                               'cup_fight__previous_shiro_fight__team_fight',
+                                               'cup_fight__previous_shiro_fight__team_fight__status')
+
+        bouts = []
+        team_fights = []
+        team_free = {}
+        for pk, aka, shiro, status, location, scheduled_start, cup_fight, next_fight, *previous in rows:
+            duration = team_fight_duration(tournament, cup_fight, next_fight)
+            if status == PREPARED:
+                # Finished and started previous fights only keep their teams busy, prepared ones are waited for.
+                after = [fight for fight, fight_status in zip(previous[::2], previous[1::2])
+                         if fight_status == PREPARED]
+                if planned_only:
+                    not_before = max(0, (scheduled_start - start).total_seconds() / 60)
+                    bouts.append(Bout(pk, (aka, shiro), duration, after, not_before, location))
+                else:
+                    bouts.append(Bout(pk, (aka, shiro), duration, after))
+                team_fights.append(tfm.TeamFight(pk=pk, tournament=tournament, aka_team_id=aka, shiro_team_id=shiro,
+                                                 location_id=location, scheduled_start=scheduled_start))
+                continue
+            end = 0
+            if scheduled_start is not None:
+                end = max(0, (scheduled_start - start).total_seconds() / 60 + duration)
+            if location in courts:
+                courts[location] = max(courts[location], end)
+            for team in (aka, shiro):
+                team_free[team] = max(team_free.get(team, 0), end)
+
+        planned = schedule(bouts, courts, rest, team_free)
+        changed = []
+        for team_fight in team_fights:
+            if planned_only and team_fight.pk not in planned:
+                continue
+            location, minutes = planned.get(team_fight.pk, (None, None))
+            scheduled_start = start + datetime.timedelta(minutes=minutes) if location is not None else None
+            if (team_fight.location_id, team_fight.scheduled_start) != (location, scheduled_start):
+                team_fight.location_id = location
+                team_fight.scheduled_start = scheduled_start
+                changed.append(team_fight)
+        tfm.TeamFight.objects.bulk_update(changed, ['location', 'scheduled_start'])
+        if changed:
+            tcm.notify_changed(tournament.id, tfm.TeamFight, changed, tcm.UPDATED)
+    return sorted([team_fight for team_fight in team_fights if team_fight.location_id is not None],
+                  key=lambda team_fight: (team_fight.scheduled_start, team_fight.location_id))
+
+
+def replan(tournament_id):
+    """
+    Re-plans the planned prepared team fights after a result freed a location and teams. Planning starts at
+    the earliest of their planned starts, or now once that has passed; no team fight moves before its own
+    planned start, so only running late pushes the remaining ones back.
+    """
+    tournament = tm.Tournament.objects.get(pk=tournament_id)
+    first = tfm.TeamFight.objects.filter(tournament=tournament, status=PREPARED, scheduled_start__isnull=False) \
+        .aggregate(first=Min('scheduled_start'))['first']
+    if first is None or not tournament.locations.exists():
+        return []
+    return plan(tournament, max(timezone.now(), first), planned_only=True)
+
+
+@receiver(post_save, sender=tfm.TeamFight)
+def replan_after_result(sender, instance, created, raw=False, **kwargs):
+    finished = not raw and not created and instance.has_status_changed() and instance.status == FINISHED
+    instance.remember_status()
+    if finished and instance.location_id is not None:
+        tournament_id = instance.tournament_id
+        transaction.on_commit(lambda: replan(tournament_id))
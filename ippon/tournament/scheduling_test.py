@@ -0,0 +1,188 @@
+import datetime
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+import ippon.cup_phase.generation as cpg
+import ippon.management.commands.benchmark as bm
+import ippon.models.team_fight as tfm
+import ippon.models.tournament as tm
+import ippon.tournament.scheduling as tsc
+
+
+class ScheduleTests(SimpleTestCase):
+    def test_bouts_are_spread_over_free_courts(self):
+        bouts = [tsc.Bout(1, (1, 2), 10, []), tsc.Bout(2, (3, 4), 10, []), tsc.Bout(3, (5, 6), 10, [])]
+        planned = tsc.schedule(bouts, {'a': 0, 'b': 0})
+        self.assertEqual([0, 0, 10], sorted(start for _, start in planned.values()))
+
+    def test_team_rests_between_its_bouts(self):
+        bouts = [tsc.Bout(1, (1, 2), 10, []), tsc.Bout(2, (1, 3), 10, [])]
+        planned = tsc.schedule(bouts, {'a': 0, 'b': 0}, rest=5)
+        self.assertEqual(15, planned[2][1])
+
+    def test_court_takes_bout_of_rested_teams_first(self):
+        bouts = [tsc.Bout(1, (1, 2), 10, []), tsc.Bout(2, (1, 3), 10, []), tsc.Bout(3, (4, 5), 10, [])]
+        planned = tsc.schedule(bouts, {'a': 0}, rest=5)
+        self.assertEqual([1, 3, 2], sorted(planned, key=lambda bout_id: planned[bout_id][1]))
+        self.assertEqual(20, planned[2][1])
+
+    def test_bout_waits_for_previous_bouts(self):
+        bouts = [tsc.Bout(3, (1, 3), 10, [1, 2]), tsc.Bout(1, (1, 2), 10, []), tsc.Bout(2, (3, 4), 20, [])]
+        planned = tsc.schedule(bouts, {'a': 0, 'b': 0, 'c': 0})
+        self.assertEqual(20, planned[3][1])
+
+    def test_critical_path_goes_first(self):
+        bouts = [tsc.Bout(1, (1, 2), 10, []), tsc.Bout(2, (3, 4), 10, []), tsc.Bout(3, (5, 6), 10, [2])]
+        planned = tsc.schedule(bouts, {'a': 0, 'b': 0})
+        self.assertEqual((0, 10), (planned[2][1], planned[3][1]))
+
+    def test_running_bouts_keep_courts_and_teams_busy(self):
+        planned = tsc.schedule([tsc.Bout(1, (1, 2), 10, [])], {'a': 7, 'b': 0}, rest=0, team_free={1: 4})
+        self.assertEqual(('b', 4), planned[1])
+
+    def test_bout_does_not_start_before_its_earliest_start(self):
+        planned = tsc.schedule([tsc.Bout(1, (1, 2), 10, [], 30)], {'a': 0})
+        self.assertEqual(('a', 30), planned[1])
+
+    def test_bout_stays_on_its_court_unless_it_starts_earlier_elsewhere(self):
+        bouts = [tsc.Bout(1, (1, 2), 10, [], 0, 'b'), tsc.Bout(2, (3, 4), 10, [], 0, 'c')]
+        planned = tsc.schedule(bouts, {'a': 0, 'b': 0, 'c': 20})
+        self.assertEqual({1: ('b', 0), 2: ('a', 0)}, planned)
+
+    def test_bout_waiting_for_bout_which_is_not_given_is_left_out(self):
+        planned = tsc.schedule([tsc.Bout(1, (1, 2), 10, [7]), tsc.Bout(2, (3, 4), 10, [])], {'a': 0})
+        self.assertEqual({2: ('a', 0)}, planned)
+
+    def test_benchmark_case_schedules_every_bout(self):
+        run = bm.scheduling_case(500)
+        self.assertEqual(500, len(run()))
+
+
+class PlanTests(TestCase):
+    def setUp(self):
+        self.tournament = tm.Tournament.objects.create(
+            name='T1', webpage='http://w1.co', description='d1', city='c1',
+            date=datetime.date(year=2021, month=1, day=1), address='a1', team_size=3, group_match_length=3,
+            ko_match_length=4, final_match_length=5, finals_depth=0, age_constraint=5, age_constraint_value=20,
+            rank_constraint=5, rank_constraint_value=7, sex_constraint=1)
+        self.start = timezone.make_aware(datetime.datetime(2021, 1, 1, 9))
+        self.court1 = self.tournament.locations.create(name='court 1')
+        self.court2 = self.tournament.locations.create(name='court 2')
+        self.teams = [self.tournament.teams.create(name='t{}'.format(i)) for i in range(4)]
+
+    def minutes(self, team_fight):
+        team_fight.refresh_from_db()
+        return (team_fight.scheduled_start - self.start).total_seconds() / 60
+
+    def test_prepared_team_fights_get_locations_and_start_times(self):
+        t1, t2, t3, t4 = self.teams
+        tf1 = self.tournament.team_fights.create(aka_team=t1, shiro_team=t2)
+        tf2 = self.tournament.team_fights.create(aka_team=t3, shiro_team=t4)
+        tf3 = self.tournament.team_fights.create(aka_team=t1, shiro_team=t3)
+        planned = tsc.plan(self.tournament, self.start)
+        self.assertEqual([tf1.id, tf2.id, tf3.id], [team_fight.id for team_fight in planned])
+        self.assertEqual([0, 0, 9 + 5], [self.minutes(tf) for tf in [tf1, tf2, tf3]])
+        self.assertEqual({self.court1.id, self.court2.id}, {tf1.location_id, tf2.location_id})
+
+    def test_cup_fights_take_ko_and_final_lengths_and_wait_for_previous_fights(self):
+        cpg.generate(self.tournament.cup_phases.create(fight_length=3, name='cp', final_fight_length=4),
+                     cpg.seeded_slots([team.id for team in self.teams]))
+        semi_finals = list(tfm.TeamFight.objects.filter(cup_fight__next_fight__isnull=False))
+        for team_fight in semi_finals:
+            team_fight.winner = 1
+            team_fight.save()
+        tsc.plan(self.tournament, self.start)
+        final = tfm.TeamFight.objects.get(cup_fight__next_fight__isnull=True)
+        self.assertEqual([0, 0], [self.minutes(team_fight) for team_fight in semi_finals])
+        self.assertEqual(4 * 3 + 5, self.minutes(final))
+
+    def finish(self, team_fight):
+        team_fight.refresh_from_db()
+        team_fight.status = tsc.FINISHED
+        with self.captureOnCommitCallbacks(execute=True):
+            team_fight.save()
+
+    def test_result_ahead_of_plan_keeps_planned_starts(self):
+        t1, t2, t3, t4 = self.teams
+        self.court2.delete()
+        tf1 = self.tournament.team_fights.create(aka_team=t1, shiro_team=t2)
+        tf2 = self.tournament.team_fights.create(aka_team=t3, shiro_team=t4)
+        self.start = timezone.now() + datetime.timedelta(hours=1)
+        tsc.plan(self.tournament, self.start)
+        self.finish(tf1)
+        self.assertEqual(9, self.minutes(tf2))
+
+    def test_result_behind_plan_moves_remaining_team_fights_to_now(self):
+        t1, t2, t3, t4 = self.teams
+        self.court2.delete()
+        tf1 = self.tournament.team_fights.create(aka_team=t1, shiro_team=t2)
+        tf2 = self.tournament.team_fights.create(aka_team=t3, shiro_team=t4)
+        tf3 = self.tournament.team_fights.create(aka_team=t1, shiro_team=t3)
+        self.start = timezone.now() - datetime.timedelta(hours=1)
+        tsc.plan(self.tournament, self.start)
+        before = timezone.now()
+        self.finish(tf1)
+        tf2.refresh_from_db()
+        tf3.refresh_from_db()
+        self.assertLessEqual(before, tf2.scheduled_start)
+        self.assertLessEqual(tf2.scheduled_start, timezone.now())
+        self.assertEqual(datetime.timedelta(minutes=9 + 5), tf3.scheduled_start - tf2.scheduled_start)
+
+    def test_result_keeps_later_team_fight_on_other_location_in_place(self):
+        t1, t2, t3, t4 = self.teams
+        tf1 = self.tournament.team_fights.create(aka_team=t1, shiro_team=t2)
+        tf2 = self.tournament.team_fights.create(aka_team=t3, shiro_team=t4)
+        tf3 = self.tournament.team_fights.create(aka_team=t1, shiro_team=t3)
+        self.start = timezone.now() + datetime.timedelta(hours=1)
+        tsc.plan(self.tournament, self.start)
+        tfm.TeamFight.objects.filter(pk=tf2.pk).update(location=self.court2,
+                                                      scheduled_start=self.start + datetime.timedelta(hours=3))
+        tfm.TeamFight.objects.filter(pk=tf3.pk).update(location=self.court1,
+                                                      scheduled_start=self.start + datetime.timedelta(minutes=30))
+        self.finish(tf1)
+        self.assertEqual((180, self.court2.id), (self.minutes(tf2), tf2.location_id))
+        self.assertEqual((30, self.court1.id), (self.minutes(tf3), tf3.location_id))
+
+    def test_result_keeps_plan_of_team_fight_waiting_for_unplanned_one(self):
+        cpg.generate(self.tournament.cup_phases.create(fight_length=3, name='cp', final_fight_length=4),
+                     cpg.seeded_slots([team.id for team in self.teams]))
+        semi_finals = list(tfm.TeamFight.objects.filter(cup_fight__next_fight__isnull=False).order_by('pk'))
+        for team_fight in semi_finals:
+            team_fight.winner = 1
+            team_fight.save()
+        self.start = timezone.now() - datetime.timedelta(hours=1)
+        tsc.plan(self.tournament, self.start)
+        tfm.TeamFight.objects.filter(pk=semi_finals[1].pk).update(location=None, scheduled_start=None)
+        self.finish(semi_finals[0])
+        self.assertEqual(4 * 3 + 5, self.minutes(tfm.TeamFight.objects.get(cup_fight__next_fight__isnull=True)))
+
+    def test_result_leaves_unplanned_team_fights_alone(self):
+        t1, t2, t3, t4 = self.teams
+        tf1 = self.tournament.team_fights.create(aka_team=t1, shiro_team=t2)
+        tsc.plan(self.tournament, timezone.now() + datetime.timedelta(hours=1))
+        tf2 = self.tournament.team_fights.create(aka_team=t3, shiro_team=t4)
+        self.finish(tf1)
+        tf2.refresh_from_db()
+        self.assertEqual((None, None), (tf2.location_id, tf2.scheduled_start))
+
+    def test_started_team_fight_keeps_its_location_busy(self):
+        t1, t2, t3, t4 = self.teams
+        self.court2.delete()
+        tfm.TeamFight.objects.create(tournament=self.tournament, aka_team=t1, shiro_team=t2, status=tsc.STARTED,
+                                     location=self.court1, scheduled_start=self.start)
+        tf2 = self.tournament.team_fights.create(aka_team=t3, shiro_team=t4)
+        tsc.plan(self.tournament, self.start)
+        self.assertEqual(9, self.minutes(tf2))
+
+    def test_tournament_without_locations_raises(self):
+        self.tournament.locations.all().delete()
+        with self.assertRaises(ValueError):
+            tsc.plan(self.tournament, self.start)
+
+    def test_unchanged_plan_writes_nothing(self):
+        t1, t2, _, _ = self.teams
+        self.tournament.team_fights.create(aka_team=t1, shiro_team=t2)
+        tsc.plan(self.tournament, self.start)
+        with self.assertNumQueries(5):
+            tsc.plan(self.tournament, self.start)
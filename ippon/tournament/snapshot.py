@@ -0,0 +1,128 @@
+from django.db.models import Prefetch
+
+import ippon.cup_fight.serializers as cfs
+import ippon.cup_phase.serializers as cps
+import ippon.fight.serializers as fs
+import ippon.group.serializers as gs
+import ippon.group_phase.serializers as gps
+import ippon.models.cup_fight as cfm
+import ippon.models.cup_phase as cpm
+import ippon.models.fight as fm
+import ippon.models.group as grm
+import ippon.models.group_fight as gfm
+import ippon.models.group_phase as gpm
+import ippon.models.team as tem
+import ippon.models.tournament as tm
+import ippon.player.serializers as pls
+import ippon.point.serializers as pts
+import ippon.tournament.seralizers as ts
+
+PHASES = 1
+GROUPS = 2
+TEAM_FIGHTS = 3
+FIGHTS = 4
+POINTS = 5
+MAX_DEPTH = POINTS
+
+
+def snapshot_queryset(depth=MAX_DEPTH):
+    """
+    Tournaments with everything needed by build_snapshot prefetched, so that building a snapshot
+    takes a bounded number of queries regardless of the tournament size. Everything is ordered by id
+    so that the same tournament always gives the same snapshot.
+    """
+    lookups = [Prefetch('teams', queryset=tem.Team.objects.order_by('id').prefetch_related(
+        Prefetch('team_members', queryset=tem.TeamMember.objects.select_related('player').order_by('id'))))]
+    if depth >= PHASES:
+        lookups += [Prefetch('group_phases', queryset=gpm.GroupPhase.objects.order_by('id')),
+                    Prefetch('cup_phases', queryset=cpm.CupPhase.objects.order_by('id'))]
+    if depth >= GROUPS:
+        lookups += [Prefetch('group_phases__groups', queryset=grm.Group.objects.order_by('id')),
+                    Prefetch('group_phases__groups__group_members', queryset=grm.GroupMember.objects.order_by('id'))]
+        lookups += [Prefetch('cup_phases__cup_fights',
+                             queryset=cfm.CupFight.objects.select_related('team_fight').order_by('id'))]
+    if depth >= TEAM_FIGHTS:
+        lookups += [Prefetch('group_phases__groups__group_fights',
+                             queryset=gfm.GroupFight.objects.select_related('team_fight').order_by('id'))]
+    if depth >= FIGHTS:
+        lookups += [fights_prefetch('group_phases__groups__group_fights__team_fight__fights', depth),
+                    fights_prefetch('cup_phases__cup_fights__team_fight__fights', depth)]
+    return tm.Tournament.objects.prefetch_related(*lookups)
+
+
+def fights_prefetch(lookup, depth):
+    fights = fm.Fight.objects.order_by('ordering_number', 'id')
+    if depth >= POINTS:
+        fights = fights.prefetch_related('points')
+    return Prefetch(lookup, queryset=fights)
+
+
+def build_snapshot(tournament, depth=MAX_DEPTH):
+    data = ts.TournamentSerializer(tournament).data
+    data['teams'] = [team_data(team) for team in tournament.teams.all()]
+    if depth >= PHASES:
+        data['group_phases'] = [group_phase_data(group_phase, depth) for group_phase in tournament.group_phases.all()]
+        data['cup_phases'] = [cup_phase_data(cup_phase, depth) for cup_phase in tournament.cup_phases.all()]
+    return data
+
+
+def team_data(team):
+    return {
+        'id': team.id,
+        'name': team.name,
+        'members': [pls.ShallowPlayerSerializer(member.player).data for member in team.team_members.all()]
+    }
+
+
+def group_phase_data(group_phase, depth):
+    data = gps.GroupPhaseSerializer(group_phase).data
+    if depth >= GROUPS:
+        data['groups'] = [group_data(group, depth) for group in group_phase.groups.all()]
+    return data
+
+
+def group_data(group, depth):
+    data = gs.GroupSerializer(group).data
+    data['members'] = [member.team_id for member in group.group_members.all()]
+    if depth >= TEAM_FIGHTS:
+        data['group_fights'] = [{'id': group_fight.id, 'team_fight': team_fight_data(group_fight.team_fight, depth)}
+                                for group_fight in group.group_fights.all()]
+    return data
+
+
+def cup_phase_data(cup_phase, depth):
+    data = cps.CupPhaseSerializer(cup_phase).data
+    if depth >= GROUPS:
+        data['cup_fights'] = [cup_fight_data(cup_fight, depth) for cup_fight in cup_phase.cup_fights.all()]
+    return data
+
+
+def cup_fight_data(cup_fight, depth):
+    data = cfs.CupFightSerializer(cup_fight).data
+    if depth >= TEAM_FIGHTS and cup_fight.team_fight is not None:
+        data['team_fight'] = team_fight_data(cup_fight.team_fight, depth)
+    return data
+
+
+def team_fight_data(team_fight, depth):
+    data = {
+        'id': team_fight.id,
+        'aka_team': team_fight.aka_team_id,
+        'shiro_team': team_fight.shiro_team_id,
+        'tournament': team_fight.tournament_id,
+        'winner': team_fight.winner,
+        'status': team_fight.status,
+        'aka_score': team_fight.aka_wins,
+        'shiro_score': team_fight.shiro_wins
+    }
+    if depth >= FIGHTS:
+        data['fights'] = [fight_data(fight, depth) for fight in team_fight.fights.all()]
+    return data
+
+
+def fight_data(fight, depth):
+    data = fs.FightSerializer(fight).data
+    data['ordering_number'] = fight.ordering_number
+    if depth >= POINTS:
+        data['points'] = pts.PointSerializer(fight.points.all(), many=True).data
+    return data
@@ -0,0 +1,83 @@
+import datetime
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+import ippon.models.club as cl
+import ippon.models.player as plm
+import ippon.models.tournament as tm
+import ippon.utils.values as iuv
+
+
+class TournamentSnapshotViewTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.club = cl.Club.objects.create(name='cn1', webpage='http://cw1.co', description='cd1', city='cc1')
+        self.to1 = tm.Tournament.objects.create(name='T1', webpage='http://w1.co', description='d1', city='c1',
+                                                date=datetime.date(year=2021, month=1, day=1), address='a1',
+                                                team_size=1, group_match_length=3, ko_match_length=3,
+                                                final_match_length=3, finals_depth=0, age_constraint=5,
+                                                age_constraint_value=20, rank_constraint=5, rank_constraint_value=7,
+                                                sex_constraint=1)
+        self.group_phase = self.to1.group_phases.create(name='gp', fight_length=3)
+        self.cup_phase = self.to1.cup_phases.create(name='cp', fight_length=3, final_fight_length=4)
+        self.group = self.group_phase.groups.create(name='G1')
+        self.add_teams(2)
+
+    def add_teams(self, count):
+        teams = []
+        for i in range(count):
+            team = self.to1.teams.create(name='t{}'.format(i))
+            player = plm.Player.objects.create(name='pn{}'.format(i), surname='ps{}'.format(i), rank=7,
+                                               birthday=datetime.date(year=2001, month=1, day=1), sex=1,
+                                               club_id=self.club)
+            team.team_members.create(player=player)
+            self.group.group_members.create(team=team)
+            teams.append((team, player))
+        for (aka_team, aka), (shiro_team, shiro) in zip(teams[::2], teams[1::2]):
+            group_team_fight = self.to1.team_fights.create(aka_team=aka_team, shiro_team=shiro_team)
+            self.group.group_fights.create(team_fight=group_team_fight)
+            fight = group_team_fight.fights.create(aka=aka, shiro=shiro, winner=1)
+            fight.points.create(player=aka, type=0)
+            cup_team_fight = self.to1.team_fights.create(aka_team=shiro_team, shiro_team=aka_team)
+            self.cup_phase.cup_fights.create(team_fight=cup_team_fight)
+            cup_team_fight.fights.create(aka=shiro, shiro=aka, winner=2)
+        return teams
+
+    def get_snapshot(self, **params):
+        return self.client.get(reverse('tournament-snapshot', kwargs={'pk': self.to1.id}), params)
+
+    def test_snapshot_returns_whole_tournament_tree(self):
+        response = self.get_snapshot()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual('T1', response.data['name'])
+        self.assertEqual(['pn0'], [member['name'] for member in response.data['teams'][0]['members']])
+        group = response.data['group_phases'][0]['groups'][0]
+        self.assertEqual(2, len(group['members']))
+        team_fight = group['group_fights'][0]['team_fight']
+        self.assertEqual((1, 0), (team_fight['aka_score'], team_fight['shiro_score']))
+        self.assertEqual([0], [point['type'] for point in team_fight['fights'][0]['points']])
+        cup_team_fight = response.data['cup_phases'][0]['cup_fights'][0]['team_fight']
+        self.assertEqual((0, 1), (cup_team_fight['aka_score'], cup_team_fight['shiro_score']))
+
+    def test_snapshot_with_depth_stops_at_requested_level(self):
+        response = self.get_snapshot(depth=1)
+        self.assertEqual(['gp'], [group_phase['name'] for group_phase in response.data['group_phases']])
+        self.assertNotIn('groups', response.data['group_phases'][0])
+        self.assertNotIn('cup_fights', response.data['cup_phases'][0])
+
+    def test_snapshot_takes_the_same_number_of_queries_regardless_of_tournament_size(self):
+        with self.assertNumQueries(13):
+            self.get_snapshot()
+        self.add_teams(20)
+        with self.assertNumQueries(13):
+            self.get_snapshot()
+
+    def test_snapshot_with_invalid_depth_returns_bad_request(self):
+        response = self.get_snapshot(depth='deep')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_snapshot_of_not_existing_tournament_returns_not_found(self):
+        response = self.client.get(reverse('tournament-snapshot', kwargs={'pk': iuv.BAD_PK}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
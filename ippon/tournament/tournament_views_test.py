@@ -2,6 +2,7 @@ import datetime
 import json
 
 from django.contrib.auth.models import User
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
@@ -142,6 +143,37 @@ class TournamentViewSetAuthorizedTests(TournamentViewTest):
         )
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_post_schedule_assigns_team_fights_to_locations(self):
+        location = self.to1.locations.create(name='court 1')
+        t1 = self.to1.teams.create(name='t1')
+        t2 = self.to1.teams.create(name='t2')
+        team_fight = self.to1.team_fights.create(aka_team=t1, shiro_team=t2)
+        response = self.client.post(reverse('tournament-schedule', kwargs={'pk': self.to1.pk}),
+                                    {'start': '2021-01-01T09:00:00Z'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([{'id': team_fight.id, 'aka_team': t1.id, 'shiro_team': t2.id, 'status': 0,
+                           'location': location.id, 'scheduled_start': '2021-01-01T09:00:00Z'}], response.data)
+
+    def test_post_schedule_with_invalid_start_returns_bad_request(self):
+        self.to1.locations.create(name='court 1')
+        response = self.client.post(reverse('tournament-schedule', kwargs={'pk': self.to1.pk}),
+                                    {'start': 'morning'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_post_schedule_without_locations_returns_bad_request(self):
+        response = self.client.post(reverse('tournament-schedule', kwargs={'pk': self.to1.pk}))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_changes_includes_participations_and_admins(self):
+        player = plm.Player.objects.create(name='pn1', surname='ps1', rank=7, sex=1, club_id=self.club,
+                                           birthday=datetime.date(year=2001, month=1, day=1))
+        participation = self.to1.participations.create(player=player)
+        response = self.client.get(reverse('tournament-changes', kwargs={'pk': self.to1.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        admin = tm.TournamentAdmin.objects.get(tournament=self.to1, user=self.user)
+        self.assertEqual([('tournamentadmin', admin.id), ('tournamentparticipation', participation.id)],
+                         [(change['model'], change['id']) for change in response.data['changes']])
+
     def test_delete_existing_tournament_deletes_it(self):
         response = self.client.delete(reverse('tournament-detail', kwargs={'pk': self.to1.pk}))
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
@@ -172,6 +204,10 @@ class TournamentViewSetUnauthorizedTests(TournamentViewTest):
         )
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_post_schedule_gets_forbidden(self):
+        response = self.client.post(reverse('tournament-schedule', kwargs={'pk': self.to1.pk}))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
     def test_delete_gets_forbidden(self):
         response = self.client.delete(reverse('tournament-detail', kwargs={'pk': self.to1.id}))
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -216,6 +252,27 @@ class TournamentViewSetUnauthenticatedTests(TournamentViewTest):
         response = self.client.delete(reverse('tournament-detail', kwargs={'pk': self.to1.id}))
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
+    def test_get_changes_returns_changes_after_since(self):
+        self.to1.teams.create(name='t1')
+        since = tm.Tournament.objects.get(pk=self.to1.pk).version
+        team = self.to1.teams.create(name='t2')
+        player = plm.Player.objects.create(name='pn1', surname='ps1', rank=7, sex=1, club_id=self.club,
+                                           birthday=datetime.date(year=2001, month=1, day=1))
+        self.to1.participations.create(player=player)
+        response = self.client.get(reverse('tournament-changes', kwargs={'pk': self.to1.pk}), {'since': since})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual({'since': since, 'last': since + 1, 'has_more': False, 'changes': [
+            {'sequence': since + 1, 'model': 'team', 'id': team.id, 'action': 'created',
+             'data': {'id': team.id, 'name': 't2', 'tournament': self.to1.id}}]}, response.data)
+
+    def test_get_changes_with_invalid_since_returns_bad_request(self):
+        response = self.client.get(reverse('tournament-changes', kwargs={'pk': self.to1.pk}), {'since': 'x'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_changes_for_not_existing_tournament_returns_404(self):
+        response = self.client.get(reverse('tournament-changes', kwargs={'pk': iuv.BAD_PK}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
 
 class TournamentAdminTest(TournamentViewTest):
     def setUp(self):
@@ -307,6 +364,11 @@ class AuthorizedTournamentAdminTest(TournamentAdminTest):
         response = self.client.get(reverse('tournament-non-admins', kwargs={'pk': iuv.BAD_PK}))
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_get_non_admins_with_search_returns_only_matching_users(self):
+        response = self.client.get(reverse('tournament-non-admins', kwargs={'pk': self.to1.pk}), {'search': 'ER4'})
+        self.assertEqual([{'id': self.user4.id, 'username': 'user4'}], response.data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
 
 class TournamentParticipantsTest(TournamentViewTest):
     def setUp(self):
@@ -396,6 +458,33 @@ class AuthorizedParticipantsTest(TournamentParticipantsTest):
         response = self.client.get(reverse('tournament-non-participants', kwargs={'pk': iuv.BAD_PK}))
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
+    def test_get_non_participants_with_search_returns_only_matching_players(self):
+        response = self.client.get(reverse('tournament-non-participants', kwargs={'pk': self.to1.pk}),
+                                   {'search': 'PS4'})
+        self.assertEqual([self.p4.id], [player['id'] for player in response.data])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_non_participants_with_prefix_search_does_not_match_inside_of_words(self):
+        response = self.client.get(reverse('tournament-non-participants', kwargs={'pk': self.to1.pk}),
+                                   {'search': 's4', 'match': 'prefix'})
+        self.assertEqual([], response.data)
+
+    def test_get_non_participants_requires_every_search_term_to_match(self):
+        response = self.client.get(reverse('tournament-non-participants', kwargs={'pk': self.to1.pk}),
+                                   {'search': 'pn3 ps4'})
+        self.assertEqual([], response.data)
+
+    @override_settings(PICKER_RESULT_CAP=1)
+    def test_get_non_participants_returns_at_most_result_cap_players(self):
+        response = self.client.get(reverse('tournament-non-participants', kwargs={'pk': self.to1.pk}))
+        self.assertEqual([self.p3.id], [player['id'] for player in response.data])
+
+    def test_get_non_participants_with_page_size_returns_page(self):
+        response = self.client.get(reverse('tournament-non-participants', kwargs={'pk': self.to1.pk}),
+                                   {'search': 'pn', 'page_size': 1})
+        self.assertEqual([self.p3.id], [player['id'] for player in response.data['results']])
+        self.assertIsNotNone(response.data['next'])
+
     def test_get_participations_for_valid_tournament_returns_list_of_participations(self):
         expected = [
             {
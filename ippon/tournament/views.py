@@ -1,7 +1,12 @@
+from django.conf import settings
 from django.contrib.auth.models import User
-from rest_framework import viewsets, permissions
-from rest_framework.decorators import action, api_view
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.generics import get_object_or_404
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
 import ippon.cup_phase.serializers as cps
@@ -13,17 +18,31 @@ import ippon.models.team as tem
 import ippon.models.tournament as tm
 import ippon.player.serializers as pls
 import ippon.team.serializers as tes
+import ippon.team_fight.serializers as tfs
 import ippon.tournament.authorizations as ta
+import ippon.tournament.bulk as tb
+import ippon.tournament.changes as tch
+import ippon.tournament.live as tl
 import ippon.tournament.permissions as tp
+import ippon.tournament.scheduling as tsc
 import ippon.tournament.seralizers as ts
+import ippon.tournament.snapshot as tsn
 import ippon.user.serailzers as us
+import ippon.utils.cache as iuc
+import ippon.utils.etag as iue
+import ippon.utils.pagination as iupg
+import ippon.utils.permissions as iup
+import ippon.utils.search as ius
 
 
-class TournamentParticipationViewSet(viewsets.ModelViewSet):
-    queryset = tm.TournamentParticipation.objects.all()
+class TournamentParticipationViewSet(iue.TournamentVersionETagMixin, viewsets.ModelViewSet):
+    queryset = tm.TournamentParticipation.objects.select_related('player', 'tournament').with_eligibility()
     serializer_class = ts.TournamentParticipationSerializer
     permission_classes = (permissions.IsAuthenticated,
                           tp.IsTournamentAdminParticipantCreation)
+    tournament_lookup = 'participations'
+    # Participations carry player data, which does not bump the version.
+    etag_actions = ()
 
 
 class TournamentAdminViewSet(viewsets.ModelViewSet):
@@ -33,37 +52,131 @@ class TournamentAdminViewSet(viewsets.ModelViewSet):
                           tp.IsTournamentOwnerAdminCreation)
 
 
-class TournamentViewSet(viewsets.ModelViewSet):
+class TournamentViewSet(iue.TournamentVersionETagMixin, viewsets.ModelViewSet):
     queryset = tm.Tournament.objects.all()
     serializer_class = ts.TournamentSerializer
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,
                           tp.IsTournamentAdminOrReadOnlyTournament)
+    tournament_lookup = 'pk'
+    # The change feed depends on whether the caller is an admin, which the ETag does not cover.
+    etag_actions = ('retrieve', 'teams', 'group_phases', 'cup_phases')
 
     @action(methods=['get'], detail=True, permission_classes=(
             permissions.IsAuthenticated,
             tp.IsTournamentOwner))
     def participations(self, request, pk=None):
         get_object_or_404(self.queryset, pk=pk)
-        serializer = ts.TournamentParticipationSerializer(tm.TournamentParticipation.objects.filter(tournament=pk),
-                                                          many=True)
-        return Response(serializer.data)
+        participations = tm.TournamentParticipation.objects.filter(tournament=pk) \
+            .select_related('player', 'tournament').with_eligibility()
+        return iupg.paginated_response(self, participations, ts.TournamentParticipationSerializer)
+
+    @action(
+        methods=['post', 'patch'],
+        detail=True,
+        url_name='bulk_participations',
+        url_path='participations/bulk',
+        permission_classes=[
+            permissions.IsAuthenticated,
+            tp.IsTournamentAdmin
+        ]
+    )
+    def bulk_participations(self, request, pk=None):
+        return {
+            'post': self.import_participations,
+            'patch': self.update_participations
+        }[request.method.lower()](request, pk)
+
+    def import_participations(self, request, pk=None):
+        tournament = get_object_or_404(self.queryset, pk=pk)
+        if 'file' in request.FILES:
+            try:
+                results = tb.import_players_csv(tournament, request.user, request.FILES['file'])
+            except ValueError as e:
+                return Response(status=status.HTTP_400_BAD_REQUEST, data={'error': str(e)})
+        elif isinstance(request.data.get('player_ids'), list):
+            results = tb.register_players(tournament, request.data['player_ids'])
+        else:
+            return Response(status=status.HTTP_400_BAD_REQUEST,
+                            data={'error': 'player_ids list or csv file is required'})
+        return Response(results)
+
+    def update_participations(self, request, pk=None):
+        tournament = get_object_or_404(self.queryset, pk=pk)
+        if not isinstance(request.data, list):
+            return Response(status=status.HTTP_400_BAD_REQUEST,
+                            data={'error': 'list of participation changes is required'})
+        return Response(tb.update_participations(tournament, request.data))
+
+    @action(
+        methods=['post'],
+        detail=True,
+        url_name='schedule',
+        url_path='schedule',
+        permission_classes=[
+            permissions.IsAuthenticated,
+            tp.IsTournamentAdmin
+        ]
+    )
+    def schedule(self, request, pk=None):
+        tournament = get_object_or_404(self.queryset, pk=pk)
+        try:
+            start = request.data.get('start')
+            if start is not None:
+                start = parse_datetime(start)
+                if start is None:
+                    raise ValueError('start is not a valid date and time')
+                if timezone.is_naive(start):
+                    start = timezone.make_aware(start)
+            team_fights = tsc.plan(tournament, start)
+        except (TypeError, ValueError) as e:
+            return Response(status=status.HTTP_400_BAD_REQUEST, data={'error': str(e)})
+        return Response(tfs.ScheduledTeamFightSerializer(team_fights, many=True).data)
+
+    @action(
+        methods=['get'],
+        detail=True,
+        url_name='live',
+        renderer_classes=[tl.EventStreamRenderer, JSONRenderer])
+    def live(self, request, pk=None):
+        tournament = get_object_or_404(self.queryset, pk=pk)
+        subscription = tl.get_broker().subscribe(tournament.id)
+        response = StreamingHttpResponse(tl.stream(subscription, settings.LIVE_HEARTBEAT_SECONDS,
+                                                   settings.LIVE_MAX_SECONDS),
+                                         content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    @action(
+        methods=['get'],
+        detail=True,
+        url_name='changes')
+    def changes(self, request, pk=None):
+        tournament = get_object_or_404(self.queryset, pk=pk)
+        try:
+            since = tch.parse_since(request.query_params.get('since'))
+        except ValueError as e:
+            return Response(status=status.HTTP_400_BAD_REQUEST, data={'error': str(e)})
+        include_private = request.user.is_authenticated and iup.is_user_admin_of_the_tournament(request, tournament)
+        return Response(tch.changes_since(tournament.id, since, settings.CHANGES_PAGE_SIZE, include_private))
 
     @action(methods=['get'], detail=True, permission_classes=(
             permissions.IsAuthenticated,
             tp.IsTournamentOwner))
     def non_participants(self, request, pk=None):
         get_object_or_404(self.queryset, pk=pk)
-        serializer = pls.PlayerSerializer(plm.Player.objects.exclude(participations__tournament=pk), many=True)
-        return Response(serializer.data)
+        return ius.picker_response(self, plm.Player.objects.exclude(participations__tournament=pk),
+                                   pls.PlayerSerializer, ['name', 'surname'])
 
     @action(methods=['get'], detail=True, permission_classes=(
             permissions.IsAuthenticated,
             tp.IsTournamentOwner))
     def participants(self, request, pk=None):
         get_object_or_404(self.queryset, pk=pk)
-        serializer = pls.PlayerSerializer(
-            plm.Player.objects.filter(participations__tournament=pk, participations__is_qualified=True), many=True)
-        return Response(serializer.data)
+        return iupg.paginated_response(
+            self,
+            plm.Player.objects.filter(participations__tournament=pk, participations__is_qualified=True),
+            pls.PlayerSerializer)
 
     def perform_create(self, serializer):
         tournament = serializer.save()
@@ -75,41 +188,54 @@ class TournamentViewSet(viewsets.ModelViewSet):
             tp.IsTournamentOwner))
     def admins(self, request, pk=None):
         get_object_or_404(self.queryset, pk=pk)
-        serializer = ts.TournamentAdminSerializer(tm.TournamentAdmin.objects.filter(tournament=pk), many=True)
-        return Response(serializer.data)
+        return iupg.paginated_response(self, tm.TournamentAdmin.objects.filter(tournament=pk),
+                                       ts.TournamentAdminSerializer)
 
     @action(methods=['get'], detail=True, permission_classes=(
             permissions.IsAuthenticated,
             tp.IsTournamentOwner))
     def non_admins(self, request, pk=None):
         get_object_or_404(self.queryset, pk=pk)
-        serializer = us.MinimalUserSerializer(User.objects.exclude(tournaments__tournament=pk), many=True)
-        return Response(serializer.data)
+        return ius.picker_response(self, User.objects.exclude(tournaments__tournament=pk),
+                                   us.MinimalUserSerializer, ['username'])
 
     @action(methods=['get'], detail=True)
+    @iuc.cached_response
     def teams(self, request, pk=None):
         get_object_or_404(self.queryset, pk=pk)
-        serializer = tes.TeamSerializer(
-            tem.Team.objects.filter(tournament=pk), many=True)
-        return Response(serializer.data)
+        return iupg.paginated_response(self, tem.Team.objects.filter(tournament=pk).with_members(),
+                                       tes.TeamSerializer)
 
     @action(
         methods=['get'],
         detail=True,
         url_name='group_phases')
+    @iuc.cached_response
     def group_phases(self, request, pk=None):
         get_object_or_404(self.queryset, pk=pk)
-        serializer = gps.GroupPhaseSerializer(gpm.GroupPhase.objects.filter(tournament=pk), many=True)
-        return Response(serializer.data)
+        return iupg.paginated_response(self, gpm.GroupPhase.objects.filter(tournament=pk), gps.GroupPhaseSerializer)
 
     @action(
         methods=['get'],
         detail=True,
         url_name='cup_phases')
+    @iuc.cached_response
     def cup_phases(self, request, pk=None):
         get_object_or_404(self.queryset, pk=pk)
-        serializer = cps.CupPhaseSerializer(cpm.CupPhase.objects.filter(tournament=pk), many=True)
-        return Response(serializer.data)
+        return iupg.paginated_response(self, cpm.CupPhase.objects.filter(tournament=pk), cps.CupPhaseSerializer)
+
+    @action(
+        methods=['get'],
+        detail=True,
+        url_name='snapshot')
+    def snapshot(self, request, pk=None):
+        try:
+            depth = int(request.query_params.get('depth', tsn.MAX_DEPTH))
+        except ValueError:
+            return Response(status=status.HTTP_400_BAD_REQUEST, data={'error': 'depth must be an integer'})
+        depth = max(0, min(depth, tsn.MAX_DEPTH))
+        tournament = get_object_or_404(tsn.snapshot_queryset(depth), pk=pk)
+        return Response(tsn.build_snapshot(tournament, depth))
 
     @action(
         methods=['get'],
@@ -122,9 +248,14 @@ class TournamentViewSet(viewsets.ModelViewSet):
     )
     def not_assigned(self, request, pk=None):
         players = plm.Player.objects.filter(participations__tournament=pk, participations__is_qualified=True).exclude(
-            team_member__team__tournament=pk)
-        serializer = pls.ShallowPlayerSerializer(players, many=True)
-        return Response(serializer.data)
+            team_member__team__tournament=pk).order_by('pk')
+        return iupg.paginated_response(self, players, pls.ShallowPlayerSerializer)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def response_cache_stats(request, format=None):
+    return Response(iuc.get_stats())
 
 
 @api_view(['GET'])
@@ -11,6 +11,7 @@ import ippon.fight.views
 import ippon.group.views
 import ippon.group_fight.views
 import ippon.group_phase.views
+import ippon.location.views
 import ippon.player.views
 import ippon.point.views
 import ippon.team.views
@@ -37,6 +38,7 @@ router.register(r'group_fights', ippon.group_fight.views.GroupFightViewSet)
 router.register(r'cup_phases', ippon.cup_phase.views.CupPhaseViewSet)
 router.register(r'cup_fights', ippon.cup_fight.views.CupFightViewSet)
 router.register(r'events', ippon.event.views.EventViewSet)
+router.register(r'locations', ippon.location.views.LocationViewSet)
 
 urlpatterns = [
     url(r'^', include(router.urls)),
@@ -62,6 +64,7 @@ urlpatterns = [
         name='cup-phase-authorization'),
     url(r'^authorization/players/(?P<pk>[0-9]+)/$', ippon.player.views.player_authorization,
         name='player-authorization'),
+    url(r'^cache/stats/$', ippon.tournament.views.response_cache_stats, name='response-cache-stats'),
     url(r'^registration/', ippon.user.views.register_user, name='register-user'),
     url(r'^shallow_players/(?P<pk>[0-9]+)/$', ippon.player.views.ShallowPlayerDetailView.as_view(),
         name="shallow-player-detail"),
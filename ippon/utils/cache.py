@@ -0,0 +1,111 @@
+import functools
+import threading
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.dispatch.dispatcher import receiver
+from rest_framework import status
+from rest_framework.response import Response
+
+import ippon.models.tournament_changes as tcm
+
+CACHE_ALIAS = 'tournament_responses'
+
+
+class LRUCache(LocMemCache):
+    """
+    LocMemCache (which already culls least recently used entries first) counting its evictions.
+    """
+
+    def __init__(self, name, params):
+        super(LRUCache, self).__init__(name, params)
+        self.evictions = 0
+
+    def _cull(self):
+        size = len(self._cache)
+        super(LRUCache, self)._cull()
+        self.evictions += size - len(self._cache)
+
+
+class CacheStats(object):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+stats = CacheStats()
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def index_key(tournament_id):
+    return 'tournament:{}:keys'.format(tournament_id)
+
+
+def response_key(view, request):
+    return 'tournament:{}:{}'.format(view.etag.strip('"'), request.get_full_path())
+
+
+def get_stats():
+    lookups = stats.hits + stats.misses
+    return {
+        'hits': stats.hits,
+        'misses': stats.misses,
+        'hit_ratio': stats.hits / lookups if lookups else None,
+        'evictions': getattr(get_cache(), 'evictions', None)
+    }
+
+
+def store(tournament_id, key, data):
+    cache = get_cache()
+    cache.set(key, data)
+    keys = cache.get(index_key(tournament_id), set())
+    keys.add(key)
+    cache.set(index_key(tournament_id), keys)
+
+
+def cached_response(view_function):
+    """
+    Caches successful responses of a detail action of a TournamentVersionETagMixin viewset.
+    Entries are keyed by the owning tournament's version, so they never outlive a change of the tournament,
+    and are dropped eagerly when the tournament_changed signal arrives.
+    """
+
+    @functools.wraps(view_function)
+    def wrapper(self, request, *args, **kwargs):
+        if getattr(self, 'etag', None) is None:
+            return view_function(self, request, *args, **kwargs)
+        key = response_key(self, request)
+        data = get_cache().get(key)
+        stats.record(data is not None)
+        if data is not None:
+            return Response(data)
+        response = view_function(self, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            store(self.tournament_id, key, response.data)
+        return response
+
+    return wrapper
+
+
+@receiver(tcm.tournament_changed)
+def invalidate_tournament(sender, tournament_id, **kwargs):
+    cache = get_cache()
+    keys = cache.get(index_key(tournament_id))
+    if keys:
+        cache.delete_many(list(keys) + [index_key(tournament_id)])
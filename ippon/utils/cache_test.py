@@ -0,0 +1,91 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+import ippon.models.tournament as tm
+import ippon.utils.cache as iuc
+
+
+def create_tournament(name):
+    return tm.Tournament.objects.create(name=name, webpage='http://w1.co', description='d1', city='c1',
+                                        date=datetime.date(year=2021, month=1, day=1), address='a1', team_size=1,
+                                        group_match_length=3, ko_match_length=3, final_match_length=3,
+                                        finals_depth=0, age_constraint=5, age_constraint_value=20,
+                                        rank_constraint=5, rank_constraint_value=7, sex_constraint=1)
+
+
+class CachedResponseTests(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        iuc.get_cache().clear()
+        iuc.stats.reset()
+        self.tournament = create_tournament('T1')
+        self.tournament.teams.create(name='t1')
+        self.url = reverse('tournament-teams', kwargs={'pk': self.tournament.id})
+
+    def test_repeated_get_is_served_from_cache(self):
+        expected = self.client.get(self.url).data
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(expected, response.data)
+        self.assertEqual((1, 1), (iuc.stats.hits, iuc.stats.misses))
+
+    def test_change_in_tournament_invalidates_cached_response(self):
+        self.client.get(self.url)
+        self.tournament.teams.create(name='t2')
+        response = self.client.get(self.url)
+        self.assertEqual(['t1', 't2'], [team['name'] for team in response.data])
+
+    def test_change_in_other_tournament_keeps_cached_response(self):
+        self.client.get(self.url)
+        create_tournament('T2').teams.create(name='t3')
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+    def test_different_query_parameters_are_cached_separately(self):
+        self.client.get(self.url)
+        response = self.client.get(self.url, {'page_size': 1})
+        self.assertIn('results', response.data)
+
+    def test_not_existing_tournament_is_not_cached(self):
+        tournament_id = self.tournament.id
+        self.tournament.delete()
+        response = self.client.get(reverse('tournament-teams', kwargs={'pk': tournament_id}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual((0, 0), (iuc.stats.hits, iuc.stats.misses))
+
+
+class ResponseCacheStatsTests(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        iuc.stats.reset()
+        self.user = User.objects.create(username='user', password='password')
+
+    def test_get_stats_when_admin_returns_counters(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('response-cache-stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual({'hits', 'misses', 'hit_ratio', 'evictions'}, set(response.data))
+
+    def test_get_stats_when_not_admin_returns_forbidden(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('response-cache-stats'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class LRUCacheTests(SimpleTestCase):
+    def test_least_recently_used_entries_are_evicted_and_counted(self):
+        cache = iuc.LRUCache('lru-test', {'OPTIONS': {'MAX_ENTRIES': 2, 'CULL_FREQUENCY': 2}})
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual((1, None, 3), (cache.get('a'), cache.get('b'), cache.get('c')))
+        self.assertEqual(1, cache.evictions)
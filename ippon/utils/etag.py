@@ -0,0 +1,58 @@
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+import ippon.models.tournament as tm
+
+
+class NotModified(Exception):
+    pass
+
+
+def get_tournament_version(tournament_lookup, pk):
+    try:
+        return tm.Tournament.objects.filter(**{tournament_lookup: pk}).values_list('pk', 'version').first()
+    except (ValueError, TypeError):
+        return None
+
+
+def make_etag(tournament_id, version):
+    return '"{}-{}"'.format(tournament_id, version)
+
+
+class TournamentVersionETagMixin(object):
+    """
+    Serves ETags derived from the version of the tournament owning the requested object on the detail GET
+    actions listed in etag_actions and answers 304 Not Modified when the client already has that version.
+    Only actions whose responses change with the version belong there: data of global tables (players,
+    users) does not bump it. tournament_lookup is the lookup from Tournament to the primary key of the
+    viewset's model.
+    """
+    tournament_lookup = 'pk'
+    etag_actions = ('retrieve',)
+
+    def initial(self, request, *args, **kwargs):
+        super(TournamentVersionETagMixin, self).initial(request, *args, **kwargs)
+        self.tournament_id = None
+        self.etag = None
+        if request.method not in ('GET', 'HEAD') or 'pk' not in kwargs or self.action not in self.etag_actions:
+            return
+        tournament_version = get_tournament_version(self.tournament_lookup, kwargs['pk'])
+        if tournament_version is None:
+            return
+        self.tournament_id = tournament_version[0]
+        self.etag = make_etag(*tournament_version)
+        if_none_match = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+        if self.etag in if_none_match or '*' in if_none_match:
+            raise NotModified()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': self.etag})
+        return super(TournamentVersionETagMixin, self).handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super(TournamentVersionETagMixin, self).finalize_response(request, response, *args, **kwargs)
+        if getattr(self, 'etag', None) and response.status_code == status.HTTP_200_OK:
+            response['ETag'] = self.etag
+        return response
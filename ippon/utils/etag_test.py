@@ -0,0 +1,83 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+import ippon.models.club as cl
+import ippon.models.player as plm
+import ippon.models.tournament as tm
+
+
+class TournamentVersionETagTests(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.tournament = tm.Tournament.objects.create(name='T1', webpage='http://w1.co', description='d1',
+                                                       city='c1', date=datetime.date(year=2021, month=1, day=1),
+                                                       address='a1', team_size=1, group_match_length=3,
+                                                       ko_match_length=3, final_match_length=3, finals_depth=0,
+                                                       age_constraint=5, age_constraint_value=20, rank_constraint=5,
+                                                       rank_constraint_value=7, sex_constraint=1)
+        c = cl.Club.objects.create(name='cn1', webpage='http://cw1.co', description='cd1', city='cc1')
+        self.p1 = plm.Player.objects.create(name='pn1', surname='ps1', rank=7,
+                                            birthday=datetime.date(year=2001, month=1, day=1), sex=1, club_id=c)
+        self.p2 = plm.Player.objects.create(name='pn2', surname='ps2', rank=7,
+                                            birthday=datetime.date(year=2001, month=1, day=1), sex=1, club_id=c)
+        t1 = self.tournament.teams.create(name='t1')
+        t2 = self.tournament.teams.create(name='t2')
+        self.team_fight = self.tournament.team_fights.create(aka_team=t1, shiro_team=t2)
+        self.fight = self.team_fight.fights.create(aka=self.p1, shiro=self.p2)
+
+    def test_detail_get_returns_etag(self):
+        response = self.client.get(reverse('teamfight-detail', kwargs={'pk': self.team_fight.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', response)
+
+    def test_get_with_matching_etag_returns_not_modified_in_one_query(self):
+        url = reverse('fight-points', kwargs={'pk': self.fight.id})
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(etag, response['ETag'])
+
+    def test_change_in_tournament_invalidates_etag(self):
+        url = reverse('tournament-detail', kwargs={'pk': self.tournament.id})
+        etag = self.client.get(url)['ETag']
+        self.fight.points.create(player=self.p1, type=0)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(etag, response['ETag'])
+
+    def test_list_get_has_no_etag(self):
+        response = self.client.get(reverse('teamfight-list'))
+        self.assertNotIn('ETag', response)
+
+    def test_actions_reading_global_tables_have_no_etag(self):
+        user = User.objects.create(username='admin', password='password')
+        tm.TournamentAdmin.objects.create(user=user, tournament=self.tournament, is_master=True)
+        self.client.force_authenticate(user=user)
+        for url_name in ['tournament-admins', 'tournament-non-admins', 'tournament-non-participants',
+                         'tournament-participants', 'tournament-not_assigned']:
+            response = self.client.get(reverse(url_name, kwargs={'pk': self.tournament.id}))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('ETag', response, url_name)
+
+    def test_changes_visible_only_to_admins_have_no_etag(self):
+        user = User.objects.create(username='admin', password='password')
+        tm.TournamentAdmin.objects.create(user=user, tournament=self.tournament, is_master=True)
+        etag = self.client.get(reverse('tournament-detail', kwargs={'pk': self.tournament.id}))['ETag']
+        url = reverse('tournament-changes', kwargs={'pk': self.tournament.id})
+        self.assertNotIn('ETag', self.client.get(url))
+        self.client.force_authenticate(user=user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertIn('tournamentadmin', [change['model'] for change in response.data['changes']])
+
+    def test_adding_tournament_admin_invalidates_etag(self):
+        url = reverse('tournament-detail', kwargs={'pk': self.tournament.id})
+        etag = self.client.get(url)['ETag']
+        tm.TournamentAdmin.objects.create(user=User.objects.create(username='other', password='password'),
+                                          tournament=self.tournament, is_master=False)
+        self.assertNotEqual(etag, self.client.get(url, HTTP_IF_NONE_MATCH=etag).get('ETag'))
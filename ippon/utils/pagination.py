@@ -0,0 +1,31 @@
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination keyed on the primary key.
+    Pagination is opt-in: lists are paginated only when the client sends
+    either a cursor or a page_size query parameter, so existing clients
+    still receive plain lists.
+    """
+    ordering = 'pk'
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+        return super(KeysetPagination, self).paginate_queryset(queryset, request, view)
+
+    def is_requested(self, request):
+        return self.cursor_query_param in request.query_params or self.page_size_query_param in request.query_params
+
+
+def paginated_response(view, queryset, serializer_class, **serializer_kwargs):
+    page = view.paginate_queryset(queryset)
+    if page is not None:
+        serializer = serializer_class(page, many=True, **serializer_kwargs)
+        return view.get_paginated_response(serializer.data)
+    serializer = serializer_class(queryset, many=True, **serializer_kwargs)
+    return Response(serializer.data)
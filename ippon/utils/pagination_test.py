@@ -0,0 +1,55 @@
+import datetime
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+import ippon.models.club as cl
+import ippon.models.tournament as tm
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.club = cl.Club.objects.create(name='cn1', webpage='http://cw1.co', description='cd1', city='cc1')
+        self.players = [self.club.players.create(name='pn{}'.format(i), surname='ps{}'.format(i), rank=7,
+                                                 birthday=datetime.date(year=2001, month=1, day=1), sex=1,
+                                                 club_id=self.club) for i in range(5)]
+        self.tournament = tm.Tournament.objects.create(name='T1', webpage='http://w1.co', description='d1',
+                                                       city='c1', date=datetime.date(year=2021, month=1, day=1),
+                                                       address='a1', team_size=1, group_match_length=3,
+                                                       ko_match_length=3, final_match_length=3, finals_depth=0,
+                                                       age_constraint=5, age_constraint_value=20, rank_constraint=5,
+                                                       rank_constraint_value=7, sex_constraint=1)
+        self.teams = [self.tournament.teams.create(name='t{}'.format(i)) for i in range(3)]
+
+    def test_list_without_pagination_parameters_returns_plain_list(self):
+        response = self.client.get(reverse('player-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p.id for p in self.players], [p['id'] for p in response.data])
+
+    def test_list_with_page_size_returns_first_page_with_next_cursor(self):
+        response = self.client.get(reverse('player-list'), {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p.id for p in self.players[:2]], [p['id'] for p in response.data['results']])
+        self.assertIsNotNone(response.data['next'])
+        self.assertIsNone(response.data['previous'])
+
+    def test_following_cursors_walks_whole_table_in_primary_key_order(self):
+        ids = []
+        url = reverse('player-list') + '?page_size=2'
+        while url:
+            response = self.client.get(url)
+            ids.extend(p['id'] for p in response.data['results'])
+            url = response.data['next']
+        self.assertEqual([p.id for p in self.players], ids)
+
+    def test_page_size_is_capped(self):
+        response = self.client.get(reverse('player-list'), {'page_size': 100000})
+        self.assertEqual(len(self.players), len(response.data['results']))
+
+    def test_custom_action_list_is_paginated(self):
+        response = self.client.get(reverse('tournament-teams', kwargs={'pk': self.tournament.id}), {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([t.id for t in self.teams[:2]], [t['id'] for t in response.data['results']])
+        self.assertIsNotNone(response.data['next'])
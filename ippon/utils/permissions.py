@@ -1,3 +1,5 @@
+from rest_framework import permissions
+
 import ippon.models.tournament as tm
 
 
@@ -26,3 +28,27 @@ def has_object_creation_permission(request, serializer_class, tournament_depende
 
 def get_tournament_from_fight(fight):
     return fight.team_fight.tournament
+
+
+class IsTournamentDependentOwner(permissions.BasePermission):
+    """
+    Allows admins of the tournament owning the model instance given by the pk url argument. A missing
+    instance is let through for the view to answer 404.
+    Subclasses set model and tournament_path, the lookup from the model to its tournament.
+    """
+    model = None
+    tournament_path = 'tournament'
+
+    def has_permission(self, request, view):
+        try:
+            tournament_ids = list(self.model.objects.filter(pk=view.kwargs["pk"])
+                                  .values_list(self.tournament_path, flat=True))
+        except (KeyError, ValueError):
+            return False
+        return not tournament_ids or is_user_admin_of_the_tournament(request, tournament_ids[0])
+
+    def has_object_permission(self, request, view, obj):
+        *path, last = self.tournament_path.split('__')
+        for field in path:
+            obj = getattr(obj, field)
+        return is_user_admin_of_the_tournament(request, getattr(obj, last + '_id'))
@@ -0,0 +1,48 @@
+import datetime
+import types
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+import ippon.fight.permissions as fp
+import ippon.models.club as cl
+import ippon.models.player as plm
+import ippon.models.tournament as tm
+import ippon.utils.values as iuv
+
+
+class TournamentDependentOwnerTests(TestCase):
+    def setUp(self):
+        club = cl.Club.objects.create(name='cn1', webpage='http://cw1.co', description='cd1', city='cc1')
+        self.tournament = tm.Tournament.objects.create(
+            name='T1', webpage='http://w1.co', description='d1', city='c1',
+            date=datetime.date(year=2021, month=1, day=1), address='a1', team_size=1, group_match_length=3,
+            ko_match_length=3, final_match_length=3, finals_depth=0, age_constraint=5, age_constraint_value=20,
+            rank_constraint=5, rank_constraint_value=7, sex_constraint=1)
+        player = plm.Player.objects.create(name='pn1', surname='ps1', rank=7, sex=1, club_id=club,
+                                           birthday=datetime.date(year=2001, month=1, day=1))
+        team = self.tournament.teams.create(name='t1')
+        team_fight = self.tournament.team_fights.create(aka_team=team, shiro_team=team)
+        self.fight = team_fight.fights.create(aka=player, shiro=player)
+        self.admin = types.SimpleNamespace(user=User.objects.create(username='admin', password='password'))
+        self.other = types.SimpleNamespace(user=User.objects.create(username='other', password='password'))
+        tm.TournamentAdmin.objects.create(user=self.admin.user, tournament=self.tournament, is_master=False)
+        self.permission = fp.IsFightOwner()
+
+    def view(self, **kwargs):
+        return types.SimpleNamespace(kwargs=kwargs)
+
+    def test_admin_of_owning_tournament_is_allowed(self):
+        self.assertTrue(self.permission.has_permission(self.admin, self.view(pk=self.fight.pk)))
+        self.assertTrue(self.permission.has_object_permission(self.admin, self.view(), self.fight))
+
+    def test_other_user_is_denied(self):
+        self.assertFalse(self.permission.has_permission(self.other, self.view(pk=self.fight.pk)))
+        self.assertFalse(self.permission.has_object_permission(self.other, self.view(), self.fight))
+
+    def test_missing_or_invalid_pk_is_denied(self):
+        self.assertFalse(self.permission.has_permission(self.admin, self.view()))
+        self.assertFalse(self.permission.has_permission(self.admin, self.view(pk='x')))
+
+    def test_not_existing_instance_is_left_to_the_view(self):
+        self.assertTrue(self.permission.has_permission(self.other, self.view(pk=iuv.BAD_PK)))
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.response import Response
+
+SEARCH_QUERY_PARAM = 'search'
+MATCH_QUERY_PARAM = 'match'
+PREFIX_MATCH = 'prefix'
+
+
+def search_queryset(queryset, request, fields):
+    """
+    Narrows queryset to rows where every whitespace separated term of the search query parameter
+    matches (case insensitive) at least one of the fields. Matches are substrings unless match=prefix is sent.
+    """
+    lookup = 'istartswith' if request.query_params.get(MATCH_QUERY_PARAM) == PREFIX_MATCH else 'icontains'
+    for term in request.query_params.get(SEARCH_QUERY_PARAM, '').split():
+        matches = Q()
+        for field in fields:
+            matches |= Q(**{'{}__{}'.format(field, lookup): term})
+        queryset = queryset.filter(matches)
+    return queryset
+
+
+def picker_response(view, queryset, serializer_class, fields):
+    queryset = search_queryset(queryset, view.request, fields)
+    page = view.paginate_queryset(queryset)
+    if page is not None:
+        return view.get_paginated_response(serializer_class(page, many=True).data)
+    capped = queryset.order_by('pk')[:settings.PICKER_RESULT_CAP]
+    return Response(serializer_class(capped, many=True).data)
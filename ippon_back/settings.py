@@ -135,7 +135,36 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
+    'DEFAULT_PAGINATION_CLASS': 'ippon.utils.pagination.KeysetPagination',
+    'PAGE_SIZE': int(os.environ.get('PAGE_SIZE', 100)),
+}
+
+PICKER_RESULT_CAP = int(os.environ.get('PICKER_RESULT_CAP', 50))
+
+SCHEDULE_TEAM_REST_MINUTES = int(os.environ.get('SCHEDULE_TEAM_REST_MINUTES', 5))
+
+# The Postgres broker reaches streams of every server process, so they can be served by the separate live
+# process of the Procfile; the in process broker only suits a single process serving everything.
+LIVE_BROKER = os.environ.get('LIVE_BROKER', 'ippon.tournament.live.PostgresBroker')
+LIVE_HEARTBEAT_SECONDS = float(os.environ.get('LIVE_HEARTBEAT_SECONDS', 15))
+LIVE_QUEUE_SIZE = int(os.environ.get('LIVE_QUEUE_SIZE', 100))
+# Streams end after this long and clients reconnect, so none holds a server thread forever.
+LIVE_MAX_SECONDS = float(os.environ.get('LIVE_MAX_SECONDS', 25))
+
+CHANGES_PAGE_SIZE = int(os.environ.get('CHANGES_PAGE_SIZE', 500))
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'tournament_responses': {
+        'BACKEND': os.environ.get('TOURNAMENT_CACHE_BACKEND', 'ippon.utils.cache.LRUCache'),
+        'LOCATION': os.environ.get('TOURNAMENT_CACHE_LOCATION', 'tournament-responses'),
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('TOURNAMENT_CACHE_MAX_ENTRIES', 1000)),
+        },
+    },
 }
 
 SIMPLE_JWT = {